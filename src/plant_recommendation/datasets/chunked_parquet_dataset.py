@@ -0,0 +1,114 @@
+import os
+
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from kedro.io import AbstractDataset
+
+
+class ParquetChunks:
+    """
+    The chunks of a Parquet file, read lazily: every iteration opens the file and reads it again batch by batch,
+    so that the same loaded object can be iterated by several passes while only one chunk is in memory at a time.
+
+    A file saved without its pandas index (RangeIndex) gets, as with pandas.read_parquet,
+    the position of each row in the file as index.
+
+    Attributes:
+        filepath (Path): The path of the Parquet file.
+        batch_size (int): The number of rows of the chunks.
+        columns (List[str]): The columns read, all if None.
+    """
+
+    def __init__(self, filepath: Path, batch_size: int, columns: List[str] = None):
+        """
+        Initialize the ParquetChunks class.
+
+        Args:
+            filepath (Path): The path of the Parquet file.
+            batch_size (int): The number of rows of the chunks.
+            columns (List[str], optional): The columns read, all if None.
+        """
+        self.filepath = filepath
+        self.batch_size = batch_size
+        self.columns = columns
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        parquet_file = pq.ParquetFile(self.filepath)
+        offset = 0
+        for batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=self.columns):
+            chunk = batch.to_pandas()
+            if isinstance(chunk.index, pd.RangeIndex):
+                chunk.index = chunk.index + offset
+            offset += len(chunk)
+            yield chunk
+
+
+class ChunkedParquetDataset(AbstractDataset[Iterable[pd.DataFrame], ParquetChunks]):
+    """
+    A Kedro dataset reading and writing a Parquet file by chunks, for datasets larger than memory.
+
+    It loads a ParquetChunks, which can be iterated several times. It saves any iterable of DataFrames
+    (e.g. a generator transforming the chunks of another dataset), each chunk being written as it comes, with
+    the schema of the first one. The file is written aside and renamed once complete, and it can be read
+    back as a whole by a pandas.ParquetDataset on the same filepath.
+
+    Example catalog entry:
+    ::
+
+        clean_dataset_chunks:
+          type: plant_recommendation.datasets.chunked_parquet_dataset.ChunkedParquetDataset
+          filepath: data/02_intermediate/plants_clean_dataset.pq
+          batch_size: 10000
+    """
+
+    def __init__(self, filepath: str, batch_size: int = 65536, columns: List[str] = None,
+                 metadata: Dict[str, Any] = None):
+        """
+        Initialize the ChunkedParquetDataset class.
+
+        Args:
+            filepath (str): The path of the Parquet file.
+            batch_size (int, optional): The number of rows of the loaded chunks.
+            columns (List[str], optional): The columns loaded, all if None.
+            metadata (Dict[str, Any], optional): Any arbitrary metadata, ignored by Kedro.
+        """
+        self._filepath = PurePosixPath(filepath)
+        self.batch_size = batch_size
+        self.columns = columns
+        self.metadata = metadata
+
+    def _load(self) -> ParquetChunks:
+        return ParquetChunks(Path(self._filepath), self.batch_size, self.columns)
+
+    def _save(self, chunks: Iterable[pd.DataFrame]) -> None:
+        path = Path(self._filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        writer = None
+        try:
+            for chunk in chunks:
+                # the index is stored as a column: the metadata of a RangeIndex would only describe the first chunk
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk, preserve_index=True)
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                else:
+                    # the first chunk fixes the schema (e.g. a column entirely null in a later chunk)
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=True)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"No chunk to save to {path}")
+        os.replace(tmp_path, path)
+
+    def _exists(self) -> bool:
+        return Path(self._filepath).exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath, batch_size=self.batch_size, columns=self.columns)
@@ -0,0 +1,69 @@
+import os
+
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Union
+
+import numpy as np
+
+from kedro.io import AbstractDataset
+
+from ..streaming import ChunkedMatrix
+
+
+class MemmapMatrixDataset(AbstractDataset[Union[np.ndarray, ChunkedMatrix], np.ndarray]):
+    """
+    A Kedro dataset storing a matrix as a .npy file, memory-mapped when loaded: the consumers read the rows
+    they touch from the page cache instead of a copy in memory.
+
+    A ChunkedMatrix is written chunk by chunk into a memory-mapped file of its shape, so that saving it
+    only holds one chunk in memory. The file is written aside and renamed once complete.
+
+    Example catalog entry:
+    ::
+
+        X_transformed_matrix:
+          type: plant_recommendation.datasets.memmap_matrix_dataset.MemmapMatrixDataset
+          filepath: data/05_model_input/X_transformed.npy
+    """
+
+    def __init__(self, filepath: str, mmap_mode: str = "r", metadata: Dict[str, Any] = None):
+        """
+        Initialize the MemmapMatrixDataset class.
+
+        Args:
+            filepath (str): The path of the .npy file.
+            mmap_mode (str, optional): The memory-map mode of the loaded matrix, None to read it in memory.
+            metadata (Dict[str, Any], optional): Any arbitrary metadata, ignored by Kedro.
+        """
+        self._filepath = PurePosixPath(filepath)
+        self.mmap_mode = mmap_mode
+        self.metadata = metadata
+
+    def _load(self) -> np.ndarray:
+        return np.load(Path(self._filepath), mmap_mode=self.mmap_mode, allow_pickle=False)
+
+    def _save(self, matrix: Union[np.ndarray, ChunkedMatrix]) -> None:
+        path = Path(self._filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        if isinstance(matrix, np.ndarray):
+            with open(tmp_path, "wb") as file:
+                np.save(file, matrix, allow_pickle=False)
+        else:
+            output = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=matrix.dtype, shape=matrix.shape)
+            n_rows = 0
+            for chunk in matrix.chunks:
+                output[n_rows:n_rows + len(chunk)] = chunk
+                n_rows += len(chunk)
+            output.flush()
+            del output
+            if n_rows != matrix.shape[0]:
+                tmp_path.unlink()
+                raise ValueError(f"The chunks have {n_rows} rows, expected {matrix.shape[0]}")
+        os.replace(tmp_path, path)
+
+    def _exists(self) -> bool:
+        return Path(self._filepath).exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath, mmap_mode=self.mmap_mode)
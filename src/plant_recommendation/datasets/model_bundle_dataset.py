@@ -0,0 +1,105 @@
+import logging
+
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict
+
+from kedro.io import AbstractDataset, AbstractVersionedDataset, Version
+from kedro.io.core import VersionNotFoundError
+
+from ..recommender.bundle import MANIFEST_FILE, ModelBundle, prune_bundle_versions
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_COMPONENTS = ("preprocessor", "nn", "plants_dataset")
+
+
+def _has_manifest(path: str) -> bool:
+    # module-level function (not a lambda) so that the dataset stays picklable for the ParallelRunner
+    return (Path(path) / MANIFEST_FILE).exists()
+
+
+class ModelBundleDataset(AbstractVersionedDataset[ModelBundle, ModelBundle]):
+    """
+    A Kedro dataset storing a ModelBundle as a directory (components, manifest and checksums).
+
+    With ``versioned: true``, only the versions whose manifest exists are considered for loading,
+    so a bundle being written is never picked up, and after each save only the ``keep_versions``
+    most recent versions are kept (all of them if None).
+
+    Until a first bundle is saved (e.g. on a fresh checkout), a versioned bundle can be loaded from the separate
+    artifacts of the ``fallback`` datasets, checked for alignment as any bundle.
+
+    Example catalog entry:
+    ::
+
+        model_bundle:
+          type: plant_recommendation.datasets.model_bundle_dataset.ModelBundleDataset
+          filepath: data/06_models/model_bundle
+          versioned: true
+          keep_versions: 5
+          fallback:
+            preprocessor:
+              type: pickle.PickleDataset
+              filepath: data/06_models/recommendation_preprocessor.pickle
+            nn:
+              type: pickle.PickleDataset
+              filepath: data/06_models/nn.pickle
+              versioned: true
+            plants_dataset:
+              type: pandas.ParquetDataset
+              filepath: data/04_feature/recommendation_dataset.pq
+    """
+
+    def __init__(self, filepath: str, version: Version = None, keep_versions: int = None,
+                 fallback: Dict[str, Dict[str, Any]] = None, metadata: Dict[str, Any] = None):
+        """
+        Initialize the ModelBundleDataset class.
+
+        Args:
+            filepath (str): The directory of the bundle.
+            version (Version, optional): The load and save versions of the bundle.
+            keep_versions (int, optional): The number of versions kept after a save, all of them if None.
+            fallback (Dict[str, Dict[str, Any]], optional): The dataset configurations of the 'preprocessor',
+                the 'nn' and the 'plants_dataset' loaded while no bundle version exists.
+            metadata (Dict[str, Any], optional): Any arbitrary metadata, ignored by Kedro.
+        """
+        super().__init__(filepath=PurePosixPath(filepath), version=version,
+                         exists_function=_has_manifest)
+        self.keep_versions = keep_versions
+        self.metadata = metadata
+        self._fallback = None
+        if fallback is not None:
+            if sorted(fallback) != sorted(FALLBACK_COMPONENTS):
+                raise ValueError(f"The fallback of a model bundle needs the datasets {list(FALLBACK_COMPONENTS)}, "
+                                 f"got {sorted(fallback)}")
+            self._fallback = {name: AbstractDataset.from_config(f"model_bundle_{name}", config)
+                              for name, config in fallback.items()}
+
+    def _load(self) -> ModelBundle:
+        try:
+            path = self._get_load_path()
+        except VersionNotFoundError:
+            if self._fallback is None:
+                raise
+            logger.warning("No model bundle version in '%s', loading its components from %s", self._filepath,
+                           {name: str(dataset._describe().get("filepath")) for name, dataset in self._fallback.items()})
+            return ModelBundle(**{name: dataset.load() for name, dataset in self._fallback.items()})
+        return ModelBundle.load(Path(path))
+
+    def _save(self, bundle: ModelBundle) -> None:
+        bundle.save(Path(self._get_save_path()), version=self.resolve_save_version())
+        if self._version is not None and self.keep_versions is not None:
+            prune_bundle_versions(Path(self._filepath), self.keep_versions)
+
+    def _exists(self) -> bool:
+        try:
+            path = self._get_load_path()
+        except VersionNotFoundError:
+            return self._fallback is not None and all(dataset.exists() for dataset in self._fallback.values())
+        except Exception:
+            return False
+        return _has_manifest(path)
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath, version=self._version, keep_versions=self.keep_versions,
+                    fallback=None if self._fallback is None else sorted(self._fallback))
@@ -0,0 +1,46 @@
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict
+
+from kedro.io import AbstractDataset
+
+from ..recommender.name_index import ARRAYS, PlantNameIndex
+
+
+class PlantNameIndexDataset(AbstractDataset[PlantNameIndex, PlantNameIndex]):
+    """
+    A Kedro dataset storing a PlantNameIndex as a directory of .npy files, memory-mapped when loaded:
+    the index pages are only read from disk when a search touches them, and are shared by the processes
+    serving the same index.
+
+    Example catalog entry:
+    ::
+
+        plant_name_index:
+          type: plant_recommendation.datasets.name_index_dataset.PlantNameIndexDataset
+          filepath: data/06_models/plant_name_index
+    """
+
+    def __init__(self, filepath: str, mmap_mode: str = "r", metadata: Dict[str, Any] = None):
+        """
+        Initialize the PlantNameIndexDataset class.
+
+        Args:
+            filepath (str): The directory of the index.
+            mmap_mode (str, optional): The memory-map mode of the arrays, None to read them in memory.
+            metadata (Dict[str, Any], optional): Any arbitrary metadata, ignored by Kedro.
+        """
+        self._filepath = PurePosixPath(filepath)
+        self.mmap_mode = mmap_mode
+        self.metadata = metadata
+
+    def _load(self) -> PlantNameIndex:
+        return PlantNameIndex.load(Path(self._filepath), mmap_mode=self.mmap_mode)
+
+    def _save(self, index: PlantNameIndex) -> None:
+        index.save(Path(self._filepath))
+
+    def _exists(self) -> bool:
+        return all((Path(self._filepath) / f"{name}.npy").exists() for name in ARRAYS)
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath, mmap_mode=self.mmap_mode)
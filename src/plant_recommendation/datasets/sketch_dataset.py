@@ -0,0 +1,71 @@
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from kedro.io import AbstractVersionedDataset, Version
+from kedro.io.core import VersionNotFoundError
+
+from ..sketches import DatasetSketch
+
+
+class DatasetSketchDataset(AbstractVersionedDataset[DatasetSketch, Optional[DatasetSketch]]):
+    """
+    A Kedro dataset storing a DatasetSketch as a .npz file (sketch arrays and a JSON metadata string),
+    which can be loaded back and merged with other sketches.
+
+    With ``versioned: true``, every refresh keeps its own file. A second catalog entry on the same filepath
+    with ``allow_missing: true`` loads the latest existing version, i.e. the previous refresh when it is
+    an input of the node saving the new one, and None on the first refresh.
+
+    Example catalog entry:
+    ::
+
+        raw_dataset_sketch:
+          type: plant_recommendation.datasets.sketch_dataset.DatasetSketchDataset
+          filepath: data/08_reporting/raw_dataset_sketch.npz
+          versioned: true
+    """
+
+    def __init__(self, filepath: str, allow_missing: bool = False, version: Version = None,
+                 metadata: Dict[str, Any] = None):
+        """
+        Initialize the DatasetSketchDataset class.
+
+        Args:
+            filepath (str): The path of the .npz file.
+            allow_missing (bool, optional): Whether loading a missing sketch returns None instead of failing.
+            version (Version, optional): The load and save versions of the sketch.
+            metadata (Dict[str, Any], optional): Any arbitrary metadata, ignored by Kedro.
+        """
+        super().__init__(filepath=PurePosixPath(filepath), version=version)
+        self.allow_missing = allow_missing
+        self.metadata = metadata
+
+    def _load(self) -> Optional[DatasetSketch]:
+        try:
+            path = Path(self._get_load_path())
+        except VersionNotFoundError:
+            if self.allow_missing:
+                return None
+            raise
+        if not path.exists() and self.allow_missing:
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            return DatasetSketch.from_arrays(dict(arrays))
+
+    def _save(self, sketch: DatasetSketch) -> None:
+        path = Path(self._get_save_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as file:
+            np.savez_compressed(file, **sketch.to_arrays())
+
+    def _exists(self) -> bool:
+        try:
+            path = self._get_load_path()
+        except VersionNotFoundError:
+            return False
+        return Path(path).exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath, allow_missing=self.allow_missing, version=self._version)
@@ -0,0 +1,795 @@
+"""Project hooks."""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set, Tuple
+from types import ModuleType
+from kedro.framework.hooks import hook_impl
+from kedro.io import AbstractDataset, DataCatalog, MemoryDataset
+from kedro.pipeline import Pipeline
+from kedro.pipeline.node import Node
+
+from .profiling import PROFILERS
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint_value(value: Any) -> str:
+    """
+    Compute a content fingerprint of a node input.
+
+    Args:
+        value (Any): A loaded dataset or a parameter value.
+
+    Returns:
+        str: The sha256 hex digest of the value content.
+    """
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(pickle.dumps((list(value.columns), [str(dtype) for dtype in value.dtypes])))
+        digest.update(pd.util.hash_pandas_object(value.index).to_numpy().tobytes())
+        for column in value.columns:
+            try:
+                hashes = pd.util.hash_pandas_object(value[column], index=False)
+            except TypeError:
+                # unhashable cells (e.g. lists): pickling them is not deterministic, their repr is
+                hashes = pd.util.hash_pandas_object(value[column].map(repr), index=False)
+            digest.update(hashes.to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(pickle.dumps((value.dtype.str, value.shape)))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=4))
+    return digest.hexdigest()
+
+
+def _collect_package_modules(module: ModuleType, package: str, seen: Set[str]) -> None:
+    """
+    Collect the modules of the project package a module depends on, recursively.
+
+    Args:
+        module (ModuleType): The module to inspect.
+        package (str): The name of the project package.
+        seen (Set[str]): The names of the modules already collected, updated in place.
+    """
+    if module is None or module.__name__ in seen or not module.__name__.startswith(package):
+        return
+    seen.add(module.__name__)
+    for value in list(vars(module).values()):
+        dependency = value if inspect.ismodule(value) else inspect.getmodule(value)
+        if dependency is not None:
+            _collect_package_modules(dependency, package, seen)
+
+
+def _fingerprint_code(func: Callable) -> str:
+    """
+    Compute a fingerprint of the source code of a node function and of the project modules it depends on,
+    so that a change in a helper (e.g. a CleanFeatures class) also invalidates the cached outputs.
+
+    Args:
+        func (Callable): The node function.
+
+    Returns:
+        str: The sha256 hex digest of the source code.
+    """
+    func = inspect.unwrap(func)
+    try:
+        digest = hashlib.sha256(inspect.getsource(func).encode())
+    except (OSError, TypeError):
+        digest = hashlib.sha256(repr(func).encode())
+    module = inspect.getmodule(func)
+    if module is not None:
+        modules: Set[str] = set()
+        _collect_package_modules(module, module.__name__.split(".")[0], modules)
+        for name in sorted(modules):
+            digest.update(inspect.getsource(sys.modules[name]).encode())
+    return digest.hexdigest()
+
+
+def _set_node_func(node: Node, func: Callable) -> None:
+    """
+    Replace the function of a node.
+
+    The ``Node.func`` setter clears the cached ``inputs`` property, which fails if it was
+    not computed since the previous replacement: it is computed first.
+
+    Args:
+        node (Node): The node.
+        func (Callable): The new function of the node.
+    """
+    node.inputs
+    node.func = func
+
+
+def _remove_node_wrapper(node: Node, wrapper_type: type) -> None:
+    """
+    Remove the wrapper of a given type from the function of a node, wherever it is in the chain of wrappers:
+    the wrappers installed by other hooks, before or after it, are kept.
+
+    Args:
+        node (Node): The node.
+        wrapper_type (type): The type of the wrapper to remove.
+    """
+    func = node.func
+    if isinstance(func, wrapper_type):
+        _set_node_func(node, func.__wrapped__)
+        return
+    while callable(getattr(func, "__wrapped__", None)):
+        inner = func.__wrapped__
+        if isinstance(inner, wrapper_type):
+            func.func = func.__wrapped__ = inner.__wrapped__
+            return
+        func = inner
+
+
+class MemoizedNodeFunction:
+    """
+    A node function wrapper which reuses the outputs stored for the same inputs and code.
+
+    It is a picklable class rather than a closure, so that wrapped nodes can still be sent
+    to the subprocesses of the ParallelRunner.
+
+    Attributes:
+        func (Callable): The original node function.
+        node_name (str): The name of the node.
+        code_fingerprint (str): The fingerprint of the source code of the function.
+        cache_dir (Path): The directory where the outputs of the node are stored.
+        status_file (Path): The file where the hit/miss status of each call is appended.
+        keep (int): The number of cached outputs kept per node.
+    """
+
+    def __init__(self, func: Callable, node_name: str, cache_dir: Path, status_file: Path, keep: int):
+        """
+        Initialize the MemoizedNodeFunction class.
+
+        Args:
+            func (Callable): The original node function.
+            node_name (str): The name of the node.
+            cache_dir (Path): The directory where the outputs of the node are stored.
+            status_file (Path): The file where the hit/miss status of each call is appended.
+            keep (int): The number of cached outputs kept per node.
+        """
+        self.func = func
+        self.node_name = node_name
+        self.code_fingerprint = _fingerprint_code(func)
+        self.cache_dir = cache_dir
+        self.status_file = status_file
+        self.keep = keep
+        self.__name__ = getattr(func, "__name__", node_name)
+        self.__wrapped__ = func
+
+    def key(self, args: tuple, kwargs: Dict[str, Any]) -> str:
+        """
+        Compute the cache key of a call: the code fingerprint and the fingerprints of all the
+        inputs (datasets and bound parameters), in argument order.
+
+        Args:
+            args (tuple): The positional inputs of the node.
+            kwargs (Dict[str, Any]): The keyword inputs of the node.
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.sha256(self.code_fingerprint.encode())
+        for value in args:
+            digest.update(_fingerprint_value(value).encode())
+        for name in sorted(kwargs):
+            digest.update(name.encode())
+            digest.update(_fingerprint_value(kwargs[name]).encode())
+        return digest.hexdigest()
+
+    def record(self, status: str, key: str) -> None:
+        """
+        Append the status of a call to the status file of the run.
+
+        Args:
+            status (str): 'hit' or 'miss'.
+            key (str): The cache key of the call.
+        """
+        logger.info("Node cache %s for '%s' (%s)", status, self.node_name, key[:12])
+        line = json.dumps({"node": self.node_name, "status": status, "key": key}) + "\n"
+        with open(self.status_file, "a", encoding="utf8") as file:
+            file.write(line)
+
+    def prune(self) -> None:
+        """
+        Remove the oldest cached outputs of the node, keeping the most recent ones.
+        """
+        entries = sorted(self.cache_dir.glob("*.pickle"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in entries[self.keep:]:
+            path.unlink(missing_ok=True)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        key = self.key(args, kwargs)
+        path = self.cache_dir / f"{key}.pickle"
+
+        if path.exists():
+            with open(path, "rb") as file:
+                outputs = pickle.load(file)
+            os.utime(path)
+            self.record("hit", key)
+            return outputs
+
+        outputs = self.func(*args, **kwargs)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as file:
+            pickle.dump(outputs, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.prune()
+        self.record("miss", key)
+        return outputs
+
+
+class NodeCacheHook:
+    """
+    Content-addressed memoization of node outputs across runs.
+
+    Before a pipeline runs, the function of every node is wrapped in a MemoizedNodeFunction:
+    the node is fingerprinted from its loaded inputs, its bound ``params:`` values and its source code,
+    and the stored outputs are reused on a hit instead of running the function.
+    Nodes tagged with ``no_cache`` (e.g. model fitting) and generator nodes always run.
+    The hit/miss status of each node is written to a report after the run.
+
+    Only the runs of the given pipelines are cached (by default the training pipeline, which includes
+    the data processing, and the data profiling pipeline): the other pipelines (inference, similar plants,
+    bulk scoring, sweep...) do not pay the fingerprinting of their inputs. After each cached run, the stored
+    outputs older than max_age_days are removed, then the least recently used ones beyond max_bytes.
+
+    The cache can be disabled with the environment variable PLANT_RECO_NODE_CACHE=0.
+
+    Attributes:
+        cache_dir (str): The directory of the cache, relative to the project path.
+        report_path (str): The path of the hit/miss report, relative to the project path.
+        keep (int): The number of cached outputs kept per node.
+        no_cache_tag (str): The tag of the nodes which are never cached.
+        pipelines (Tuple[str, ...]): The names of the pipelines whose runs are cached.
+        max_bytes (int): The maximum total size of the stored outputs.
+        max_age_days (float): The maximum age of a stored output since its last use.
+    """
+
+    ENABLED_ENV = "PLANT_RECO_NODE_CACHE"
+
+    def __init__(self, cache_dir: str = "data/09_cache", report_path: str = "data/08_reporting/node_cache.json",
+                 keep: int = 3, no_cache_tag: str = "no_cache", pipelines: Tuple[str, ...] = ("training",
+                                                                                             "data_profiling"),
+                 max_bytes: int = 1 << 30, max_age_days: float = 30):
+        """
+        Initialize the NodeCacheHook class.
+
+        Args:
+            cache_dir (str, optional): The directory of the cache, relative to the project path.
+            report_path (str, optional): The path of the hit/miss report, relative to the project path.
+            keep (int, optional): The number of cached outputs kept per node.
+            no_cache_tag (str, optional): The tag of the nodes which are never cached.
+            pipelines (Tuple[str, ...], optional): The names of the pipelines whose runs are cached.
+            max_bytes (int, optional): The maximum total size of the stored outputs.
+            max_age_days (float, optional): The maximum age of a stored output since its last use.
+        """
+        self.cache_dir = cache_dir
+        self.report_path = report_path
+        self.keep = keep
+        self.no_cache_tag = no_cache_tag
+        self.pipelines = tuple(pipelines)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._wrapped_nodes: Set[str] = set()
+        self._status_file: Path = None
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        return os.environ.get(self.ENABLED_ENV, "1").lower() not in ("0", "false", "no")
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any], pipeline: Pipeline) -> None:
+        self._active = self.enabled and (run_params.get("pipeline_name") or "__default__") in self.pipelines
+        if not self._active:
+            return
+
+        project_path = Path(run_params["project_path"])
+        cache_dir = project_path / self.cache_dir
+        (cache_dir / "_runs").mkdir(parents=True, exist_ok=True)
+        self._status_file = cache_dir / "_runs" / f"{run_params['session_id']}.jsonl"
+
+        for node in pipeline.nodes:
+            if self.no_cache_tag in node.tags or inspect.isgeneratorfunction(inspect.unwrap(node.func)):
+                continue
+            if isinstance(node.func, MemoizedNodeFunction):
+                continue
+            self._wrapped_nodes.add(node.name)
+            _set_node_func(node, MemoizedNodeFunction(node.func, node.name, cache_dir / node.name,
+                                                      self._status_file, self.keep))
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any], pipeline: Pipeline) -> None:
+        if not self._active:
+            return
+
+        self._restore(pipeline)
+        self._evict(Path(run_params["project_path"]) / self.cache_dir)
+        statuses = self._read_statuses()
+        report = {node.name: statuses.get(node.name, "not_cached") for node in pipeline.nodes}
+        hits = sum(status == "hit" for status in report.values())
+        logger.info("Node cache: %d hit(s), %d miss(es)", hits,
+                    sum(status == "miss" for status in report.values()))
+
+        report_path = Path(run_params["project_path"]) / self.report_path
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf8") as file:
+            json.dump({"session_id": run_params["session_id"], "nodes": report}, file, indent=2)
+
+    @hook_impl
+    def on_pipeline_error(self, pipeline: Pipeline) -> None:
+        if self._active:
+            self._restore(pipeline)
+            self._read_statuses()
+
+    def _restore(self, pipeline: Pipeline) -> None:
+        """
+        Remove the MemoizedNodeFunction wrappers from the nodes, keeping the wrappers of other hooks.
+
+        Args:
+            pipeline (Pipeline): The pipeline which was run.
+        """
+        for node in pipeline.nodes:
+            if node.name in self._wrapped_nodes:
+                _remove_node_wrapper(node, MemoizedNodeFunction)
+        self._wrapped_nodes.clear()
+        self._active = False
+
+    def _evict(self, cache_dir: Path) -> None:
+        """
+        Remove the stored outputs unused for more than max_age_days, then the least recently used ones
+        beyond max_bytes (a hit refreshes the modification time of an output).
+
+        Args:
+            cache_dir (Path): The directory of the cache.
+        """
+        entries = []
+        for path in cache_dir.glob("*/*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+
+        oldest_mtime = time.time() - self.max_age_days * 86400
+        total_bytes, n_evicted = 0, 0
+        for mtime, size, path in entries:
+            total_bytes += size
+            if mtime < oldest_mtime or total_bytes > self.max_bytes:
+                path.unlink(missing_ok=True)
+                n_evicted += 1
+        if n_evicted:
+            logger.info("Node cache: %d stored output(s) evicted", n_evicted)
+
+    def _read_statuses(self) -> Dict[str, str]:
+        """
+        Read and remove the status file of the run.
+
+        Returns:
+            Dict[str, str]: The hit/miss status of each node which ran.
+        """
+        statuses = {}
+        if self._status_file is not None and self._status_file.exists():
+            lines: List[str] = self._status_file.read_text(encoding="utf8").splitlines()
+            for line in lines:
+                record = json.loads(line)
+                statuses[record["node"]] = record["status"]
+            self._status_file.unlink()
+        return statuses
+
+
+class ProfiledNodeFunction:
+    """
+    A node function wrapper which profiles each call and writes the collapsed stacks
+    and the hotspot table of the node.
+
+    Attributes:
+        func (Callable): The original node function.
+        node_name (str): The name of the node.
+        profiler (str): The name of the profiler, 'sampling' or 'deterministic'.
+        output_dir (Path): The directory of the reports.
+        top_n (int): The number of functions in the hotspot table.
+        interval (float): The sampling interval in seconds, for the sampling profiler.
+    """
+
+    def __init__(self, func: Callable, node_name: str, profiler: str, output_dir: Path, top_n: int, interval: float):
+        """
+        Initialize the ProfiledNodeFunction class.
+
+        Args:
+            func (Callable): The original node function.
+            node_name (str): The name of the node.
+            profiler (str): The name of the profiler, 'sampling' or 'deterministic'.
+            output_dir (Path): The directory of the reports.
+            top_n (int): The number of functions in the hotspot table.
+            interval (float): The sampling interval in seconds, for the sampling profiler.
+        """
+        self.func = func
+        self.node_name = node_name
+        self.profiler = profiler
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.interval = interval
+        self.__name__ = getattr(func, "__name__", node_name)
+        self.__wrapped__ = func
+
+    def __call__(self, *args, **kwargs) -> Any:
+        profiler = PROFILERS[self.profiler](self.interval) if self.profiler == "sampling" else PROFILERS[self.profiler]()
+        with profiler:
+            outputs = self.func(*args, **kwargs)
+        profiler.write(self.output_dir, self.node_name, self.top_n)
+        logger.info("Profile of '%s' written to %s", self.node_name, self.output_dir)
+        return outputs
+
+
+class ProfilingHook:
+    """
+    Opt-in function-level profiling of pipeline runs, configured with environment variables:
+
+    - PLANT_RECO_PROFILE: the comma-separated names of the nodes to profile, or 'all' for every node of the run.
+    - PLANT_RECO_PROFILER: 'sampling' (default) or 'deterministic'.
+    - PLANT_RECO_PROFILE_INTERVAL: the sampling interval in seconds (default 0.005).
+    - PLANT_RECO_PROFILE_TOP: the number of functions in the hotspot tables (default 30).
+
+    For each profiled node, ``<node>.collapsed`` (flamegraph input) and ``<node>_hotspots.txt``
+    are written to the output directory. When PLANT_RECO_PROFILE is not set, no node is wrapped,
+    so the overhead is zero.
+
+    Example:
+    ::
+
+        PLANT_RECO_PROFILE=normalize_sunlight_node PLANT_RECO_PROFILER=deterministic kedro run --pipeline=training
+
+    Attributes:
+        output_dir (str): The directory of the reports, relative to the project path.
+    """
+
+    def __init__(self, output_dir: str = "data/08_reporting/profiles"):
+        """
+        Initialize the ProfilingHook class.
+
+        Args:
+            output_dir (str, optional): The directory of the reports, relative to the project path.
+        """
+        self.output_dir = output_dir
+        self._wrapped_nodes: Set[str] = set()
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any], pipeline: Pipeline) -> None:
+        selection = os.environ.get("PLANT_RECO_PROFILE", "").strip()
+        if not selection:
+            return
+
+        profiler = os.environ.get("PLANT_RECO_PROFILER", "sampling")
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {sorted(PROFILERS)}")
+        interval = float(os.environ.get("PLANT_RECO_PROFILE_INTERVAL", "0.005"))
+        top_n = int(os.environ.get("PLANT_RECO_PROFILE_TOP", "30"))
+        output_dir = Path(run_params["project_path"]) / self.output_dir
+
+        node_names = {name.strip() for name in selection.split(",")}
+        for node in pipeline.nodes:
+            if "all" not in node_names and node.name not in node_names:
+                continue
+            self._wrapped_nodes.add(node.name)
+            _set_node_func(node, ProfiledNodeFunction(node.func, node.name, profiler, output_dir, top_n, interval))
+
+        unknown = node_names - {node.name for node in pipeline.nodes} - {"all"}
+        if unknown:
+            logger.warning("No node to profile named %s in this pipeline", sorted(unknown))
+        if self._wrapped_nodes and os.environ.get(NodeCacheHook.ENABLED_ENV, "1") != "0":
+            logger.warning("Cached nodes are not executed hence not profiled: set %s=0 to profile them",
+                           NodeCacheHook.ENABLED_ENV)
+
+    @hook_impl
+    def after_pipeline_run(self, pipeline: Pipeline) -> None:
+        self._restore(pipeline)
+
+    @hook_impl
+    def on_pipeline_error(self, pipeline: Pipeline) -> None:
+        self._restore(pipeline)
+
+    def _restore(self, pipeline: Pipeline) -> None:
+        """
+        Remove the ProfiledNodeFunction wrappers from the nodes, keeping the wrappers of other hooks.
+
+        Args:
+            pipeline (Pipeline): The pipeline which was run.
+        """
+        for node in pipeline.nodes:
+            if node.name in self._wrapped_nodes:
+                _remove_node_wrapper(node, ProfiledNodeFunction)
+        self._wrapped_nodes.clear()
+
+
+class _ReplacedDatasetFilter(logging.Filter):
+    """
+    A filter of the catalog logger dropping its warnings of the replacement of the given datasets, and only these:
+    the other records of the catalog are kept, at its own level.
+
+    Attributes:
+        names (Set[str]): The names of the replaced datasets.
+    """
+
+    def __init__(self, names: Set[str]):
+        """
+        Initialize the _ReplacedDatasetFilter class.
+
+        Args:
+            names (Set[str]): The names of the replaced datasets.
+        """
+        super().__init__()
+        self.names = names
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (record.msg == "Replacing dataset '%s'" and record.args and record.args[0] in self.names)
+
+
+class PrefetchingDataset(AbstractDataset):
+    """
+    A catalog dataset wrapper which can load its dataset in the background: the first load after a prefetch
+    returns the prefetched data, waiting only for what is left of the load.
+
+    A prefetched value is handed to a single load, the next ones load the dataset again
+    (or a new prefetch), so that a node mutating its input cannot affect another node.
+
+    Attributes:
+        dataset (AbstractDataset): The wrapped dataset.
+        name (str): The name of the dataset in the catalog.
+    """
+
+    def __init__(self, dataset: AbstractDataset, name: str, executor: ThreadPoolExecutor, stats: List[Dict[str, Any]]):
+        """
+        Initialize the PrefetchingDataset class.
+
+        Args:
+            dataset (AbstractDataset): The wrapped dataset.
+            name (str): The name of the dataset in the catalog.
+            executor (ThreadPoolExecutor): The thread pool of the prefetches.
+            stats (List[Dict[str, Any]]): The timings of the loads, appended to by each load.
+        """
+        self.dataset = dataset
+        self.name = name
+        self._executor = executor
+        self._stats = stats
+        self._future: Future = None
+        self._lock = threading.Lock()
+
+    def _timed_load(self) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        data = self.dataset.load()
+        return data, time.perf_counter() - start
+
+    def prefetch(self) -> None:
+        """
+        Start loading the dataset in the background, unless a prefetch is already pending
+        or the dataset was unpickled without the thread pool.
+        """
+        with self._lock:
+            if self._future is None and self._executor is not None:
+                self._future = self._executor.submit(self._timed_load)
+
+    def _load(self) -> Any:
+        with self._lock:
+            future, self._future = self._future, None
+        start = time.perf_counter()
+        if future is None:
+            data, load_seconds = self._timed_load()
+        else:
+            data, load_seconds = future.result()
+        self._stats.append({"dataset": self.name, "prefetched": future is not None, "load_seconds": load_seconds,
+                            "wait_seconds": time.perf_counter() - start})
+        return data
+
+    def _save(self, data: Any) -> None:
+        with self._lock:
+            # a pending prefetch would return the previous content
+            if self._future is not None:
+                self._future.cancel()
+            self._future = None
+        self.dataset.save(data)
+
+    def _exists(self) -> bool:
+        return self.dataset.exists()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._future = None
+        self.dataset.release()
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(dataset=self.dataset._describe())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # pickled (e.g. for the subprocesses of the ParallelRunner) without the thread pool: it loads when asked.
+        # A load still running when the subprocesses are forked could leave them a lock it holds: it is waited for
+        with self._lock:
+            future = self._future
+        if future is not None:
+            wait([future])
+        return {"dataset": self.dataset, "name": self.name, "_stats": []}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state, _executor=None, _future=None, _lock=threading.Lock())
+
+
+class CatalogPrefetchHook:
+    """
+    Concurrent loading of the datasets of a run on a thread pool, instead of one after another
+    when each node starts.
+
+    - The free inputs of the pipeline (e.g. nearest_neighbors, recommendation_preprocessor,
+      recommendation_dataset and user_data for inference) are all prefetched as soon as the run starts,
+      so that the first node waits for the slowest of them rather than for their sum, and the inputs
+      of downstream nodes load while upstream nodes run.
+    - A persisted dataset saved by a node is prefetched again right after its save,
+      and after each load while other nodes still have to load it.
+
+    Parameters and MemoryDatasets are already in memory and are not wrapped. The ParallelRunner pickles the
+    catalog for its subprocesses, which receive the wrapped datasets and load them themselves: the prefetches
+    of the main process would be wasted, so the prefetching should be disabled for its runs.
+
+    The wall time the nodes actually waited for the loads is logged and written to a report after the run.
+    The background loads compete with the nodes and with each other, so their own durations do not tell the time
+    saved: with PLANT_RECO_PREFETCH_BASELINE=1, each prefetched dataset is loaded again after the run, serially
+    in the main thread, and the time saved is this serial load time (times the number of loads of the dataset)
+    minus the waited time.
+
+    The prefetching can be disabled for a run with the environment variable PLANT_RECO_PREFETCH=0
+    (e.g. ``PLANT_RECO_PREFETCH=0 kedro run --runner=ParallelRunner``), or for every run with
+    ``CatalogPrefetchHook(enabled=False)`` in settings.py, and the number of loading threads set with
+    PLANT_RECO_PREFETCH_WORKERS (default 4).
+
+    Attributes:
+        report_path (str): The path of the load timings report, relative to the project path.
+    """
+
+    ENABLED_ENV = "PLANT_RECO_PREFETCH"
+    BASELINE_ENV = "PLANT_RECO_PREFETCH_BASELINE"
+
+    def __init__(self, report_path: str = "data/08_reporting/catalog_prefetch.json", enabled: bool = True):
+        """
+        Initialize the CatalogPrefetchHook class.
+
+        Args:
+            report_path (str, optional): The path of the load timings report, relative to the project path.
+            enabled (bool, optional): Whether the datasets are prefetched, unless disabled by PLANT_RECO_PREFETCH.
+        """
+        self.report_path = report_path
+        self._enabled = enabled
+        self._executor: ThreadPoolExecutor = None
+        self._datasets: Dict[str, PrefetchingDataset] = {}
+        self._remaining_loads: Dict[str, int] = {}
+        self._stats: List[Dict[str, Any]] = []
+        self._start: float = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and os.environ.get(self.ENABLED_ENV, "1").lower() not in ("0", "false", "no")
+
+    @hook_impl
+    def before_pipeline_run(self, pipeline: Pipeline, catalog: DataCatalog) -> None:
+        if not self.enabled:
+            return
+
+        self._executor = ThreadPoolExecutor(max_workers=int(os.environ.get("PLANT_RECO_PREFETCH_WORKERS", "4")),
+                                            thread_name_prefix="catalog-prefetch")
+        self._datasets, self._stats, self._start = {}, [], time.perf_counter()
+        self._remaining_loads = {name: sum(name in node.inputs for node in pipeline.nodes)
+                                 for name in pipeline.datasets()}
+        # the catalog warns of each replaced dataset, which is the point here: these warnings only are dropped
+        replaced_filter = _ReplacedDatasetFilter(set())
+        catalog_logger = logging.getLogger(DataCatalog.__module__)
+        catalog_logger.addFilter(replaced_filter)
+        catalog_names = set(catalog.list())
+        try:
+            for name in sorted(pipeline.datasets()):
+                if name.startswith("params:") or name == "parameters" or name not in catalog_names:
+                    continue
+                dataset = catalog.datasets[name]
+                if isinstance(dataset, MemoryDataset) or not self._remaining_loads[name]:
+                    continue
+                self._datasets[name] = PrefetchingDataset(dataset, name, self._executor, self._stats)
+                replaced_filter.names.add(name)
+                catalog.add(name, self._datasets[name], replace=True)
+        finally:
+            catalog_logger.removeFilter(replaced_filter)
+
+        for name in sorted(pipeline.inputs()):
+            if name in self._datasets:
+                self._datasets[name].prefetch()
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str) -> None:
+        if dataset_name in self._datasets:
+            self._remaining_loads[dataset_name] -= 1
+            if self._remaining_loads[dataset_name] > 0:
+                self._datasets[dataset_name].prefetch()
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str) -> None:
+        if dataset_name in self._datasets and self._remaining_loads[dataset_name] > 0:
+            self._datasets[dataset_name].prefetch()
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        if self._executor is None:
+            return
+
+        run_seconds = time.perf_counter() - self._start
+        datasets = self._datasets
+        self._shutdown()
+        stats = list(self._stats)
+        load_seconds = sum(record["load_seconds"] for record in stats)
+        wait_seconds = sum(record["wait_seconds"] for record in stats)
+        serial_load_seconds = self._serial_load_seconds(datasets, stats) if self.baseline else None
+        if serial_load_seconds is None:
+            logger.info("Catalog prefetch: %d load(s) waited %.3fs by the nodes (%.3fs in the background), "
+                        "set %s=1 to measure the time saved", len(stats), wait_seconds, load_seconds, self.BASELINE_ENV)
+        else:
+            logger.info("Catalog prefetch: %d load(s) waited %.3fs by the nodes, against %.3fs loaded serially "
+                        "(%.3fs saved)", len(stats), wait_seconds, serial_load_seconds,
+                        serial_load_seconds - wait_seconds)
+
+        report_path = Path(run_params["project_path"]) / self.report_path
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf8") as file:
+            json.dump({"session_id": run_params["session_id"], "run_seconds": run_seconds,
+                       "load_seconds": load_seconds, "wait_seconds": wait_seconds,
+                       "serial_load_seconds": serial_load_seconds,
+                       "saved_seconds": None if serial_load_seconds is None else serial_load_seconds - wait_seconds,
+                       "loads": stats}, file, indent=2)
+
+    @property
+    def baseline(self) -> bool:
+        return os.environ.get(self.BASELINE_ENV, "0").lower() not in ("0", "false", "no")
+
+    @staticmethod
+    def _serial_load_seconds(datasets: Dict[str, PrefetchingDataset], stats: List[Dict[str, Any]]) -> float:
+        """
+        Measure the time the loads of a run would have taken without prefetching: each dataset is loaded
+        once more, serially in the calling thread, and counted as many times as it was loaded during the run.
+        Being loaded again, the datasets no longer pay the one-time costs of a first load (imports, cold file cache).
+
+        Args:
+            datasets (Dict[str, PrefetchingDataset]): The prefetched datasets, by name.
+            stats (List[Dict[str, Any]]): The timings of the loads of the run.
+
+        Returns:
+            float: The serial load time in seconds.
+        """
+        serial_load_seconds = 0.0
+        for name in sorted({record["dataset"] for record in stats}):
+            start = time.perf_counter()
+            datasets[name].dataset.load()
+            n_loads = sum(record["dataset"] == name for record in stats)
+            serial_load_seconds += n_loads * (time.perf_counter() - start)
+        return serial_load_seconds
+
+    @hook_impl
+    def on_pipeline_error(self) -> None:
+        if self._executor is not None:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        """
+        Stop the loading threads, dropping the prefetches which were not consumed.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._datasets, self._remaining_loads = {}, {}
@@ -3,8 +3,12 @@ from __future__ import annotations
 
 from kedro.pipeline import Pipeline
 from .pipelines.data_processing.pipeline import create_data_processing_pipeline
-from .pipelines.training.pipeline import create_training_pipeline
-from .pipelines.predict.pipeline import create_inference_pipeline
+from .pipelines.training.pipeline import (create_training_pipeline, create_hyperparameter_sweep_pipeline,
+                                          create_streaming_training_pipeline)
+from .pipelines.predict.pipeline import create_inference_pipeline, create_similar_plants_pipeline
+from .pipelines.bulk_scoring.pipeline import create_bulk_scoring_pipeline
+from .pipelines.benchmark.pipeline import create_benchmark_pipeline
+from .pipelines.data_profiling.pipeline import create_data_profiling_pipeline
 
 
 def register_pipelines() -> dict[str, Pipeline]:
@@ -15,8 +19,20 @@ def register_pipelines() -> dict[str, Pipeline]:
     """
     data_processing_pipeline = create_data_processing_pipeline()
     training_pipeline = create_training_pipeline()
+    hyperparameter_sweep_pipeline = create_hyperparameter_sweep_pipeline()
+    streaming_training_pipeline = create_streaming_training_pipeline()
     inference_pipeline = create_inference_pipeline()
+    similar_plants_pipeline = create_similar_plants_pipeline()
+    bulk_scoring_pipeline = create_bulk_scoring_pipeline()
+    benchmark_pipeline = create_benchmark_pipeline()
+    data_profiling_pipeline = create_data_profiling_pipeline()
 
     return {'inference': inference_pipeline,
-            'training': data_processing_pipeline + training_pipeline,
+            'training': data_processing_pipeline + training_pipeline + data_profiling_pipeline,
+            'training_streaming': streaming_training_pipeline,
+            'hyperparameter_sweep': hyperparameter_sweep_pipeline,
+            'similar_plants': similar_plants_pipeline,
+            'bulk_scoring': bulk_scoring_pipeline,
+            'benchmark': benchmark_pipeline,
+            'data_profiling': data_profiling_pipeline,
             '__default__': inference_pipeline}
@@ -0,0 +1,4 @@
+from .pipeline import create_benchmark_pipeline
+
+__all__ = ["create_benchmark_pipeline"]
+__version__ = "0.1"
@@ -0,0 +1,245 @@
+import time
+import numpy as np
+import pandas as pd
+
+from typing import Any, Callable, Dict
+from sklearn.neighbors import NearestNeighbors
+from sklearn.compose import ColumnTransformer
+
+from ...recommender.deduplicated_knn import DeduplicatedKNN
+from ...recommender.exact_knn import ExactKNN
+from ...recommender.packed_knn import PackedKNN, preprocessor_columns
+from ...recommender.paging import RecommendationPager
+from ...recommender.sharded_knn import ShardedKNN, assign_shards
+from ..predict.nodes import recommand_plant
+
+
+def best_time(func: Callable[[], Any], n_repeats: int) -> float:
+    """
+    Measure the best wall-clock time of a function over several runs.
+
+    Args:
+        func (Callable[[], Any]): The function to time.
+        n_repeats (int): The number of runs.
+
+    Returns:
+        float: The best time, in seconds.
+    """
+    timings = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sample_queries(X_transformed: np.ndarray, n_queries: int, random_state: int) -> np.ndarray:
+    """
+    Sample benchmark queries among the plants: real feature vectors, like user profiles.
+
+    Args:
+        X_transformed (np.ndarray): The preprocessed feature matrix of the plants.
+        n_queries (int): The number of queries.
+        random_state (int): The seed of the sampling.
+
+    Returns:
+        np.ndarray: The queries.
+    """
+    rng = np.random.default_rng(random_state)
+    return X_transformed[rng.integers(0, len(X_transformed), size=n_queries)]
+
+
+def index_nbytes(engine: Any) -> int:
+    """
+    Compute the memory used by the plant matrix of a fitted nearest neighbors engine.
+
+    Args:
+        engine (Any): The fitted engine.
+
+    Returns:
+        int: The number of bytes.
+    """
+    if isinstance(engine, ShardedKNN):
+        return sum(index_nbytes(shard_engine) for shard_engine in engine.shard_engines_)
+    if isinstance(engine, DeduplicatedKNN):
+        return index_nbytes(engine.engine) + engine.postings.nbytes + engine.indptr.nbytes
+    if isinstance(engine, PackedKNN):
+        return engine.nbytes()
+    if isinstance(engine, ExactKNN):
+        return engine._fit_X.nbytes + engine._squared_norms32.nbytes
+    return engine._fit_X.nbytes
+
+
+def benchmark_knn_engines(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, n_neighbors: int,
+                          n_queries: int, n_repeats: int, random_state: int) -> Dict[str, Any]:
+    """
+    Compare the exact blocked GEMM and bit-packed engines and the duplicate-vector collapsing wrapper
+    with sklearn's NearestNeighbors, on batch and single queries.
+
+    Args:
+        X (pd.DataFrame): The feature matrix.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        n_neighbors (int): The number of neighbors.
+        n_queries (int): The number of queries of the batch.
+        n_repeats (int): The number of timed runs, the best one is kept.
+        random_state (int): The seed of the query sampling.
+
+    Returns:
+        Dict[str, Any]: The timings and memory of each engine and the agreement of their results with sklearn.
+    """
+    X_transformed = np.asarray(fitted_preprocessor.transform(X), dtype=np.float64)
+    queries = sample_queries(X_transformed, n_queries, random_state)
+    engines = {'sklearn': NearestNeighbors(n_neighbors=n_neighbors).fit(X_transformed),
+               'exact': ExactKNN(n_neighbors=n_neighbors).fit(X_transformed),
+               'packed': PackedKNN(n_neighbors=n_neighbors,
+                                   columns=preprocessor_columns(fitted_preprocessor, X.dtypes)).fit(X_transformed),
+               'deduplicated': DeduplicatedKNN(NearestNeighbors(n_neighbors=n_neighbors),
+                                               n_neighbors=n_neighbors).fit(X_transformed)}
+
+    report = {'n_plants': int(X_transformed.shape[0]), 'n_features': int(X_transformed.shape[1]),
+              'n_queries': int(n_queries), 'n_neighbors': int(n_neighbors), 'engines': {}}
+    sklearn_distances, sklearn_indices = engines['sklearn'].kneighbors(queries)
+    for name, engine in engines.items():
+        batch_seconds = best_time(lambda: engine.kneighbors(queries), n_repeats)
+        single_seconds = best_time(lambda: engine.kneighbors(queries[:1]), n_repeats * 10)
+        distances, indices = engine.kneighbors(queries)
+        report['engines'][name] = {'batch_seconds': batch_seconds,
+                                   'queries_per_second': n_queries / batch_seconds,
+                                   'single_query_ms': 1000 * single_seconds,
+                                   'index_bytes': int(index_nbytes(engine)),
+                                   'max_distance_difference': float(np.abs(sklearn_distances - distances).max()),
+                                   # with tied distances, engines may legitimately return different plants
+                                   # at the k-th rank
+                                   'same_neighbors_rate': float(np.mean([set(a) == set(b) for a, b
+                                                                          in zip(sklearn_indices, indices)]))}
+
+    report['engines']['deduplicated']['compression_ratio'] = engines['deduplicated'].compression_ratio
+    for name, engine_report in report['engines'].items():
+        engine_report['batch_speedup'] = report['engines']['sklearn']['batch_seconds'] / engine_report['batch_seconds']
+
+    return report
+
+
+def benchmark_sharding(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, plants_dataset: pd.DataFrame,
+                       n_neighbors: int, shardings: Dict[str, Dict[str, Any]], n_queries: int, n_repeats: int,
+                       random_state: int) -> Dict[str, Any]:
+    """
+    Measure the latency of each shard and of the scatter-gather merged query of sharded indexes,
+    against a single global index.
+
+    Args:
+        X (pd.DataFrame): The feature matrix.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        plants_dataset (pd.DataFrame): The recommendation dataset, aligned with X, holding the shard keys.
+        n_neighbors (int): The number of neighbors.
+        shardings (Dict[str, Dict[str, Any]]): The sharding configurations to compare, by name
+            ('strategy', 'column' and 'n_shards', as params:KNN_SHARDING).
+        n_queries (int): The number of queries of the batch.
+        n_repeats (int): The number of timed runs, the best one is kept.
+        random_state (int): The seed of the query sampling.
+
+    Returns:
+        Dict[str, Any]: The timings of the global index, and for each sharding the size and timings of its shards,
+        its merged timings and the agreement of its results with the global index.
+    """
+    X_transformed = np.asarray(fitted_preprocessor.transform(X), dtype=np.float64)
+    queries = sample_queries(X_transformed, n_queries, random_state)
+    global_index = NearestNeighbors(n_neighbors=n_neighbors).fit(X_transformed)
+    global_distances, global_indices = global_index.kneighbors(queries)
+
+    report = {'n_plants': int(X_transformed.shape[0]), 'n_queries': int(n_queries), 'n_neighbors': int(n_neighbors),
+              'global': {'batch_seconds': best_time(lambda: global_index.kneighbors(queries), n_repeats),
+                         'single_query_ms': 1000 * best_time(lambda: global_index.kneighbors(queries[:1]),
+                                                             n_repeats * 10)},
+              'shardings': {}}
+    for name, sharding in shardings.items():
+        shards = assign_shards(plants_dataset[sharding['column']].to_numpy(), sharding['strategy'],
+                               sharding.get('n_shards'))
+        with ShardedKNN(NearestNeighbors(n_neighbors=n_neighbors), n_neighbors=n_neighbors,
+                        n_jobs=sharding.get('n_jobs')).fit(X_transformed, shards) as index:
+            # per-shard timings, measured inside the scatter (best run of each shard)
+            batch_shard_seconds = np.min([[seconds for _, _, seconds in index.query_shards(queries)]
+                                          for _ in range(n_repeats)], axis=0)
+            single_shard_seconds = np.min([[seconds for _, _, seconds in index.query_shards(queries[:1])]
+                                           for _ in range(n_repeats * 10)], axis=0)
+            distances, indices = index.kneighbors(queries)
+            kth_distances = global_distances[:, -1:]
+            report['shardings'][name] = {
+                'n_shards': index.n_shards_,
+                'shards': [{'n_plants': int(len(positions)), 'batch_seconds': float(batch_seconds),
+                            'single_query_ms': float(1000 * single_seconds)}
+                           for positions, batch_seconds, single_seconds
+                           in zip(index.shard_positions_, batch_shard_seconds, single_shard_seconds)],
+                'merged_batch_seconds': best_time(lambda: index.kneighbors(queries), n_repeats),
+                'merged_single_query_ms': 1000 * best_time(lambda: index.kneighbors(queries[:1]), n_repeats * 10),
+                'max_distance_difference': float(np.abs(global_distances - distances).max()),
+                # the plants strictly closer than the k-th distance must be the same, the tied ones may differ
+                'same_closer_neighbors_rate': float(np.mean([
+                    set(a[a_distances < kth]) == set(b[b_distances < kth]) for a, b, a_distances, b_distances, kth
+                    in zip(global_indices, indices, global_distances, distances, kth_distances[:, 0])]))}
+
+    return report
+
+
+def benchmark_paging(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, nn: Any, plants_dataset: pd.DataFrame,
+                     n_recommendations: int, n_pages: int, prefetch_pages: int, n_queries: int,
+                     random_state: int) -> Dict[str, Any]:
+    """
+    Measure the latency of each page of a cursor-paged query, against a from-scratch query
+    returning all the plants up to the same page.
+
+    Args:
+        X (pd.DataFrame): The feature matrix, whose rows are used as user queries.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        nn (Any): The fitted nearest neighbors model.
+        plants_dataset (pd.DataFrame): The recommendation dataset the model was fitted on.
+        n_recommendations (int): The number of plants per page.
+        n_pages (int): The number of pages per query.
+        prefetch_pages (int): The number of pages fetched by the first search of the pager.
+        n_queries (int): The number of queries.
+        random_state (int): The seed of the query sampling.
+
+    Returns:
+        Dict[str, Any]: The median latency of each page, paged and from scratch, and the agreement of their distances.
+    """
+    plants_dataset = plants_dataset.reset_index(drop=True)
+    pager = RecommendationPager(nn, fitted_preprocessor, plants_dataset, prefetch_pages=prefetch_pages)
+    rng = np.random.default_rng(random_state)
+    queries = X.iloc[rng.integers(0, len(X), size=n_queries)]
+
+    paged_seconds = np.full((n_queries, n_pages), np.nan)
+    scratch_seconds = np.full((n_queries, n_pages), np.nan)
+    max_distance_difference = 0.0
+    for query_number in range(n_queries):
+        user_data = queries.iloc[[query_number]]
+        cursor, pages = None, []
+        for page_number in range(n_pages):
+            start = time.perf_counter()
+            if page_number == 0:
+                page, cursor = pager.first_page(user_data, n_recommendations)
+            else:
+                page, cursor = pager.next_page(cursor)
+            paged_seconds[query_number, page_number] = time.perf_counter() - start
+            pages.append(page)
+
+            start = time.perf_counter()
+            scratch = recommand_plant(user_data, nn, fitted_preprocessor, plants_dataset,
+                                      n_recommendations * (page_number + 1)).iloc[-n_recommendations:]
+            scratch_seconds[query_number, page_number] = time.perf_counter() - start
+
+            if len(page) == len(scratch):
+                max_distance_difference = max(max_distance_difference,
+                                              float(np.abs(page['_distance'].to_numpy()
+                                                           - scratch['_distance'].to_numpy()).max()))
+            if cursor is None:
+                break
+
+    paged_ms = 1000 * np.nanmedian(paged_seconds, axis=0)
+    scratch_ms = 1000 * np.nanmedian(scratch_seconds, axis=0)
+    return {'n_queries': int(n_queries), 'n_recommendations': int(n_recommendations),
+            'prefetch_pages': int(prefetch_pages),
+            'pages': [{'page': page_number + 1, 'paged_ms': float(paged_ms[page_number]),
+                       'from_scratch_ms': float(scratch_ms[page_number]),
+                       'speedup': float(scratch_ms[page_number] / paged_ms[page_number])}
+                      for page_number in range(n_pages)],
+            'max_distance_difference': max_distance_difference}
@@ -0,0 +1,49 @@
+from kedro.pipeline import Pipeline, node
+from .nodes import benchmark_knn_engines, benchmark_paging, benchmark_sharding
+
+
+def create_benchmark_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        node(func=benchmark_knn_engines,
+             inputs=dict(X="X",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         n_neighbors="params:K_NEIGHBORS",
+                         n_queries="params:BENCHMARK_N_QUERIES",
+                         n_repeats="params:BENCHMARK_N_REPEATS",
+                         random_state="params:BENCHMARK_RANDOM_STATE"),
+             outputs="knn_benchmark",
+             name="benchmark_knn_engines_node",
+             tags="no_cache"
+             ),
+
+        node(func=benchmark_sharding,
+             inputs=dict(X="X",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         plants_dataset="recommendation_dataset",
+                         n_neighbors="params:K_NEIGHBORS",
+                         shardings="params:BENCHMARK_SHARDINGS",
+                         n_queries="params:BENCHMARK_N_QUERIES",
+                         n_repeats="params:BENCHMARK_N_REPEATS",
+                         random_state="params:BENCHMARK_RANDOM_STATE"),
+             outputs="sharding_benchmark",
+             name="benchmark_sharding_node",
+             tags="no_cache"
+             ),
+
+        node(func=benchmark_paging,
+             inputs=dict(X="X",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         nn="nearest_neighbors",
+                         plants_dataset="recommendation_dataset",
+                         n_recommendations="params:N_RECOMMENDATIONS",
+                         n_pages="params:BENCHMARK_N_PAGES",
+                         prefetch_pages="params:PAGING_PREFETCH_PAGES",
+                         n_queries="params:BENCHMARK_PAGING_N_QUERIES",
+                         random_state="params:BENCHMARK_RANDOM_STATE"),
+             outputs="paging_benchmark",
+             name="benchmark_paging_node",
+             tags="no_cache"
+             ),
+    ])
+
+    return pipeline
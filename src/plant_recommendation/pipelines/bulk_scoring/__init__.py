@@ -0,0 +1,4 @@
+from .pipeline import create_bulk_scoring_pipeline
+
+__all__ = ["create_bulk_scoring_pipeline"]
+__version__ = "0.1"
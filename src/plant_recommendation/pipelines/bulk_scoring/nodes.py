@@ -0,0 +1,133 @@
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator
+from threadpoolctl import threadpool_limits
+
+from ...recommender.bundle import ModelBundle
+
+# Model of the worker processes, loaded once per process by the pool initializer
+_WORKER_MODEL = {}
+
+
+def _init_worker(model_path: str, n_neighbors: int, user_id_col: str) -> None:
+    """
+    Load the model in a worker process, from the file written by the parent process: the model is read
+    once per process rather than sent with every chunk, whatever the start method of the processes
+    ('fork', 'spawn' or 'forkserver').
+
+    Args:
+        model_path (str): The path of the pickled Nearest Neighbors model, preprocessor and plant ids.
+        n_neighbors (int): The number of plants to recommend to each user.
+        user_id_col (str): The name of the column representing the user ID.
+    """
+    # one BLAS/OpenMP thread per process: the parallelism comes from the processes
+    threadpool_limits(1)
+    with open(model_path, "rb") as file:
+        nn, preprocessor, plant_ids = pickle.load(file)
+    _WORKER_MODEL.update(nn=nn, preprocessor=preprocessor, plant_ids=plant_ids,
+                         n_neighbors=n_neighbors, user_id_col=user_id_col)
+
+
+def score_chunk(user_chunk: pd.DataFrame, first_row: int) -> pd.DataFrame:
+    """
+    Recommend plants to a chunk of users, in a worker process.
+
+    Args:
+        user_chunk (pd.DataFrame): A chunk of the user profiles.
+        first_row (int): The position of the first user of the chunk in the user file.
+
+    Returns:
+        pd.DataFrame: One row per (user, recommended plant), with the rank and the distance.
+    """
+    nn, preprocessor = _WORKER_MODEL["nn"], _WORKER_MODEL["preprocessor"]
+    n_neighbors, user_id_col = _WORKER_MODEL["n_neighbors"], _WORKER_MODEL["user_id_col"]
+
+    features = user_chunk[list(preprocessor.feature_names_in_)]
+    distances, indices = nn.kneighbors(preprocessor.transform(features), n_neighbors=n_neighbors)
+
+    n_users, n_neighbors = indices.shape
+    user_rows = np.arange(first_row, first_row + n_users)
+    scores = pd.DataFrame({'user_row': np.repeat(user_rows, n_neighbors),
+                           'rank': np.tile(np.arange(1, n_neighbors + 1), n_users),
+                           'plant_id': _WORKER_MODEL["plant_ids"][indices.ravel()],
+                           '_distance': distances.ravel()})
+    if user_id_col in user_chunk.columns:
+        scores.insert(0, user_id_col, np.repeat(user_chunk[user_id_col].to_numpy(), n_neighbors))
+
+    return scores
+
+
+def score_user_profiles(user_profiles: Iterator[pd.DataFrame], bundle: ModelBundle, id_col: str, user_id_col: str,
+                        n_neighbors: int, n_workers: int, max_pending_chunks: int) -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Recommend plants to every user of a large user profiles file, with the components of a model bundle,
+    so that the preprocessor, the Nearest Neighbors model and the plant ids always come from the same training.
+
+    The file is read in chunks, the chunks are scored by a pool of processes each loading the model once
+    from a temporary file, and the scores are yielded chunk by chunk to be written as Parquet partitions. At most
+    max_pending_chunks chunks are read ahead, so the memory stays bounded whatever the file size.
+
+    Args:
+        user_profiles (Iterator[pd.DataFrame]): The user profiles, read in chunks.
+        bundle (ModelBundle): The model bundle.
+        id_col (str): The name of the column representing the plant ID.
+        user_id_col (str): The name of the column representing the user ID, kept if present in the file.
+        n_neighbors (int): The number of plants to recommend to each user, the fitted number if None.
+        n_workers (int): The number of processes, the number of CPUs if None.
+        max_pending_chunks (int): The maximum number of chunks read and not yet written.
+
+    Yields:
+        Dict[str, pd.DataFrame]: The partition of the scores of each chunk, under a directory per scoring run.
+    """
+    scoring_run = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H.%M.%S")
+    n_workers = n_workers or os.cpu_count()
+    max_pending_chunks = max(max_pending_chunks, n_workers)
+    plant_ids = bundle.plants_dataset[id_col].to_numpy()
+
+    with tempfile.TemporaryDirectory(prefix="bulk_scoring_") as model_dir:
+        model_path = Path(model_dir) / "model.pickle"
+        with open(model_path, "wb") as file:
+            pickle.dump((bundle.nn, bundle.preprocessor, plant_ids), file, protocol=pickle.HIGHEST_PROTOCOL)
+        yield from _score_chunks(user_profiles, str(model_path), n_neighbors, user_id_col, n_workers,
+                                 max_pending_chunks, scoring_run)
+
+
+def _score_chunks(user_profiles: Iterator[pd.DataFrame], model_path: str, n_neighbors: int, user_id_col: str,
+                  n_workers: int, max_pending_chunks: int, scoring_run: str) -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Score the chunks of the user profiles in a pool of processes, keeping at most max_pending_chunks chunks in flight.
+
+    Args:
+        user_profiles (Iterator[pd.DataFrame]): The user profiles, read in chunks.
+        model_path (str): The path of the pickled Nearest Neighbors model, preprocessor and plant ids.
+        n_neighbors (int): The number of plants to recommend to each user, the fitted number if None.
+        user_id_col (str): The name of the column representing the user ID, kept if present in the file.
+        n_workers (int): The number of processes.
+        max_pending_chunks (int): The maximum number of chunks read and not yet written.
+        scoring_run (str): The name of the directory of the scoring run.
+
+    Yields:
+        Dict[str, pd.DataFrame]: The partition of the scores of each chunk.
+    """
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(model_path, n_neighbors, user_id_col)) as executor:
+        pending = deque()
+        first_row = 0
+        for chunk_number, user_chunk in enumerate(user_profiles):
+            pending.append((chunk_number, executor.submit(score_chunk, user_chunk, first_row)))
+            first_row += len(user_chunk)
+            if len(pending) >= max_pending_chunks:
+                chunk_number, future = pending.popleft()
+                yield {f"{scoring_run}/part-{chunk_number:05d}": future.result()}
+
+        while pending:
+            chunk_number, future = pending.popleft()
+            yield {f"{scoring_run}/part-{chunk_number:05d}": future.result()}
@@ -0,0 +1,20 @@
+from kedro.pipeline import Pipeline, node
+from .nodes import score_user_profiles
+
+
+def create_bulk_scoring_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        node(func=score_user_profiles,
+             inputs=dict(user_profiles="user_profiles",
+                         bundle="model_bundle",
+                         id_col="params:ID_COL",
+                         user_id_col="params:USER_ID_COL",
+                         n_neighbors="params:BULK_SCORING_N_NEIGHBORS",
+                         n_workers="params:BULK_SCORING_N_WORKERS",
+                         max_pending_chunks="params:BULK_SCORING_MAX_PENDING_CHUNKS"),
+             outputs="bulk_recommendations",
+             name="score_user_profiles_node"
+             ),
+    ])
+
+    return pipeline
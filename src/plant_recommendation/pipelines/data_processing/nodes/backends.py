@@ -0,0 +1,156 @@
+# DATAFRAME BACKENDS
+
+import pandas as pd
+
+from abc import ABC, abstractmethod
+from typing import List, Union
+
+from .features_cleaning.clean_features import CleanFeatures
+
+try:
+    import polars as pl
+except ImportError:  # polars is only required by the 'polars' backend (pip install -e .[polars])
+    pl = None
+
+# the datasets flowing between the cleaning nodes: pandas DataFrames, or Polars LazyFrames with the polars backend
+DataFrameLike = Union[pd.DataFrame, "pl.LazyFrame"]
+
+
+class DataFrameBackend(ABC):
+    """
+    Abstract base class of the DataFrame backends of the cleaning pipeline: the operations the nodes need
+    on the datasets flowing between them, whatever their type.
+
+    Attributes:
+        name (str): The name of the backend, as set in params:DATAFRAME_BACKEND.
+    """
+
+    name = None
+
+    @abstractmethod
+    def from_pandas(self, dataset: pd.DataFrame) -> DataFrameLike:
+        """Convert a pandas DataFrame to a dataset of the backend."""
+
+    @abstractmethod
+    def to_pandas(self, dataset: DataFrameLike) -> pd.DataFrame:
+        """Compute a dataset of the backend as a pandas DataFrame."""
+
+    @abstractmethod
+    def columns(self, dataset: DataFrameLike) -> List[str]:
+        """Get the column names of a dataset."""
+
+    @abstractmethod
+    def select(self, dataset: DataFrameLike, columns: List[str]) -> DataFrameLike:
+        """Keep only some columns of a dataset."""
+
+    @abstractmethod
+    def drop(self, dataset: DataFrameLike, columns: List[str]) -> DataFrameLike:
+        """Remove some columns of a dataset."""
+
+    @abstractmethod
+    def concat_columns(self, datasets: List[DataFrameLike]) -> DataFrameLike:
+        """Concatenate the columns of datasets aligned on their rows."""
+
+    @abstractmethod
+    def clean(self, cleaner: CleanFeatures, dataset: DataFrameLike) -> DataFrameLike:
+        """Apply a feature cleaner to a dataset."""
+
+
+class PandasBackend(DataFrameBackend):
+    """
+    The eager pandas backend: every node computes its pandas DataFrame.
+    """
+
+    name = "pandas"
+
+    def from_pandas(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        return dataset
+
+    def to_pandas(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        return dataset
+
+    def columns(self, dataset: pd.DataFrame) -> List[str]:
+        return list(dataset.columns)
+
+    def select(self, dataset: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        return dataset[columns].copy()
+
+    def drop(self, dataset: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        return dataset.drop(columns=columns)
+
+    def concat_columns(self, datasets: List[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat(datasets, axis=1)
+
+    def clean(self, cleaner: CleanFeatures, dataset: pd.DataFrame) -> pd.DataFrame:
+        return cleaner.clean(dataset)
+
+
+class PolarsBackend(DataFrameBackend):
+    """
+    The lazy Polars backend: the nodes only extend Polars query plans (LazyFrame), which are collected
+    once at the end of the feature engineering. The whole cleaning chain then runs as a single optimized,
+    multi-threaded query plan, without row-wise Python calls.
+    """
+
+    name = "polars"
+
+    def __init__(self):
+        """
+        Initialize the PolarsBackend class.
+        """
+        if pl is None:
+            raise ImportError("The 'polars' DataFrame backend requires polars: pip install -e .[polars]")
+
+    def from_pandas(self, dataset: pd.DataFrame) -> "pl.LazyFrame":
+        return pl.from_pandas(dataset).lazy()
+
+    def to_pandas(self, dataset: "pl.LazyFrame") -> pd.DataFrame:
+        return dataset.collect().to_pandas()
+
+    def columns(self, dataset: "pl.LazyFrame") -> List[str]:
+        return dataset.collect_schema().names()
+
+    def select(self, dataset: "pl.LazyFrame", columns: List[str]) -> "pl.LazyFrame":
+        return dataset.select(columns)
+
+    def drop(self, dataset: "pl.LazyFrame", columns: List[str]) -> "pl.LazyFrame":
+        return dataset.drop(columns)
+
+    def concat_columns(self, datasets: List["pl.LazyFrame"]) -> "pl.LazyFrame":
+        return pl.concat(datasets, how="horizontal")
+
+    def clean(self, cleaner: CleanFeatures, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        return cleaner.clean_lazy(dataset)
+
+
+BACKENDS = {"pandas": PandasBackend, "polars": PolarsBackend}
+
+
+def get_backend(name: str) -> DataFrameBackend:
+    """
+    Get a DataFrame backend by name.
+
+    Args:
+        name (str): The name of the backend, 'pandas' or 'polars'.
+
+    Returns:
+        DataFrameBackend: The backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown DataFrame backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def backend_of(dataset: DataFrameLike) -> DataFrameBackend:
+    """
+    Get the backend of a dataset flowing between the cleaning nodes.
+
+    Args:
+        dataset (DataFrameLike): A pandas DataFrame or a Polars LazyFrame.
+
+    Returns:
+        DataFrameBackend: The backend of the dataset.
+    """
+    if pl is not None and isinstance(dataset, pl.LazyFrame):
+        return PolarsBackend()
+    return PandasBackend()
@@ -58,3 +58,29 @@ class CleanFeatureHardiness(CleanFeatures):
             cleaned_dataset = self.impute_with_file(cleaned_dataset, self.imputation_file, feature)
 
         return cleaned_dataset
+
+    def clean_lazy(self, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        """
+        Clean the 'hardiness' feature like clean, in a Polars query plan.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+
+        Returns:
+            pl.LazyFrame: The cleaned dataset.
+        """
+        import polars as pl
+
+        columns = dataset.collect_schema().names()
+        cleaned_dataset = dataset.rename({old: new for old, new in self.new_names.items() if old in columns})
+
+        # the levels are strings: like pandas' isin, numeric values never match them
+        cleaned_dataset = cleaned_dataset.with_columns(pl.col(self.max_col).cast(pl.String))
+        cleaned_dataset = self.replace_outliers_with_nan_lazy(cleaned_dataset, self.max_col, self.levels)
+        cleaned_dataset = cleaned_dataset.with_columns(
+            pl.col(self.max_col).cast(pl.Float64).fill_null(pl.col(self.min_col)))
+
+        for feature in [self.max_col, self.min_col]:
+            cleaned_dataset = self.impute_with_file_lazy(cleaned_dataset, self.imputation_file, feature)
+
+        return cleaned_dataset
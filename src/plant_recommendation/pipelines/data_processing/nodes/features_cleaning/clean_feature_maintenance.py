@@ -6,6 +6,9 @@ import pandas as pd
 from typing import List, Any
 from .clean_features import CleanFeatures
 
+# the maintenance levels imputed from the care levels and the watering frequencies, other values are kept as is
+CARE_LEVEL_TO_MAINTENANCE = {"medium": "moderate", "easy": "low"}
+WATERING_TO_MAINTENANCE = {"average": "moderate", "minimum": "low", "frequent": "high"}
 
 class CleanFeatureMaintenance(CleanFeatures):
     """
@@ -51,13 +54,7 @@ class CleanFeatureMaintenance(CleanFeatures):
         Returns:
             str: The imputed maintenance level.
         """
-        match care_level:
-            case "medium":
-                return "moderate"
-            case "easy":
-                return "low"
-            case _:
-                return care_level
+        return CARE_LEVEL_TO_MAINTENANCE.get(care_level, care_level)
 
     def impute_with_watering_frequency(self, watering_frequency: str) -> str:
         """
@@ -69,15 +66,7 @@ class CleanFeatureMaintenance(CleanFeatures):
         Returns:
             str: The imputed maintenance level.
         """
-        match watering_frequency:
-            case "average":
-                return "moderate"
-            case "minimum":
-                return "low"
-            case "frequent":
-                return "high"
-            case _:
-                return watering_frequency
+        return WATERING_TO_MAINTENANCE.get(watering_frequency, watering_frequency)
 
     def impute_with_feature(self, value_to_impute: Any, feature: str) -> Any:
         """
@@ -137,3 +126,29 @@ class CleanFeatureMaintenance(CleanFeatures):
         cleaned_dataset = self.impute(cleaned_dataset)
 
         return cleaned_dataset
+
+    def clean_lazy(self, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        """
+        Clean the 'maintenance' feature like clean, in a Polars query plan.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+
+        Returns:
+            pl.LazyFrame: The cleaned dataset.
+        """
+        import polars as pl
+
+        cleaned_dataset = self.replace_outliers_with_nan_lazy(
+            dataset, self.maintenance_col, self.maintenance_levels)
+        cleaned_dataset = self.replace_outliers_with_nan_lazy(
+            cleaned_dataset, self.care_level_col, self.care_levels)
+
+        mappings = {self.care_level_col: CARE_LEVEL_TO_MAINTENANCE, self.watering_col: WATERING_TO_MAINTENANCE}
+        for feature in self.imputation_features:
+            mask = pl.col(self.maintenance_col).is_null() & pl.col(feature).is_not_null()
+            cleaned_dataset = cleaned_dataset.with_columns(
+                pl.when(mask).then(pl.col(feature).replace(mappings.get(feature, {})))
+                .otherwise(pl.col(self.maintenance_col)).alias(self.maintenance_col))
+
+        return cleaned_dataset
@@ -62,3 +62,21 @@ class CleanFeatureSunlight(CleanFeatures):
             lambda x: self.categorize_sunlight(x))
 
         return cleaned_dataset
+
+    def clean_lazy(self, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        """
+        Clean the 'sunlight' feature like clean, in a Polars query plan.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+
+        Returns:
+            pl.LazyFrame: The cleaned dataset.
+        """
+        import polars as pl
+
+        sunlight = pl.col(self.sunlight_col)
+        return dataset.with_columns(
+            pl.when(sunlight.list.eval(pl.element().is_in(self.full_shade)).list.any()).then(pl.lit("full_shade"))
+            .when(sunlight.list.eval(pl.element().is_in(self.full_sun)).list.any()).then(pl.lit("full_sun"))
+            .otherwise(pl.lit("part_shade")).alias(self.sunlight_col))
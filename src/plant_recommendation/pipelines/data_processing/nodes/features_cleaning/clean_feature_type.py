@@ -58,3 +58,19 @@ class CleanFeatureType(CleanFeatures):
             cleaned_dataset, self.imputation_file, self.type_col)
 
         return cleaned_dataset
+
+    def clean_lazy(self, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        """
+        Clean the 'type' feature like clean, in a Polars query plan.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+
+        Returns:
+            pl.LazyFrame: The cleaned dataset.
+        """
+        import polars as pl
+
+        cleaned_dataset = dataset.with_columns(pl.col(self.type_col).replace(self.plant_to_type))
+
+        return self.impute_with_file_lazy(cleaned_dataset, self.imputation_file, self.type_col)
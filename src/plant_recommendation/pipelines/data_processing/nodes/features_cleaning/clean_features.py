@@ -118,6 +118,29 @@ class CleanFeatures:
         #     new_dataset.loc[new_dataset[self.id_col]==id, impute_col] = file.loc[file[self.id_col]==id, impute_col]
         return new_dataset
 
+    def impute_with_file_lazy(self, dataset: "pl.LazyFrame", file: pd.DataFrame, impute_col: str) -> "pl.LazyFrame":
+        """
+        Impute missing values in a Polars query plan using values from a file, like impute_with_file:
+        the n-th missing value is replaced by the n-th value of the file.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be imputed.
+            file (pd.DataFrame): The file used for imputation.
+            impute_col (str): The name of the column to impute.
+
+        Returns:
+            pl.LazyFrame: The dataset with imputed values.
+        """
+        import polars as pl
+
+        values = pl.Series(file[impute_col].values)
+        if len(values) == 0:
+            return dataset
+        is_null = pl.col(impute_col).is_null()
+        rank = (is_null.cast(pl.Int64).cum_sum() - 1).clip(lower_bound=0)
+        return dataset.with_columns(
+            pl.when(is_null).then(pl.lit(values).gather(rank)).otherwise(pl.col(impute_col)).alias(impute_col))
+
     def replace_outliers_with_nan(self, dataset: pd.DataFrame, feature: str, regular_values: List[str]) -> pd.DataFrame:
         """
         Replace outliers in a feature with NaN.
@@ -137,6 +160,23 @@ class CleanFeatures:
 
         return cleaned_dataset
 
+    def replace_outliers_with_nan_lazy(self, dataset: "pl.LazyFrame", feature: str, regular_values: List[str]) -> "pl.LazyFrame":
+        """
+        Replace outliers in a feature with null in a Polars query plan.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+            feature (str): The name of the feature to clean.
+            regular_values (List[str]): List of regular values.
+
+        Returns:
+            pl.LazyFrame: The dataset with outliers replaced by null.
+        """
+        import polars as pl
+
+        return dataset.with_columns(
+            pl.when(pl.col(feature).is_in(regular_values)).then(pl.col(feature)).otherwise(None).alias(feature))
+
     def clean(self, dataset: pd.DataFrame):
         """
         Clean the dataset by applying various cleaning methods.
@@ -152,3 +192,36 @@ class CleanFeatures:
         cleaned_dataset = self.clean_boolean(cleaned_dataset)
 
         return cleaned_dataset
+
+    def clean_lazy(self, dataset: "pl.LazyFrame") -> "pl.LazyFrame":
+        """
+        Clean the dataset like clean, in a Polars query plan.
+
+        The list features are parsed from their string representation by extracting the quoted items,
+        which matches eval on lists of strings.
+
+        Args:
+            dataset (pl.LazyFrame): The plant dataset to be cleaned.
+
+        Returns:
+            pl.LazyFrame: The cleaned dataset.
+        """
+        import polars as pl
+
+        schema = dataset.collect_schema()
+        cleaned_dataset = dataset.with_columns(
+            [pl.col(feature).str.to_lowercase() for feature in self.features_to_lower])
+
+        cleaned_dataset = cleaned_dataset.with_columns(
+            [pl.col(feature).str.extract_all(r"'[^']*'|\"[^\"]*\"").list.eval(
+                pl.element().str.slice(1, pl.element().str.len_chars() - 2)
+                .str.to_lowercase().str.replace_all(r"\s+", " ").str.strip_chars())
+             for feature in self.list_features])
+
+        # as in str_to_boolean, only the strings 'TRUE' and 'FALSE' are converted, any other value gets the default
+        cleaned_dataset = cleaned_dataset.with_columns(
+            [(pl.when(pl.col(feature) == "TRUE").then(True).when(pl.col(feature) == "FALSE").then(False)
+              .otherwise(default_value) if schema[feature] == pl.String else pl.lit(default_value)).alias(feature)
+             for feature, default_value in self.boolean_features.items()])
+
+        return cleaned_dataset
@@ -55,3 +55,39 @@ def add_attracts_col(dataset: pd.DataFrame, attracts_col: str, new_features: Dic
             lambda x: attracts(x, tested_values))
 
     return new_dataset
+
+
+def add_perennial_col_lazy(dataset: "pl.LazyFrame", cycle_col: str, new_features: Dict[str, Dict[str, Any]]) -> "pl.LazyFrame":
+    """
+    Add a column indicating whether the plant is perennial like add_perennial_col, in a Polars query plan.
+
+    Args:
+        dataset (pl.LazyFrame): The plant dataset.
+        cycle_col (str): The name of the column representing the plant cycle.
+        new_features (Dict[str, Dict[str, Any]]): A dictionary mapping new feature names to their corresponding values to test.
+
+    Returns:
+        pl.LazyFrame: The dataset with the new perennial column added.
+    """
+    import polars as pl
+
+    # a missing cycle is not the tested value, so the plant is perennial
+    return dataset.with_columns([pl.col(cycle_col).ne_missing(tested_value).alias(new_feature)
+                                 for new_feature, tested_value in new_features[cycle_col].items()])
+
+
+def add_attracts_col_lazy(dataset: "pl.LazyFrame", attracts_col: str, new_features: Dict[str, Dict[str, Any]]) -> "pl.LazyFrame":
+    """
+    Add columns indicating whether the plant attracts certain animals like add_attracts_col, in a Polars query plan.
+
+    Args:
+        dataset (pl.LazyFrame): The plant dataset.
+        attracts_col (str): The name of the column representing the animals the plant attracts.
+        new_features (Dict[str, Dict[str, Any]]): A dictionary mapping new feature names to their corresponding animals to check.
+    Returns:
+        pl.LazyFrame: The dataset with the new attracts columns added.
+    """
+    import polars as pl
+
+    return dataset.with_columns([pl.col(attracts_col).list.eval(pl.element().is_in(tested_values)).list.any().alias(new_feature)
+                                 for new_feature, tested_values in new_features[attracts_col].items()])
@@ -1,7 +1,8 @@
 import pandas as pd
 
 from typing import List, Dict, Any
-from .features_engineering import add_attracts_col, add_perennial_col
+from .backends import DataFrameLike, backend_of, get_backend
+from .features_engineering import add_attracts_col, add_perennial_col, add_attracts_col_lazy, add_perennial_col_lazy
 
 from .features_cleaning.clean_features import CleanFeatures
 from .features_cleaning.clean_feature_maintenance import CleanFeatureMaintenance
@@ -9,6 +10,9 @@ from .features_cleaning.clean_feature_type import CleanFeatureType
 from .features_cleaning.clean_feature_sunlight import CleanFeatureSunlight
 from .features_cleaning.clean_feature_hardiness import CleanFeatureHardiness
 
+# the column groups expected in params:COLUMN_GROUPS, each cleaned by its own branch of the pipeline
+COLUMN_GROUPS = ("maintenance", "type", "sunlight", "attracts", "booleans", "hardiness")
+
 
 def select_relevant_features(dataset: pd.DataFrame, relevant_features: List[str]) -> pd.DataFrame:
     """
@@ -24,68 +28,145 @@ def select_relevant_features(dataset: pd.DataFrame, relevant_features: List[str]
     return dataset[relevant_features]
 
 
-def clean_several_features(dataset: pd.DataFrame, features_to_lower: List[str], list_features: List[str], boolean_features: Dict[str, bool], id_col: str) -> pd.DataFrame:
+def split_column_groups(dataset: pd.DataFrame, column_groups: Dict[str, List[str]], backend: str = "pandas") -> Dict[str, DataFrameLike]:
     """
-    Clean several features in the dataset.
+    Split the dataset into column groups, so that each group can be cleaned by its own branch of the pipeline.
 
     Args:
         dataset (pd.DataFrame): The plant dataset.
+        column_groups (Dict[str, List[str]]): A dictionary mapping group names to their columns.
+        backend (str, optional): The DataFrame backend of the cleaning, 'pandas' (eager DataFrames)
+            or 'polars' (lazy query plans collected after the feature engineering).
+
+    Returns:
+        Dict[str, DataFrameLike]: The dataset of each group, plus the group 'other' with the remaining columns.
+
+    Raises:
+        ValueError: If the groups are not those of COLUMN_GROUPS, or a column is missing or in several groups.
+    """
+    if set(column_groups) != set(COLUMN_GROUPS):
+        raise ValueError(f"COLUMN_GROUPS must define the groups {list(COLUMN_GROUPS)}, "
+                         f"got {list(column_groups)}")
+    grouped_columns = [column for columns in column_groups.values() for column in columns]
+    missing = [column for column in grouped_columns if column not in dataset.columns]
+    if missing:
+        raise ValueError(f"The columns {missing} of COLUMN_GROUPS are not in the dataset")
+    duplicated = sorted({column for column in grouped_columns if grouped_columns.count(column) > 1})
+    if duplicated:
+        raise ValueError(f"The columns {duplicated} are in several groups of COLUMN_GROUPS")
+
+    backend = get_backend(backend)
+    dataset = backend.from_pandas(dataset)
+    groups = {group: backend.select(dataset, columns) for group, columns in column_groups.items()}
+    groups['other'] = backend.drop(dataset, grouped_columns)
+
+    return groups
+
+
+def normalize_column_group(dataset: DataFrameLike, features_to_lower: List[str], list_features: List[str],
+                           boolean_features: Dict[str, bool], id_col: str) -> DataFrameLike:
+    """
+    Clean several features in a column group, keeping only the features of the group.
+
+    Args:
+        dataset (DataFrameLike): The column group.
+        features_to_lower (List[str]): List of feature names to convert to lowercase.
+        list_features (List[str]): List of feature names that are lists.
+        boolean_features (Dict[str, bool]): Dictionary mapping feature names to their default boolean values.
+        id_col (str): The name of the column representing the ID.
+
+    Returns:
+        DataFrameLike: The cleaned column group.
+    """
+    columns = backend_of(dataset).columns(dataset)
+    return clean_several_features(dataset,
+                                  features_to_lower=[feature for feature in features_to_lower if feature in columns],
+                                  list_features=[feature for feature in list_features if feature in columns],
+                                  boolean_features={feature: default_value for feature, default_value
+                                                    in boolean_features.items() if feature in columns},
+                                  id_col=id_col)
+
+
+def join_column_groups(relevant_features: List[str], rename_dict: Dict[str, str], *column_groups: DataFrameLike) -> DataFrameLike:
+    """
+    Join the cleaned column groups back into one dataset, in the original column order.
+
+    Args:
+        relevant_features (List[str]): The original columns, in order.
+        rename_dict (Dict[str, str]): A dictionary for renaming columns, applied by the cleaning.
+        *column_groups (DataFrameLike): The cleaned column groups, aligned on their rows.
+
+    Returns:
+        DataFrameLike: The cleaned dataset.
+    """
+    backend = backend_of(column_groups[0])
+    dataset = backend.concat_columns(list(column_groups))
+
+    return backend.select(dataset, [rename_dict.get(feature, feature) for feature in relevant_features])
+
+
+def clean_several_features(dataset: DataFrameLike, features_to_lower: List[str], list_features: List[str], boolean_features: Dict[str, bool], id_col: str) -> DataFrameLike:
+    """
+    Clean several features in the dataset.
+
+    Args:
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         features_to_lower (List[str]): List of feature names to convert to lowercase.
         list_features (List[str]): List of feature names that are lists.
         boolean_features (Dict[str, bool]): Dictionary mapping feature names to their default boolean values.
         id_col (str): The name of the column representing the ID.
 
     Returns:
-        pd.DataFrame: The cleaned dataset.
+        DataFrameLike: The cleaned dataset.
     """
     cleaner = CleanFeatures(features_to_lower=features_to_lower,
                             list_features=list_features, boolean_features=boolean_features, id_col=id_col)
-    return cleaner.clean(dataset)
+    return backend_of(dataset).clean(cleaner, dataset)
 
 
-def clean_feature_type(dataset: pd.DataFrame, type_col: str, type_to_plant: Dict[str, List[str]], imputation_file: str, id_col: str) -> pd.DataFrame:
+def clean_feature_type(dataset: DataFrameLike, type_col: str, type_to_plant: Dict[str, List[str]], imputation_file: str, id_col: str) -> DataFrameLike:
     """
     Clean the 'type' feature in the dataset.
 
     Args:
-        dataset (pd.DataFrame): The plant dataset.
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         type_col (str): The name of the column representing the type information.
         type_to_plant (Dict[str, List[str]]): A dictionary mapping types to lists of plants.
         imputation_file (str): The path to the file used for imputation.
         id_col (str): The name of the column representing the ID.
 
     Returns:
-        pd.DataFrame: The cleaned dataset.
+        DataFrameLike: The cleaned dataset.
     """
     cleaner = CleanFeatureType(type_col=type_col, type_to_plant=type_to_plant,
                                imputation_file=imputation_file, id_col=id_col)
-    return cleaner.clean(dataset)
+    return backend_of(dataset).clean(cleaner, dataset)
 
 
-def clean_feature_sunlight(dataset: pd.DataFrame, sunlight_col: str, full_sun: List[str], full_shade: List[str]) -> pd.DataFrame:
+def clean_feature_sunlight(dataset: DataFrameLike, sunlight_col: str, full_sun: List[str], full_shade: List[str]) -> DataFrameLike:
     """
     Clean the 'sunlight' feature in the dataset.
 
     Args:
-        dataset (pd.DataFrame): The plant dataset.
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         sunlight_col (str): The name of the column representing the sunlight information.
         full_sun (List[str]): List of values representing full sun conditions.
         full_shade (List[str]): List of values representing full shade conditions.
 
     Returns:
-        pd.DataFrame: The cleaned dataset.
+        DataFrameLike: The cleaned dataset.
     """
     cleaner = CleanFeatureSunlight(
         sunlight_col=sunlight_col, full_sun=full_sun, full_shade=full_shade)
-    return cleaner.clean(dataset)
+    return backend_of(dataset).clean(cleaner, dataset)
 
 
-def clean_feature_hardiness(dataset: pd.DataFrame, imputation_file: str, rename_dict: Dict[str, str], min_col: str, max_col: str, hardiness_levels: List[str], id_col: str) -> pd.DataFrame:
+def clean_feature_hardiness(dataset: DataFrameLike, imputation_file: str, rename_dict: Dict[str, str], min_col: str, max_col: str, hardiness_levels: List[str], id_col: str) -> DataFrameLike:
     """
     Clean the 'hardiness' feature in the dataset.
 
     Args:
-        dataset (pd.DataFrame): The plant dataset.
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         imputation_file (str): The path to the file used for imputation.
         rename_dict (Dict[str, str]): A dictionary for renaming columns.
         min_col (str): The name of the column representing the minimum hardiness.
@@ -94,20 +175,20 @@ def clean_feature_hardiness(dataset: pd.DataFrame, imputation_file: str, rename_
         id_col (str): The name of the column representing the ID.
 
     Returns:
-        pd.DataFrame: The cleaned dataset.
+        DataFrameLike: The cleaned dataset.
     """
     cleaner = CleanFeatureHardiness(imputation_file=imputation_file, rename_dict=rename_dict, hardiness_min_col=min_col, hardiness_max_col=max_col,
                                     hardiness_levels=hardiness_levels, id_col=id_col)
-    return cleaner.clean(dataset)
+    return backend_of(dataset).clean(cleaner, dataset)
 
 
-def clean_feature_maintenance(dataset: pd.DataFrame, maintenance_col: str, imputation_features: List[str], maintenance_levels: List[str],
-                              care_levels: List[str], care_level_col: str, watering_col: str) -> pd.DataFrame:
+def clean_feature_maintenance(dataset: DataFrameLike, maintenance_col: str, imputation_features: List[str], maintenance_levels: List[str],
+                              care_levels: List[str], care_level_col: str, watering_col: str) -> DataFrameLike:
     """
     Clean the 'maintenance' feature in the dataset.
 
     Args:
-        dataset (pd.DataFrame): The plant dataset.
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         maintenance_col (str): The name of the column representing the maintenance level.
         imputation_features (List[str]): List of features used for imputation.
         maintenance_levels (List[str]): The levels of maintenance.
@@ -116,20 +197,29 @@ def clean_feature_maintenance(dataset: pd.DataFrame, maintenance_col: str, imput
         watering_col (str): The name of the column representing the watering frequency.
 
     Returns:
-        pd.DataFrame: The cleaned dataset.
+        DataFrameLike: The cleaned dataset.
+
+    Raises:
+        ValueError: If a column the maintenance is imputed from is not in the 'maintenance' column group.
     """
+    columns = backend_of(dataset).columns(dataset)
+    missing = [column for column in dict.fromkeys([maintenance_col, care_level_col, watering_col, *imputation_features])
+               if column not in columns]
+    if missing:
+        raise ValueError(f"The 'maintenance' group of COLUMN_GROUPS must contain the columns {missing}, "
+                         "used to impute the maintenance")
     cleaner = CleanFeatureMaintenance(maintenance_col=maintenance_col, imputation_features=imputation_features,
                                       maintenance_levels=maintenance_levels, care_levels=care_levels, care_level_col=care_level_col,
                                       watering_col=watering_col)
-    return cleaner.clean(dataset)
+    return backend_of(dataset).clean(cleaner, dataset)
 
 
-def add_new_features(dataset: pd.DataFrame, new_features: Dict[str, Dict[str, Any]], cycle_col: str, attracts_col: str, features_to_drop: List[str]) -> pd.DataFrame:
+def add_new_features(dataset: DataFrameLike, new_features: Dict[str, Dict[str, Any]], cycle_col: str, attracts_col: str, features_to_drop: List[str]) -> pd.DataFrame:
     """
     Add new features to the dataset.
 
     Args:
-        dataset (pd.DataFrame): The plant dataset.
+        dataset (DataFrameLike): The plant dataset, a pandas DataFrame or a Polars LazyFrame.
         new_features (Dict[str, Dict[str, Any]]): A dictionary mapping new feature names to their corresponding values to test.
         cycle_col (str): The name of the column representing the plant cycle.
         attracts_col (str): The name of the column representing the animals the plant attracts.
@@ -138,7 +228,13 @@ def add_new_features(dataset: pd.DataFrame, new_features: Dict[str, Dict[str, An
     Returns:
         pd.DataFrame: The dataset with the new features added.
     """
-    new_dataset = add_perennial_col(dataset, cycle_col, new_features)
-    new_dataset = add_attracts_col(new_dataset, attracts_col, new_features)
-
-    return new_dataset.drop(columns=features_to_drop)
+    backend = backend_of(dataset)
+    if backend.name == "polars":
+        new_dataset = add_perennial_col_lazy(dataset, cycle_col, new_features)
+        new_dataset = add_attracts_col_lazy(new_dataset, attracts_col, new_features)
+    else:
+        new_dataset = add_perennial_col(dataset, cycle_col, new_features)
+        new_dataset = add_attracts_col(new_dataset, attracts_col, new_features)
+
+    # the lazy query plan of the whole cleaning chain is only executed here
+    return backend.to_pandas(backend.drop(new_dataset, features_to_drop))
@@ -1,5 +1,21 @@
 from kedro.pipeline import Pipeline, node
-from .nodes.nodes import select_relevant_features, clean_several_features, clean_feature_hardiness, clean_feature_maintenance, clean_feature_sunlight, clean_feature_type, add_new_features
+from .nodes.nodes import COLUMN_GROUPS, select_relevant_features, split_column_groups, normalize_column_group, join_column_groups, clean_feature_hardiness, clean_feature_maintenance, clean_feature_sunlight, clean_feature_type, add_new_features
+
+# the hardiness group is cleaned from the raw columns, the other groups are normalized first
+NORMALIZED_COLUMN_GROUPS = tuple(group for group in COLUMN_GROUPS if group != "hardiness")
+
+
+def _normalize_node(group: str):
+    return node(func=normalize_column_group,
+                inputs=dict(dataset=f"{group}_columns",
+                            features_to_lower="params:FEATURES_TO_LOWER",
+                            boolean_features="params:BOOLEAN_FEATURES",
+                            list_features="params:FEATURES_WITH_LISTS",
+                            id_col="params:ID_COL"
+                            ),
+                outputs=f"{group}_columns_normalized",
+                name=f"normalize_{group}_node"
+                )
 
 
 def create_data_processing_pipeline() -> Pipeline:
@@ -12,20 +28,20 @@ def create_data_processing_pipeline() -> Pipeline:
              )
     ])
 
+    # each cleaning branch only consumes its own columns, so a parallel runner can run the branches concurrently
     pipeline_feature_cleaning = Pipeline([
-        node(func=clean_several_features,
+        node(func=split_column_groups,
              inputs=dict(dataset="filtered_raw_dataset",
-                         features_to_lower="params:FEATURES_TO_LOWER",
-                         boolean_features="params:BOOLEAN_FEATURES",
-                         list_features="params:FEATURES_WITH_LISTS",
-                         id_col="params:ID_COL"
-                         ),
-             outputs="cleaned_dataset_step1",
-             name="normalize_node"
+                         column_groups="params:COLUMN_GROUPS",
+                         backend="params:DATAFRAME_BACKEND"),
+             outputs={group: f"{group}_columns" for group in COLUMN_GROUPS + ("other",)},
+             name="split_column_groups_node"
              ),
 
+        *[_normalize_node(group) for group in NORMALIZED_COLUMN_GROUPS],
+
         node(func=clean_feature_maintenance,
-             inputs=dict(dataset="cleaned_dataset_step1",
+             inputs=dict(dataset="maintenance_columns_normalized",
                          maintenance_col="params:MAINTENANCE_COL",
                          imputation_features="params:MAINTENANCE_IMPUTATION_FEATURES",
                          maintenance_levels="params:MAINTENANCE_LEVELS",
@@ -33,33 +49,33 @@ def create_data_processing_pipeline() -> Pipeline:
                          care_level_col="params:CARE_LEVEL_COL",
                          watering_col="params:WATERING_COL"
                          ),
-             outputs="cleaned_dataset_step2",
+             outputs="maintenance_columns_clean",
              name="clean_feature_maintenance_node"
              ),
 
         node(func=clean_feature_type,
-             inputs=dict(dataset="cleaned_dataset_step2",
+             inputs=dict(dataset="type_columns_normalized",
                          type_col="params:TYPE_COL",
                          type_to_plant="params:TYPE_TO_PLANT",
                          imputation_file="type_imputation_file",
                          id_col="params:ID_COL",
                          ),
-             outputs="cleaned_dataset_step3",
+             outputs="type_columns_clean",
              name="clean_feature_type_node"
              ),
 
         node(func=clean_feature_sunlight,
-             inputs=dict(dataset="cleaned_dataset_step3",
+             inputs=dict(dataset="sunlight_columns_normalized",
                          sunlight_col="params:SUNLIGHT_COL",
                          full_sun="params:FULL_SUN_LIST",
                          full_shade="params:FULL_SHADE_LIST",
                          ),
-             outputs="cleaned_dataset_step4",
+             outputs="sunlight_columns_clean",
              name="clean_feature_sunlight_node"
              ),
 
         node(func=clean_feature_hardiness,
-             inputs=dict(dataset="cleaned_dataset_step4",
+             inputs=dict(dataset="hardiness_columns",
                          imputation_file="hardiness_imputation_file",
                          rename_dict="params:FEATURES_TO_RENAME",
                          min_col="params:HARDINESS_MIN_COL",
@@ -67,14 +83,28 @@ def create_data_processing_pipeline() -> Pipeline:
                          hardiness_levels="params:HARDINESS_LEVELS",
                          id_col="params:ID_COL"
                          ),
-             outputs="cleaned_dataset_step5",
+             outputs="hardiness_columns_clean",
              name="clean_feature_hardiness_node"
+             ),
+
+        node(func=join_column_groups,
+             inputs=["params:RELEVANT_FEATURES",
+                     "params:FEATURES_TO_RENAME",
+                     "maintenance_columns_clean",
+                     "type_columns_clean",
+                     "sunlight_columns_clean",
+                     "attracts_columns_normalized",
+                     "booleans_columns_normalized",
+                     "hardiness_columns_clean",
+                     "other_columns"],
+             outputs="cleaned_dataset",
+             name="join_column_groups_node"
              )
     ])
 
     pipeline_feature_engineering = Pipeline([
         node(func=add_new_features,
-             inputs=dict(dataset="cleaned_dataset_step5",
+             inputs=dict(dataset="cleaned_dataset",
                          new_features="params:NEW_FEATURES",
                          cycle_col="params:CYCLE_COL",
                          attracts_col="params:ATTRACTS_COL",
@@ -0,0 +1,4 @@
+from .pipeline import create_data_profiling_pipeline
+
+__all__ = ["create_data_profiling_pipeline"]
+__version__ = "0.1"
@@ -0,0 +1,157 @@
+import logging
+import numpy as np
+import pandas as pd
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from ...sketches import CountMinSketch, DatasetSketch
+
+logger = logging.getLogger(__name__)
+
+
+def iter_chunks(dataset: Union[pd.DataFrame, Iterable[pd.DataFrame]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over a dataset by chunks.
+
+    Args:
+        dataset (Union[pd.DataFrame, Iterable[pd.DataFrame]]): A DataFrame, or an iterator of chunks
+            (e.g. a CSV dataset loaded with a chunksize).
+        chunk_size (int): The number of rows of the chunks of a DataFrame.
+
+    Returns:
+        Iterator[pd.DataFrame]: The chunks.
+    """
+    if isinstance(dataset, pd.DataFrame):
+        for start in range(0, len(dataset), chunk_size):
+            yield dataset.iloc[start:start + chunk_size]
+    else:
+        yield from dataset
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray, epsilon: float = 1e-4) -> float:
+    """
+    Compute the population stability index of two distributions over the same bins:
+    sum((actual - expected) x ln(actual / expected)). Below 0.1 the distributions are usually considered
+    stable, above 0.2 they have significantly shifted.
+
+    Args:
+        expected (np.ndarray): The counts or shares of the reference distribution.
+        actual (np.ndarray): The counts or shares of the new distribution.
+        epsilon (float, optional): The minimum share of a bin, so that empty bins do not make it infinite.
+
+    Returns:
+        float: The population stability index.
+    """
+    expected, actual = np.asarray(expected, dtype=np.float64), np.asarray(actual, dtype=np.float64)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    expected = np.maximum(expected / expected.sum(), epsilon)
+    actual = np.maximum(actual / actual.sum(), epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _frequency_shares(current: CountMinSketch, previous: CountMinSketch) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate the shares of the heavy hitters of two frequency sketches, plus an 'other values' bin.
+
+    Args:
+        current (CountMinSketch): The sketch of the new refresh.
+        previous (CountMinSketch): The sketch of the previous refresh.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The previous and the current shares.
+    """
+    values = sorted(set(current.heavy_hitters).union(previous.heavy_hitters))
+    shares = []
+    for sketch in (previous, current):
+        if sketch.total == 0:
+            shares.append(np.zeros(len(values) + 1))
+            continue
+        known = sketch.estimate(values) / sketch.total
+        # count-min estimates can only overestimate: the 'other values' share is clipped at 0
+        shares.append(np.append(known, max(0.0, 1.0 - known.sum())))
+    return shares[0], shares[1]
+
+
+def compare_sketches(current: DatasetSketch, previous: DatasetSketch, psi_threshold: float,
+                     null_rate_threshold: float) -> Dict[str, Any]:
+    """
+    Compare the sketch of a refresh with the sketch of the previous one.
+
+    Args:
+        current (DatasetSketch): The sketch of the new refresh.
+        previous (DatasetSketch): The sketch of the previous refresh.
+        psi_threshold (float): The population stability index above which a distribution has drifted.
+        null_rate_threshold (float): The null rate change above which a column has drifted.
+
+    Returns:
+        Dict[str, Any]: The row counts, the drift statistics of each column, and the alerts.
+    """
+    current_summary, previous_summary = current.summary()["columns"], previous.summary()["columns"]
+    columns, alerts = {}, []
+    for column in sorted(set(previous_summary) - set(current_summary)):
+        alerts.append(f"column '{column}' disappeared")
+    for column, stats in current_summary.items():
+        if column not in previous_summary:
+            alerts.append(f"new column '{column}'")
+            continue
+        previous_stats = previous_summary[column]
+        drift = {"null_rate_change": stats["null_rate"] - previous_stats["null_rate"],
+                 "distinct_estimate_change": stats["distinct_estimate"] - previous_stats["distinct_estimate"]}
+        if abs(drift["null_rate_change"]) > null_rate_threshold:
+            alerts.append(f"null rate of '{column}' changed from {previous_stats['null_rate']:.3f} "
+                          f"to {stats['null_rate']:.3f}")
+
+        distributions = {"frequencies_psi": (current.frequencies, previous.frequencies),
+                         "tokens_psi": (current.tokens, previous.tokens)}
+        for name, (current_sketches, previous_sketches) in distributions.items():
+            if column in current_sketches and column in previous_sketches:
+                drift[name] = population_stability_index(*_frequency_shares(current_sketches[column],
+                                                                            previous_sketches[column]))
+        if column in current.histograms and column in previous.histograms:
+            drift["histogram_psi"] = population_stability_index(previous.histograms[column].counts,
+                                                                current.histograms[column].counts)
+        for name in ("frequencies_psi", "tokens_psi", "histogram_psi"):
+            if drift.get(name, 0.0) > psi_threshold:
+                alerts.append(f"distribution of '{column}' drifted ({name} = {drift[name]:.3f})")
+        columns[column] = drift
+
+    return {"previous_n_rows": previous.n_rows, "n_rows_change": current.n_rows - previous.n_rows,
+            "columns": columns, "alerts": alerts}
+
+
+def profile_dataset(dataset: Union[pd.DataFrame, Iterable[pd.DataFrame]], previous_sketch: Optional[DatasetSketch],
+                    profile_columns: Dict[str, Any], sketch_params: Dict[str, int], chunk_size: int,
+                    psi_threshold: float, null_rate_threshold: float) -> Tuple[DatasetSketch, Dict[str, Any]]:
+    """
+    Profile a dataset in a single pass over its chunks with mergeable sketches (HyperLogLog distinct counts,
+    count-min value and token frequencies, fixed-bin histograms), and compare it with the previous refresh.
+
+    Args:
+        dataset (Union[pd.DataFrame, Iterable[pd.DataFrame]]): The dataset, or an iterator of its chunks.
+        previous_sketch (Optional[DatasetSketch]): The sketch of the previous refresh, None for the first one.
+        profile_columns (Dict[str, Any]): The frequency_columns, token_columns and histogram_edges of the sketch.
+        sketch_params (Dict[str, int]): The sizes of the sketches (hll_precision, cms_width, cms_depth,
+            n_heavy_hitters).
+        chunk_size (int): The number of rows of the chunks when the dataset is a DataFrame.
+        psi_threshold (float): The population stability index above which a distribution has drifted.
+        null_rate_threshold (float): The null rate change above which a column has drifted.
+
+    Returns:
+        Tuple[DatasetSketch, Dict[str, Any]]: The sketch of the dataset, and the profile report
+        (the statistics estimated by the sketches and the drift since the previous refresh).
+    """
+    sketch = DatasetSketch(**profile_columns, **sketch_params)
+    for chunk in iter_chunks(dataset, chunk_size):
+        sketch.update(chunk)
+
+    report = sketch.summary()
+    report["drift"] = None
+    if previous_sketch is not None:
+        if previous_sketch.configuration() == sketch.configuration():
+            report["drift"] = compare_sketches(sketch, previous_sketch, psi_threshold, null_rate_threshold)
+            for alert in report["drift"]["alerts"]:
+                logger.warning("Data drift: %s", alert)
+        else:
+            logger.info("The sketch configuration changed since the previous refresh, drift not computed")
+    return sketch, report
@@ -0,0 +1,38 @@
+from kedro.pipeline import Pipeline, node
+from .nodes import profile_dataset
+
+
+def _profile_node(dataset: str, profile_columns: str) -> node:
+    """
+    Build the profiling node of a dataset: its sketch is saved as '{dataset}_sketch' (versioned),
+    compared with the previous refresh ('previous_{dataset}_sketch') and summarized in '{dataset}_profile'.
+
+    Args:
+        dataset (str): The name of the dataset in the catalog (or of its chunked entry).
+        profile_columns (str): The name of the parameter listing the sketched columns.
+
+    Returns:
+        node: The profiling node.
+    """
+    name = dataset.removesuffix("_chunks")
+    return node(func=profile_dataset,
+                inputs=dict(dataset=dataset,
+                            previous_sketch=f"previous_{name}_sketch",
+                            profile_columns=f"params:{profile_columns}",
+                            sketch_params="params:SKETCH_PARAMS",
+                            chunk_size="params:PROFILING_CHUNK_SIZE",
+                            psi_threshold="params:DRIFT_PSI_THRESHOLD",
+                            null_rate_threshold="params:DRIFT_NULL_RATE_THRESHOLD"),
+                outputs=[f"{name}_sketch", f"{name}_profile"],
+                name=f"profile_{name}_node",
+                tags="no_cache"
+                )
+
+
+def create_data_profiling_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        _profile_node("raw_dataset_chunks", "RAW_DATASET_PROFILE"),
+        _profile_node("clean_dataset", "CLEAN_DATASET_PROFILE"),
+    ])
+
+    return pipeline
@@ -1,4 +1,4 @@
-from .pipeline import create_inference_pipeline
+from .pipeline import create_inference_pipeline, create_similar_plants_pipeline
 
-__all__ = ["create_inference_pipeline"]
+__all__ = ["create_inference_pipeline", "create_similar_plants_pipeline"]
 __version__="0.1"
\ No newline at end of file
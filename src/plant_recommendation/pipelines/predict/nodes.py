@@ -2,8 +2,13 @@ import pandas as pd
 from sklearn.neighbors import NearestNeighbors
 from sklearn.compose import ColumnTransformer
 
+from ...recommender.bundle import ModelBundle
+from ...recommender.name_index import PlantNameIndex
+from ...recommender.similarity_graph import SimilarPlantsGraph
 
-def recommand_plant(user_data: pd.DataFrame, nn: NearestNeighbors, preprocessor: ColumnTransformer, plants_dataset: pd.DataFrame):
+
+def recommand_plant(user_data: pd.DataFrame, nn: NearestNeighbors, preprocessor: ColumnTransformer, plants_dataset: pd.DataFrame,
+                    n_recommendations: int = None):
     """
     Recommend plants based on user data using a Nearest Neighbors model.
 
@@ -12,12 +17,68 @@ def recommand_plant(user_data: pd.DataFrame, nn: NearestNeighbors, preprocessor:
         nn (NearestNeighbors): The fitted Nearest Neighbors model.
         preprocessor (ColumnTransformer): The fitted preprocessor for transforming the user data.
         plants_dataset (pd.DataFrame): The dataset containing plant information.
+        n_recommendations (int, optional): The number of plants to recommend, the number the model was fitted with if None.
 
     Returns:
         pd.DataFrame: The recommended plants sorted by distance.
     """
-    distances, indices = nn.kneighbors(preprocessor.transform(user_data))
+    if n_recommendations is not None:
+        n_recommendations = min(n_recommendations, nn.n_samples_fit_)
+    distances, indices = nn.kneighbors(preprocessor.transform(user_data), n_neighbors=n_recommendations)
     recommanded_plants = plants_dataset.iloc[indices[0]].copy()
     recommanded_plants['_distance'] = distances[0]
 
     return recommanded_plants.sort_values(by='_distance')
+
+
+def recommand_plant_from_bundle(user_data: pd.DataFrame, bundle: ModelBundle, n_recommendations: int = None):
+    """
+    Recommend plants based on user data using the components of a model bundle, so that the preprocessor,
+    the Nearest Neighbors model and the plant table always come from the same training.
+
+    Args:
+        user_data (pd.DataFrame): The user data for which to recommend plants.
+        bundle (ModelBundle): The model bundle.
+        n_recommendations (int, optional): The number of plants to recommend, the number the model was fitted with if None.
+
+    Returns:
+        pd.DataFrame: The recommended plants sorted by distance.
+    """
+    return recommand_plant(user_data, bundle.nn, bundle.preprocessor, bundle.plants_dataset, n_recommendations)
+
+
+def recommand_similar_plants(plant_query: pd.DataFrame, graph: SimilarPlantsGraph, plants_dataset: pd.DataFrame, id_col: str,
+                             name_index: PlantNameIndex = None, name_col: str = None):
+    """
+    Recommend the plants most similar to the plants chosen by the user, using the precomputed similar plants graph.
+
+    The plants are chosen by id, or by name (common or scientific, possibly misspelled) when the query has
+    a name column and the id of the row is missing: the name is resolved with the name search index.
+
+    Args:
+        plant_query (pd.DataFrame): The ids, or names, of the plants chosen by the user.
+        graph (SimilarPlantsGraph): The precomputed similar plants graph.
+        plants_dataset (pd.DataFrame): The dataset containing plant information.
+        id_col (str): The name of the column representing the ID.
+        name_index (PlantNameIndex, optional): The name search index of the plants.
+        name_col (str, optional): The name of the column of plant_query representing the plant name.
+
+    Returns:
+        pd.DataFrame: The similar plants of each queried plant, sorted by distance.
+    """
+    similar_plants = []
+    for _, query in plant_query.iterrows():
+        if id_col in query and pd.notna(query[id_col]):
+            plant_id = graph.plant_ids[graph.position(query[id_col])]
+        elif name_index is not None and name_col in query and pd.notna(query[name_col]):
+            position = name_index.lookup(query[name_col])
+            if position is None:
+                raise KeyError(f"No plant matches the name: {query[name_col]}")
+            plant_id = graph.plant_ids[position]
+        else:
+            raise KeyError(f"Neither an id nor a name in the plant query: {query.to_dict()}")
+        plants = graph.similar_plants(plant_id, plants_dataset)
+        plants.insert(0, '_similar_to', plant_id)
+        similar_plants.append(plants)
+
+    return pd.concat(similar_plants, ignore_index=True)
@@ -1,17 +1,33 @@
 from kedro.pipeline import Pipeline, node
-from .nodes import recommand_plant
+from .nodes import recommand_plant_from_bundle, recommand_similar_plants
 
 
 def create_inference_pipeline() -> Pipeline:
     pipeline = Pipeline([
-        node(func=recommand_plant,
+        node(func=recommand_plant_from_bundle,
              inputs=dict(user_data="user_data",
-                         nn="nearest_neighbors",
-                         preprocessor="recommendation_preprocessor",
-                         plants_dataset="recommendation_dataset"),
+                         bundle="model_bundle",
+                         n_recommendations="params:N_RECOMMENDATIONS"),
              outputs="recommendations",
              name="recommend_plants_node"
              ),
     ])
 
     return pipeline
+
+
+def create_similar_plants_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        node(func=recommand_similar_plants,
+             inputs=dict(plant_query="plant_query",
+                         graph="similar_plants_graph",
+                         plants_dataset="recommendation_dataset",
+                         id_col="params:ID_COL",
+                         name_index="plant_name_index",
+                         name_col="params:PLANT_NAME_COL"),
+             outputs="similar_plants",
+             name="recommend_similar_plants_node"
+             ),
+    ])
+
+    return pipeline
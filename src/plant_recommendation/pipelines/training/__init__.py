@@ -1,4 +1,4 @@
-from .pipeline import create_training_pipeline
+from .pipeline import create_training_pipeline, create_hyperparameter_sweep_pipeline, create_streaming_training_pipeline
 
-__all__ = ["create_training_pipeline"]
+__all__ = ["create_training_pipeline", "create_hyperparameter_sweep_pipeline", "create_streaming_training_pipeline"]
 __version__ = "0.1"
@@ -1,10 +1,35 @@
+import itertools
+import logging
+import os
+import time
 import pandas as pd
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import RobustScaler, OneHotEncoder, OrdinalEncoder
-from sklearn.compose import make_column_transformer, ColumnTransformer
-from typing import List, Tuple
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler, OneHotEncoder, OrdinalEncoder
+from sklearn.compose import ColumnTransformer
+from threadpoolctl import threadpool_limits
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from ...recommender.bundle import ModelBundle
+from ...recommender.deduplicated_knn import DeduplicatedKNN
+from ...recommender.exact_knn import ExactKNN
+from ...recommender.name_index import PlantNameIndex
+from ...recommender.packed_knn import PackedKNN, preprocessor_columns
+from ...recommender.sharded_knn import ShardedKNN, assign_shards
+from ...recommender.similarity_graph import SimilarPlantsGraph
+from ...sketches import list_tokens
+from ...streaming import ChunkedMatrix, FixedScaler, MappedChunks, StreamingFeatureStats
+
+logger = logging.getLogger(__name__)
+
+SCALERS = {"robust": RobustScaler, "standard": StandardScaler, "minmax": MinMaxScaler}
+CATEGORY_COLS = ['type']
+SCALED_COLS = ['hardiness_max', 'hardiness_min']
+
+# Transformed plant matrices of the sweep worker processes, loaded once per process by the pool initializer
+_SWEEP_DATA = {}
 
 
 def remove_poisonous_plants(dataset: pd.DataFrame, poisonous_col: List[str]) -> pd.DataFrame:
@@ -43,30 +68,56 @@ def prepare_data(dataset: pd.DataFrame, col_to_drop: List[str], poisonous_col: L
     return X, filtered_dataset
 
 
-def fit_preprocessor(X: pd.DataFrame) -> ColumnTransformer:
+def make_preprocessor(scaler: str = "robust", type_categories: Union[str, List[Any]] = "auto",
+                      fixed_scaler: FixedScaler = None) -> ColumnTransformer:
+    """
+    Make the (unfitted) preprocessor of the feature matrix.
+
+    Args:
+        scaler (str, optional): The scaler of the hardiness features: 'robust', 'standard' or 'minmax'.
+        type_categories (Union[str, List[Any]], optional): The categories of the type one-hot encoding,
+            'auto' to find them at fit.
+        fixed_scaler (FixedScaler, optional): The scaler of statistics computed beforehand, used in place of
+            the scaler (under its name, so that the feature names do not change).
+
+    Returns:
+        ColumnTransformer: The column transformer.
+    """
+    if scaler not in SCALERS:
+        raise ValueError(f"Unknown scaler '{scaler}', expected one of {sorted(SCALERS)}")
+    # the names make_column_transformer gives to these transformers
+    return ColumnTransformer([("onehotencoder", OneHotEncoder(categories=type_categories if type_categories == "auto"
+                                                              else [type_categories]), CATEGORY_COLS),
+                              (SCALERS[scaler].__name__.lower(),
+                               SCALERS[scaler]() if fixed_scaler is None else fixed_scaler, SCALED_COLS),
+                              ("ordinalencoder-1", OrdinalEncoder(categories=[
+                                  ['low', 'moderate', 'high']]), ['maintenance']),
+                              ("ordinalencoder-2", OrdinalEncoder(categories=[
+                                  ['full_shade', 'part_shade', 'full_sun']]), ['sunlight'])],
+                             remainder="passthrough", force_int_remainder_cols=False)
+
+
+def fit_preprocessor(X: pd.DataFrame, scaler: str = "robust") -> ColumnTransformer:
     """
     Fit a preprocessor to the feature matrix.
 
     Args:
         X (pd.DataFrame): The feature matrix.
+        scaler (str, optional): The scaler of the hardiness features: 'robust', 'standard' or 'minmax'.
 
     Returns:
         ColumnTransformer: The fitted column transformer.
     """
-    preprocessor = make_column_transformer((OneHotEncoder(), ['type']),
-                                           (RobustScaler(), [
-                                            'hardiness_max', 'hardiness_min']),
-                                           (OrdinalEncoder(categories=[
-                                            ['low', 'moderate', 'high']]), ['maintenance']),
-                                           (OrdinalEncoder(categories=[
-                                            ['full_shade', 'part_shade', 'full_sun']]), ['sunlight']),
-                                           remainder="passthrough", force_int_remainder_cols=False)
+    preprocessor = make_preprocessor(scaler)
     preprocessor.fit(X)
 
     return preprocessor
 
 
-def fit_nn(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, n_neighbors: int) -> NearestNeighbors:
+def fit_nn(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, n_neighbors: int, engine: str = "sklearn",
+           deduplicate: bool = False, decimals: int = None, metric: str = "euclidean",
+           plants_dataset: pd.DataFrame = None,
+           sharding: Dict[str, Any] = None) -> Union[NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN, ShardedKNN]:
     """
     Fit a Nearest Neighbors model to the preprocessed feature matrix.
 
@@ -74,11 +125,436 @@ def fit_nn(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, n_neighbors:
         X (pd.DataFrame): The feature matrix.
         fitted_preprocessor (ColumnTransformer): The fitted column transformer.
         n_neighbors (int): The number of neighbors to use.
+        engine (str, optional): 'sklearn' for a NearestNeighbors model, 'exact' for the blocked GEMM ExactKNN engine,
+            'packed' for the bit-packed PackedKNN engine.
+        deduplicate (bool, optional): Whether to index each distinct feature vector once, with the list of its plants.
+        decimals (int, optional): The number of decimals the vectors are rounded to before deduplication,
+            None for exact equality.
+        metric (str, optional): The distance metric, any sklearn metric for the 'sklearn' engine,
+            the 'exact' and 'packed' engines only compute euclidean distances.
+        plants_dataset (pd.DataFrame, optional): The recommendation dataset, aligned with X, holding the shard keys.
+        sharding (Dict[str, Any], optional): The 'strategy' ('category' or 'hash', None for a single index),
+            the key 'column', the 'n_shards' of the hash strategy and the 'n_jobs' threads querying the shards.
 
     Returns:
-        NearestNeighbors: The fitted Nearest Neighbors model.
+        Union[NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN, ShardedKNN]: The fitted Nearest Neighbors model.
+    """
+    sharded = bool(sharding and sharding.get("strategy"))
+    shard_keys = plants_dataset[sharding["column"]].to_numpy() if sharded else None
+
+    return build_nn_index(fitted_preprocessor.transform(X), n_neighbors, engine, deduplicate, decimals, metric,
+                          shard_keys, sharding, preprocessor_columns(fitted_preprocessor, X.dtypes))
+
+
+def build_nn_index(X_transformed, n_neighbors: int, engine: str = "sklearn", deduplicate: bool = False,
+                   decimals: int = None, metric: str = "euclidean", shard_keys: np.ndarray = None,
+                   sharding: Dict[str, Any] = None,
+                   packed_columns: Tuple[np.ndarray, np.ndarray, np.ndarray] = None) -> Union[
+                       NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN, ShardedKNN]:
     """
-    nn = NearestNeighbors(n_neighbors=n_neighbors)
-    nn.fit(fitted_preprocessor.transform(X))
+    Fit a Nearest Neighbors model to a preprocessed feature matrix.
+
+    Args:
+        X_transformed: The preprocessed feature matrix (in memory or memory-mapped).
+        n_neighbors (int): The number of neighbors to use.
+        engine (str, optional): 'sklearn', 'exact' or 'packed' (see fit_nn).
+        deduplicate (bool, optional): Whether to index each distinct feature vector once, with the list of its plants.
+        decimals (int, optional): The number of decimals the vectors are rounded to before deduplication,
+            None for exact equality.
+        metric (str, optional): The distance metric (see fit_nn).
+        shard_keys (np.ndarray, optional): The shard key of each plant, when the index is sharded.
+        sharding (Dict[str, Any], optional): The sharding parameters (see fit_nn).
+        packed_columns (Tuple[np.ndarray, np.ndarray, np.ndarray], optional): The binary, ordinal and float columns
+            of the 'packed' engine, given by the preprocessor (see preprocessor_columns).
+
+    Returns:
+        Union[NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN, ShardedKNN]: The fitted Nearest Neighbors model.
+    """
+    if engine in ("exact", "packed") and metric != "euclidean":
+        raise ValueError(f"The '{engine}' engine only supports the euclidean metric, got '{metric}'")
+    sharded = bool(sharding and sharding.get("strategy"))
+    if engine == "exact":
+        nn = ExactKNN(n_neighbors=n_neighbors)
+    elif engine == "packed":
+        nn = PackedKNN(n_neighbors=n_neighbors, columns=packed_columns)
+    elif engine == "sklearn":
+        nn = NearestNeighbors(n_neighbors=n_neighbors, metric=metric)
+    else:
+        raise ValueError(f"Unknown nearest neighbors engine '{engine}', expected 'sklearn', 'exact' or 'packed'")
+    if deduplicate:
+        nn = DeduplicatedKNN(nn, n_neighbors=n_neighbors, decimals=decimals)
+    if sharded:
+        shards = assign_shards(shard_keys, sharding["strategy"], sharding.get("n_shards"))
+        return ShardedKNN(nn, n_neighbors=n_neighbors, n_jobs=sharding.get("n_jobs")).fit(X_transformed, shards)
+    nn.fit(X_transformed)
 
     return nn
+
+
+def build_model_bundle(fitted_preprocessor: ColumnTransformer, nn: NearestNeighbors, plants_dataset: pd.DataFrame) -> ModelBundle:
+    """
+    Bundle the fitted preprocessor, the fitted Nearest Neighbors model and the plant table aligned with it.
+
+    Args:
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        nn (NearestNeighbors): The fitted Nearest Neighbors model.
+        plants_dataset (pd.DataFrame): The recommendation dataset the model was fitted on.
+
+    Returns:
+        ModelBundle: The model bundle.
+    """
+    return ModelBundle(fitted_preprocessor, nn, plants_dataset.reset_index(drop=True))
+
+
+def build_similar_plants_graph(X: pd.DataFrame, fitted_preprocessor: ColumnTransformer, plants_dataset: pd.DataFrame,
+                               id_col: str, n_similar: int, block_size: int) -> SimilarPlantsGraph:
+    """
+    Precompute the graph of the most similar plants of every plant of the recommendation dataset.
+
+    Args:
+        X (pd.DataFrame): The feature matrix.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        plants_dataset (pd.DataFrame): The recommendation dataset, aligned with X.
+        id_col (str): The name of the column representing the ID.
+        n_similar (int): The number of similar plants to keep for each plant.
+        block_size (int): The number of plants processed per block.
+
+    Returns:
+        SimilarPlantsGraph: The similar plants graph.
+    """
+    return SimilarPlantsGraph.build(fitted_preprocessor.transform(X), plants_dataset[id_col].to_numpy(),
+                                    n_similar=n_similar, block_size=block_size)
+
+
+def build_name_index(plants_dataset: pd.DataFrame, name_cols: List[str]) -> PlantNameIndex:
+    """
+    Build the name search index (autocomplete and fuzzy search) of the plants of the recommendation dataset.
+
+    Args:
+        plants_dataset (pd.DataFrame): The recommendation dataset.
+        name_cols (List[str]): The name columns, e.g. common_name and scientific_name (lists of names).
+
+    Returns:
+        PlantNameIndex: The name search index, aligned with the rows of the recommendation dataset.
+    """
+    return PlantNameIndex.build(plants_dataset.reset_index(drop=True), name_cols)
+
+
+def fit_preprocessor_streaming(chunks: Iterable[pd.DataFrame], col_to_drop: List[str], poisonous_col: List[str],
+                               scaler: str = "robust",
+                               quantile_sketch_size: int = 200) -> Tuple[ColumnTransformer, StreamingFeatureStats]:
+    """
+    Fit the preprocessor in a single pass over the chunks of the clean dataset, without holding it in memory:
+    the type vocabulary and the scaler statistics are gathered chunk by chunk, the median and interquartile range
+    of the 'robust' scaler being estimated by quantile sketches.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks of the clean dataset.
+        col_to_drop (List[str]): List of column names to drop from the dataset.
+        poisonous_col (List[str]): List of column names indicating poisonous plants.
+        scaler (str, optional): The scaler of the hardiness features: 'robust', 'standard' or 'minmax'.
+        quantile_sketch_size (int, optional): The size of the quantile sketches.
+
+    Returns:
+        Tuple[ColumnTransformer, StreamingFeatureStats]: The fitted column transformer, and the statistics
+        it was fitted on (including the number of plants).
+    """
+    stats = StreamingFeatureStats(CATEGORY_COLS, SCALED_COLS, quantile_sketch_size)
+    first_chunk = None
+    for chunk in chunks:
+        X_chunk, _ = prepare_data(chunk, col_to_drop, poisonous_col)
+        stats.update(X_chunk)
+        if first_chunk is None and len(X_chunk):
+            first_chunk = X_chunk
+    if first_chunk is None:
+        raise ValueError("No plant left to fit the preprocessor on")
+
+    # the type categories and the scaler come from the statistics of all the chunks, the ordinal categories are fixed:
+    # the fit on the first chunk only records the columns
+    preprocessor = make_preprocessor(scaler, type_categories=stats.categories('type'),
+                                     fixed_scaler=stats.fixed_scaler(scaler, SCALED_COLS)).fit(first_chunk)
+    logger.info("Preprocessor fitted on %d plants (%s scaler)", stats.n_rows, scaler)
+
+    return preprocessor, stats
+
+
+def filter_plants_streaming(chunks: Iterable[pd.DataFrame], poisonous_col: List[str]) -> MappedChunks:
+    """
+    Remove the poisonous plants chunk by chunk: the recommendation dataset, aligned with the streamed matrix.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks of the clean dataset.
+        poisonous_col (List[str]): List of column names indicating poisonous plants.
+
+    Returns:
+        MappedChunks: The chunks of the recommendation dataset, computed as they are saved.
+    """
+    return MappedChunks(chunks, remove_poisonous_plants, poisonous_col)
+
+
+def transform_streaming(chunks: Iterable[pd.DataFrame], fitted_preprocessor: ColumnTransformer,
+                        feature_stats: StreamingFeatureStats, col_to_drop: List[str],
+                        poisonous_col: List[str]) -> ChunkedMatrix:
+    """
+    Transform the clean dataset chunk by chunk into the preprocessed feature matrix.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks of the clean dataset.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        feature_stats (StreamingFeatureStats): The statistics of the fit, giving the number of plants.
+        col_to_drop (List[str]): List of column names to drop from the dataset.
+        poisonous_col (List[str]): List of column names indicating poisonous plants.
+
+    Returns:
+        ChunkedMatrix: The preprocessed feature matrix, computed chunk by chunk as it is saved.
+    """
+    def transformed_chunks() -> Iterator[np.ndarray]:
+        for chunk in chunks:
+            X_chunk, _ = prepare_data(chunk, col_to_drop, poisonous_col)
+            if len(X_chunk):
+                X_transformed = fitted_preprocessor.transform(X_chunk)
+                if hasattr(X_transformed, "toarray"):
+                    X_transformed = X_transformed.toarray()
+                yield np.asarray(X_transformed, dtype=np.float64)
+
+    n_features = len(fitted_preprocessor.get_feature_names_out())
+    return ChunkedMatrix(transformed_chunks(), (feature_stats.n_rows, n_features))
+
+
+def fit_nn_streaming(X_transformed: np.ndarray, fitted_preprocessor: ColumnTransformer, n_neighbors: int,
+                     engine: str = "sklearn",
+                     deduplicate: bool = False, decimals: int = None, metric: str = "euclidean",
+                     plants_chunks: Iterable[pd.DataFrame] = None,
+                     sharding: Dict[str, Any] = None) -> Union[NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN,
+                                                               ShardedKNN]:
+    """
+    Fit a Nearest Neighbors model to the memory-mapped preprocessed feature matrix.
+
+    Args:
+        X_transformed (np.ndarray): The memory-mapped preprocessed feature matrix.
+        fitted_preprocessor (ColumnTransformer): The fitted column transformer.
+        n_neighbors (int): The number of neighbors to use.
+        engine (str, optional): 'sklearn', 'exact' or 'packed' (see fit_nn).
+        deduplicate (bool, optional): Whether to index each distinct feature vector once, with the list of its plants.
+        decimals (int, optional): The number of decimals the vectors are rounded to before deduplication,
+            None for exact equality.
+        metric (str, optional): The distance metric (see fit_nn).
+        plants_chunks (Iterable[pd.DataFrame], optional): The chunks of the recommendation dataset, aligned with
+            the matrix, holding the shard keys and the dtypes of the features.
+        sharding (Dict[str, Any], optional): The sharding parameters (see fit_nn).
+
+    Returns:
+        Union[NearestNeighbors, ExactKNN, PackedKNN, DeduplicatedKNN, ShardedKNN]: The fitted Nearest Neighbors model.
+    """
+    shard_keys, packed_columns = None, None
+    if sharding and sharding.get("strategy"):
+        shard_keys = np.concatenate([chunk[sharding["column"]].to_numpy() for chunk in plants_chunks])
+    if engine == "packed":
+        # the dtypes of the first chunk are those of all the chunks
+        packed_columns = preprocessor_columns(fitted_preprocessor, next(iter(plants_chunks)).dtypes)
+
+    return build_nn_index(X_transformed, n_neighbors, engine, deduplicate, decimals, metric, shard_keys, sharding,
+                          packed_columns)
+
+
+def collect_plants_streaming(plants_chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Gather the chunks of the recommendation dataset into the plant table, for the model bundle and the name index
+    (the inference loads the whole table anyway).
+
+    Args:
+        plants_chunks (Iterable[pd.DataFrame]): The chunks of the recommendation dataset, aligned with the matrix.
+
+    Returns:
+        pd.DataFrame: The recommendation dataset.
+    """
+    return pd.concat(list(plants_chunks), ignore_index=True)
+
+
+def build_similar_plants_graph_streaming(X_transformed: np.ndarray, plants_dataset: pd.DataFrame, id_col: str,
+                                         n_similar: int, block_size: int) -> SimilarPlantsGraph:
+    """
+    Precompute the graph of the most similar plants from the memory-mapped preprocessed feature matrix.
+
+    Args:
+        X_transformed (np.ndarray): The memory-mapped preprocessed feature matrix.
+        plants_dataset (pd.DataFrame): The recommendation dataset, aligned with the matrix.
+        id_col (str): The name of the column representing the ID.
+        n_similar (int): The number of similar plants to keep for each plant.
+        block_size (int): The number of plants processed per block.
+
+    Returns:
+        SimilarPlantsGraph: The similar plants graph.
+    """
+    return SimilarPlantsGraph.build(X_transformed, plants_dataset[id_col].to_numpy(), n_similar=n_similar,
+                                    block_size=block_size)
+
+
+def plant_genus(scientific_names: pd.Series) -> pd.Series:
+    """
+    Get the genus of each plant: the first word of its first scientific name, lowercased.
+
+    Args:
+        scientific_names (pd.Series): The scientific names of the plants, lists or their string representation.
+
+    Returns:
+        pd.Series: The genus of each plant, None if it has no scientific name.
+    """
+    names = list_tokens(scientific_names.reset_index(drop=True))
+    first_names = names[names != ""].groupby(level=0).first()
+    return first_names.str.split().str[0].reindex(range(len(scientific_names))).set_axis(scientific_names.index)
+
+
+def _init_sweep_worker(matrices: Dict[str, np.ndarray], labels: np.ndarray, n_eval_neighbors: int) -> None:
+    """
+    Load the data of the sweep in a worker process. With the 'fork' start method, the transformed matrices
+    are inherited from the parent process (copy-on-write) instead of being pickled.
+
+    Args:
+        matrices (Dict[str, np.ndarray]): The transformed plant matrix of each scaler.
+        labels (np.ndarray): The held-out label code of each plant, -1 if unknown.
+        n_eval_neighbors (int): The number of neighbors the label agreement is measured on.
+    """
+    # one BLAS/OpenMP thread per process: the parallelism comes from the processes
+    threadpool_limits(1)
+    _SWEEP_DATA.update(matrices=matrices, labels=labels, n_eval_neighbors=n_eval_neighbors)
+
+
+def leave_one_out_agreement(nn: NearestNeighbors, X_transformed: np.ndarray, labels: np.ndarray,
+                            n_neighbors: int) -> float:
+    """
+    Compute the leave-one-out label agreement of a fitted model: each plant whose label is shared by another plant
+    is queried against all the other plants, and the agreement is the share of its k neighbors having its label,
+    averaged over these plants. The labels must not be features of the model (e.g. the genus), otherwise
+    the candidate which weighs them most wins, whatever its recommendations.
+
+    Args:
+        nn (NearestNeighbors): The Nearest Neighbors model, fitted on X_transformed.
+        X_transformed (np.ndarray): The transformed plant matrix.
+        labels (np.ndarray): The label code of each plant, -1 if unknown.
+        n_neighbors (int): The number of neighbors, the same for every candidate so that the agreements compare.
+
+    Returns:
+        float: The leave-one-out agreement, between 0 and 1, NaN if no label is shared by two plants.
+    """
+    n_plants = len(X_transformed)
+    label_counts = np.bincount(labels[labels >= 0])
+    queries = np.flatnonzero((labels >= 0) & (label_counts[np.maximum(labels, 0)] >= 2))
+    if len(queries) == 0:
+        return float("nan")
+    _, indices = nn.kneighbors(X_transformed[queries], n_neighbors=min(n_neighbors + 1, n_plants))
+    # leave each plant out of its own neighbors; when duplicate vectors pushed it out of the k + 1 nearest,
+    # the farthest neighbor is dropped instead
+    is_self = indices == queries[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    neighbors = indices[~is_self].reshape(len(queries), -1)
+
+    return float(np.mean(labels[neighbors] == labels[queries, None]))
+
+
+def evaluate_candidate(scaler: str, metric: str) -> Dict[str, Any]:
+    """
+    Fit a candidate of the sweep and compute its leave-one-out label agreement, in a worker process.
+
+    Args:
+        scaler (str): The scaler of the hardiness features, selecting the shared transformed matrix.
+        metric (str): The distance metric.
+
+    Returns:
+        Dict[str, Any]: The candidate and its leave-one-out agreement.
+    """
+    X_transformed = _SWEEP_DATA["matrices"][scaler]
+    nn = NearestNeighbors(metric=metric).fit(X_transformed)
+
+    return {"scaler": scaler, "metric": metric,
+            "loo_agreement": leave_one_out_agreement(nn, X_transformed, _SWEEP_DATA["labels"],
+                                                     _SWEEP_DATA["n_eval_neighbors"])}
+
+
+def time_candidate(X_transformed: np.ndarray, metric: str, n_neighbors: int,
+                   query_positions: np.ndarray) -> Tuple[float, float]:
+    """
+    Measure the fit time and the median single-query latency of a candidate. It runs in the main process,
+    after the worker pool is shut down, so that the timings are not inflated by the other candidates.
+
+    Args:
+        X_transformed (np.ndarray): The transformed plant matrix.
+        metric (str): The distance metric.
+        n_neighbors (int): The number of recommended plants.
+        query_positions (np.ndarray): The positions of the plants queried one by one.
+
+    Returns:
+        Tuple[float, float]: The fit time in seconds and the median latency in milliseconds.
+    """
+    start = time.perf_counter()
+    nn = NearestNeighbors(n_neighbors=n_neighbors, metric=metric).fit(X_transformed)
+    fit_seconds = time.perf_counter() - start
+
+    latencies = []
+    for position in query_positions:
+        start = time.perf_counter()
+        nn.kneighbors(X_transformed[position:position + 1])
+        latencies.append(time.perf_counter() - start)
+    return fit_seconds, float(np.median(latencies) * 1000)
+
+
+def sweep_hyperparameters(X: pd.DataFrame, plants_dataset: pd.DataFrame, grid: Dict[str, List[Any]], label_col: str,
+                          n_eval_neighbors: int, n_neighbors: int, n_workers: int, n_latency_queries: int,
+                          latency_penalty: float, random_state: int) -> Dict[str, Any]:
+    """
+    Sweep a grid of scalers and distance metrics, and rank the candidates.
+
+    The preprocessor is fitted and the plants are transformed once per scaler: the transformed matrices are shared
+    by all the candidates of the scaler, through the initializer of the process pool evaluating the candidates.
+    Each candidate is scored by its leave-one-out agreement on a held-out label, the genus of the plants (not a
+    feature), at the same number of neighbors n_eval_neighbors for every candidate, minus latency_penalty x its
+    median single-query latency (in ms), timed serially once the pool is shut down. When no genus is shared
+    by two plants, the agreements and the scores are NaN and there is no best candidate.
+
+    Args:
+        X (pd.DataFrame): The feature matrix.
+        plants_dataset (pd.DataFrame): The plant table aligned with X.
+        grid (Dict[str, List[Any]]): The values of 'scaler' and 'metric' to sweep.
+        label_col (str): The column of the scientific names the genus of the plants is taken from.
+        n_eval_neighbors (int): The number of neighbors the label agreement is measured on.
+        n_neighbors (int): The number of recommended plants, for the latency.
+        n_workers (int): The number of processes, the number of CPUs if None.
+        n_latency_queries (int): The number of plants queried one by one to measure the latency.
+        latency_penalty (float): The score penalty per millisecond of latency.
+        random_state (int): The seed of the latency queries sampling.
+
+    Returns:
+        Dict[str, Any]: The best candidate (None if no candidate has a score) and all the candidates ranked
+            by decreasing score, those without a score last.
+    """
+    matrices = {}
+    for scaler in grid["scaler"]:
+        transformed = fit_preprocessor(X, scaler).transform(X)
+        matrices[scaler] = np.asarray(transformed.toarray() if hasattr(transformed, "toarray") else transformed,
+                                      dtype=np.float64)
+    labels = pd.factorize(plant_genus(plants_dataset[label_col]))[0]
+
+    candidates = list(itertools.product(grid["scaler"], grid["metric"]))
+    n_workers = min(n_workers or os.cpu_count(), len(candidates))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_sweep_worker,
+                             initargs=(matrices, labels, n_eval_neighbors)) as executor:
+        futures = [executor.submit(evaluate_candidate, *candidate) for candidate in candidates]
+        results = [future.result() for future in futures]
+
+    rng = np.random.default_rng(random_state)
+    query_positions = rng.choice(len(X), size=min(n_latency_queries, len(X)), replace=False)
+    for result in results:
+        result["fit_seconds"], result["latency_ms"] = time_candidate(matrices[result["scaler"]], result["metric"],
+                                                                     n_neighbors, query_positions)
+        result["score"] = result["loo_agreement"] - latency_penalty * result["latency_ms"]
+    # NaN scores are ranked last: they do not compare with the others
+    results.sort(key=lambda result: (np.isnan(result["score"]), -result["score"]))
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+    best = results[0] if not np.isnan(results[0]["score"]) else None
+    if best is None:
+        logger.warning("No genus of '%s' is shared by two plants: the sweep candidates cannot be ranked", label_col)
+
+    return {"n_plants": len(X), "label": f"genus of {label_col}", "n_labelled_plants": int(np.sum(labels >= 0)),
+            "n_eval_neighbors": n_eval_neighbors, "latency_penalty": latency_penalty,
+            "best": best, "candidates": results}
@@ -1,5 +1,8 @@
 from kedro.pipeline import Pipeline, node
-from .nodes import prepare_data, fit_preprocessor, fit_nn
+from .nodes import (prepare_data, fit_preprocessor, fit_nn, build_model_bundle, build_similar_plants_graph,
+                    build_name_index, sweep_hyperparameters, fit_preprocessor_streaming, filter_plants_streaming,
+                    transform_streaming, fit_nn_streaming, collect_plants_streaming,
+                    build_similar_plants_graph_streaming)
 
 
 def create_training_pipeline() -> Pipeline:
@@ -13,17 +16,159 @@ def create_training_pipeline() -> Pipeline:
              ),
 
         node(func=fit_preprocessor,
-             inputs=dict(X="X"),
+             inputs=dict(X="X",
+                         scaler="params:SCALER"),
              outputs="recommendation_preprocessor",
-             name="fit_preprocessor_node"
+             name="fit_preprocessor_node",
+             tags="no_cache"
              ),
 
         node(func=fit_nn,
              inputs=dict(X="X",
                          fitted_preprocessor="recommendation_preprocessor",
-                         n_neighbors="params:K_NEIGHBORS"),
+                         n_neighbors="params:K_NEIGHBORS",
+                         engine="params:KNN_ENGINE",
+                         deduplicate="params:KNN_DEDUPLICATE",
+                         decimals="params:KNN_DEDUPLICATE_DECIMALS",
+                         metric="params:KNN_METRIC",
+                         plants_dataset="recommendation_dataset",
+                         sharding="params:KNN_SHARDING"),
              outputs="nearest_neighbors",
-             name="fit_nearest_neighbors_node"
+             name="fit_nearest_neighbors_node",
+             tags="no_cache"
+             ),
+
+        node(func=build_model_bundle,
+             inputs=dict(fitted_preprocessor="recommendation_preprocessor",
+                         nn="nearest_neighbors",
+                         plants_dataset="recommendation_dataset"),
+             outputs="model_bundle",
+             name="build_model_bundle_node"
+             ),
+
+        node(func=build_similar_plants_graph,
+             inputs=dict(X="X",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         plants_dataset="recommendation_dataset",
+                         id_col="params:ID_COL",
+                         n_similar="params:N_SIMILAR_PLANTS",
+                         block_size="params:SIMILARITY_BLOCK_SIZE"),
+             outputs="similar_plants_graph",
+             name="build_similar_plants_graph_node"
+             ),
+
+        node(func=build_name_index,
+             inputs=dict(plants_dataset="recommendation_dataset",
+                         name_cols="params:NAME_INDEX_COLUMNS"),
+             outputs="plant_name_index",
+             name="build_plant_name_index_node"
+             ),
+    ])
+
+    return pipeline
+
+
+def create_hyperparameter_sweep_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        node(func=sweep_hyperparameters,
+             inputs=dict(X="X",
+                         plants_dataset="recommendation_dataset",
+                         grid="params:SWEEP_GRID",
+                         label_col="params:SWEEP_LABEL_COL",
+                         n_eval_neighbors="params:SWEEP_EVAL_NEIGHBORS",
+                         n_neighbors="params:K_NEIGHBORS",
+                         n_workers="params:SWEEP_N_WORKERS",
+                         n_latency_queries="params:SWEEP_N_LATENCY_QUERIES",
+                         latency_penalty="params:SWEEP_LATENCY_PENALTY",
+                         random_state="params:SWEEP_RANDOM_STATE"),
+             outputs="hyperparameter_sweep",
+             name="sweep_hyperparameters_node",
+             tags="no_cache"
+             ),
+    ])
+
+    return pipeline
+
+
+def create_streaming_training_pipeline() -> Pipeline:
+    pipeline = Pipeline([
+        node(func=fit_preprocessor_streaming,
+             inputs=dict(chunks="clean_dataset_chunks",
+                         col_to_drop="params:COLUMNS_TO_DROP",
+                         poisonous_col="params:POISONOUS_COL",
+                         scaler="params:SCALER",
+                         quantile_sketch_size="params:STREAMING_QUANTILE_SKETCH_SIZE"),
+             outputs=["recommendation_preprocessor", "streaming_feature_stats"],
+             name="fit_preprocessor_streaming_node",
+             tags="no_cache"
+             ),
+
+        node(func=filter_plants_streaming,
+             inputs=dict(chunks="clean_dataset_chunks",
+                         poisonous_col="params:POISONOUS_COL"),
+             outputs="recommendation_dataset_chunks",
+             name="filter_plants_streaming_node",
+             tags="no_cache"
+             ),
+
+        node(func=transform_streaming,
+             inputs=dict(chunks="clean_dataset_chunks",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         feature_stats="streaming_feature_stats",
+                         col_to_drop="params:COLUMNS_TO_DROP",
+                         poisonous_col="params:POISONOUS_COL"),
+             outputs="X_transformed_matrix",
+             name="transform_streaming_node",
+             tags="no_cache"
+             ),
+
+        node(func=fit_nn_streaming,
+             inputs=dict(X_transformed="X_transformed_matrix",
+                         fitted_preprocessor="recommendation_preprocessor",
+                         n_neighbors="params:K_NEIGHBORS",
+                         engine="params:KNN_ENGINE",
+                         deduplicate="params:KNN_DEDUPLICATE",
+                         decimals="params:KNN_DEDUPLICATE_DECIMALS",
+                         metric="params:KNN_METRIC",
+                         plants_chunks="recommendation_dataset_chunks",
+                         sharding="params:KNN_SHARDING"),
+             outputs="nearest_neighbors",
+             name="fit_nearest_neighbors_streaming_node",
+             tags="no_cache"
+             ),
+
+        # the bundle, the similar plants graph and the name index are rebuilt on the new plant table,
+        # so that their rows match the positions of the index
+        node(func=collect_plants_streaming,
+             inputs=dict(plants_chunks="recommendation_dataset_chunks"),
+             outputs="streamed_recommendation_dataset",
+             name="collect_plants_streaming_node",
+             tags="no_cache"
+             ),
+
+        node(func=build_model_bundle,
+             inputs=dict(fitted_preprocessor="recommendation_preprocessor",
+                         nn="nearest_neighbors",
+                         plants_dataset="streamed_recommendation_dataset"),
+             outputs="model_bundle",
+             name="build_model_bundle_streaming_node"
+             ),
+
+        node(func=build_similar_plants_graph_streaming,
+             inputs=dict(X_transformed="X_transformed_matrix",
+                         plants_dataset="streamed_recommendation_dataset",
+                         id_col="params:ID_COL",
+                         n_similar="params:N_SIMILAR_PLANTS",
+                         block_size="params:SIMILARITY_BLOCK_SIZE"),
+             outputs="similar_plants_graph",
+             name="build_similar_plants_graph_streaming_node"
+             ),
+
+        node(func=build_name_index,
+             inputs=dict(plants_dataset="streamed_recommendation_dataset",
+                         name_cols="params:NAME_INDEX_COLUMNS"),
+             outputs="plant_name_index",
+             name="build_plant_name_index_streaming_node"
              ),
     ])
 
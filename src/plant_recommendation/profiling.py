@@ -0,0 +1,223 @@
+"""Function-level profilers producing collapsed stacks (flamegraph input) and hotspot tables."""
+import sys
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+from types import CodeType, FrameType
+
+
+def _code_label(code: CodeType) -> str:
+    """
+    Build a readable label for a Python function, e.g. 'pandas/core/indexing.py:_LocIndexer.__setitem__'.
+
+    Args:
+        code (CodeType): The code object of the function.
+
+    Returns:
+        str: The label of the function.
+    """
+    filename = code.co_filename.replace("\\", "/")
+    for marker in ("site-packages/", "src/", "lib/python"):
+        if marker in filename:
+            filename = filename.rsplit(marker, 1)[1]
+            break
+    return f"{filename}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _builtin_label(function) -> str:
+    """
+    Build a readable label for a C function, e.g. 'builtins.eval'.
+
+    Args:
+        function: The builtin function or method.
+
+    Returns:
+        str: The label of the function.
+    """
+    module = getattr(function, "__module__", None) or type(getattr(function, "__self__", None)).__name__
+    return f"{module}.{getattr(function, '__qualname__', repr(function))}"
+
+
+class StackProfiler(ABC):
+    """
+    Abstract base class of the profilers: accumulates a weight per call stack.
+
+    Attributes:
+        stacks (Counter): The weight of each call stack, stacks being tuples of function labels from the root.
+        unit (str): The unit of the weights.
+    """
+
+    unit = "samples"
+
+    def __init__(self):
+        """
+        Initialize the StackProfiler class.
+        """
+        self.stacks: Counter = Counter()
+
+    @abstractmethod
+    def start(self) -> None:
+        """
+        Start collecting the call stacks of the current thread.
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """
+        Stop collecting the call stacks.
+        """
+
+    def __enter__(self) -> "StackProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def collapsed(self) -> List[str]:
+        """
+        Format the stacks in the collapsed format read by flamegraph.pl, speedscope or inferno.
+
+        Returns:
+            List[str]: One 'root;caller;callee weight' line per stack.
+        """
+        return [f"{';'.join(stack)} {int(weight)}" for stack, weight in sorted(self.stacks.items()) if int(weight) > 0]
+
+    def hotspots(self, top_n: int) -> List[Tuple[str, float, float]]:
+        """
+        Compute the functions with the highest self weight.
+
+        Args:
+            top_n (int): The number of functions to return.
+
+        Returns:
+            List[Tuple[str, float, float]]: The label, self weight and total weight of each function.
+        """
+        self_weights: Dict[str, float] = Counter()
+        total_weights: Dict[str, float] = Counter()
+        for stack, weight in self.stacks.items():
+            self_weights[stack[-1]] += weight
+            for label in set(stack):
+                total_weights[label] += weight
+        ranking = sorted(self_weights.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        return [(label, weight, total_weights[label]) for label, weight in ranking]
+
+    def write(self, output_dir: Path, name: str, top_n: int) -> None:
+        """
+        Write the collapsed stacks and the hotspot table of the profile.
+
+        Args:
+            output_dir (Path): The directory of the reports.
+            name (str): The base name of the report files.
+            top_n (int): The number of functions in the hotspot table.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / f"{name}.collapsed").write_text("\n".join(self.collapsed()) + "\n", encoding="utf8")
+
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{'self %':>7} {'total %':>7} {'self (' + self.unit + ')':>16}  function"]
+        for label, self_weight, total_weight in self.hotspots(top_n):
+            lines.append(f"{100 * self_weight / total:7.2f} {100 * total_weight / total:7.2f} "
+                         f"{self_weight:16.0f}  {label}")
+        (output_dir / f"{name}_hotspots.txt").write_text("\n".join(lines) + "\n", encoding="utf8")
+
+
+class SamplingProfiler(StackProfiler):
+    """
+    A statistical profiler: a background thread samples the call stack of the profiled thread
+    at a fixed interval. Its overhead is low and does not depend on the number of calls.
+
+    Attributes:
+        interval (float): The number of seconds between two samples.
+    """
+
+    unit = "samples"
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the SamplingProfiler class.
+
+        Args:
+            interval (float, optional): The number of seconds between two samples.
+        """
+        super().__init__()
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._target_id = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame: FrameType = sys._current_frames().get(self._target_id)
+            stack = []
+            while frame is not None:
+                stack.append(_code_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._target_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class TracingProfiler(StackProfiler):
+    """
+    A deterministic profiler: every Python and C call of the profiled thread is traced with
+    sys.setprofile and its self time is attributed to its exact call stack.
+    Exact, but it slows down call-heavy code (e.g. row-wise ``apply``) significantly.
+    """
+
+    unit = "us"
+
+    def __init__(self):
+        """
+        Initialize the TracingProfiler class.
+        """
+        super().__init__()
+        # each entry: [label, start time, time spent in children]
+        self._stack: List[list] = []
+        self._previous = None
+
+    def _callback(self, frame: FrameType, event: str, arg) -> None:
+        now = time.perf_counter()
+        if event == "call":
+            self._stack.append([_code_label(frame.f_code), now, 0.0])
+        elif event == "c_call":
+            self._stack.append([_builtin_label(arg), now, 0.0])
+        elif self._stack and event in ("return", "c_return", "c_exception"):
+            path = tuple(entry[0] for entry in self._stack)
+            _, start, children = self._stack.pop()
+            elapsed = now - start
+            self.stacks[path] += (elapsed - children) * 1e6
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def start(self) -> None:
+        self._previous = sys.getprofile()
+        sys.setprofile(self._callback)
+
+    def stop(self) -> None:
+        sys.setprofile(self._previous)
+        now = time.perf_counter()
+        # close the calls still open (the caller of stop itself)
+        while self._stack:
+            path = tuple(entry[0] for entry in self._stack)
+            _, start, children = self._stack.pop()
+            self.stacks[path] += (now - start - children) * 1e6
+            if self._stack:
+                self._stack[-1][2] += now - start
+
+
+PROFILERS = {"sampling": SamplingProfiler, "deterministic": TracingProfiler}
@@ -0,0 +1,311 @@
+# MODEL BUNDLE
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import pandas as pd
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+from sklearn.compose import ColumnTransformer
+from sklearn.neighbors import NearestNeighbors
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+PREPROCESSOR_FILE = "preprocessor.pickle"
+NEAREST_NEIGHBORS_FILE = "nn.pickle"
+PLANTS_DATASET_FILE = "plants_dataset.pq"
+
+
+def file_checksum(path: Path) -> str:
+    """
+    Compute the sha256 checksum of a file.
+
+    Args:
+        path (Path): The path of the file.
+
+    Returns:
+        str: The sha256 hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelBundleError(Exception):
+    """Raised when a model bundle is inconsistent or corrupted."""
+
+
+class ModelBundle:
+    """
+    A model bundle holding everything needed to serve recommendations together:
+    the fitted preprocessor, the fitted nearest neighbors index and the plant table aligned with the index rows.
+
+    On disk, a bundle is a directory with one file per component and a manifest recording
+    the checksum of each file, so that a consumer never pairs components of different trainings.
+
+    Attributes:
+        preprocessor (ColumnTransformer): The fitted preprocessor.
+        nn (NearestNeighbors): The fitted nearest neighbors model.
+        plants_dataset (pd.DataFrame): The plant table, row i being the plant indexed at position i.
+        manifest (Dict[str, Any]): The manifest of the bundle (version, checksums, shapes).
+    """
+
+    def __init__(self, preprocessor: ColumnTransformer, nn: NearestNeighbors, plants_dataset: pd.DataFrame,
+                 manifest: Dict[str, Any] = None):
+        """
+        Initialize the ModelBundle class, checking that its components are aligned.
+
+        Args:
+            preprocessor (ColumnTransformer): The fitted preprocessor.
+            nn (NearestNeighbors): The fitted nearest neighbors model.
+            plants_dataset (pd.DataFrame): The plant table aligned with the index rows.
+            manifest (Dict[str, Any], optional): The manifest of the bundle, set when loaded from disk.
+        """
+        if nn.n_samples_fit_ != len(plants_dataset):
+            raise ModelBundleError(f"The index has {nn.n_samples_fit_} rows but the plant table has "
+                                   f"{len(plants_dataset)} rows")
+        n_features = len(preprocessor.get_feature_names_out())
+        if nn.n_features_in_ != n_features:
+            raise ModelBundleError(f"The index has {nn.n_features_in_} features but the preprocessor "
+                                   f"outputs {n_features} features")
+        self.preprocessor = preprocessor
+        self.nn = nn
+        self.plants_dataset = plants_dataset
+        self.manifest = manifest or {}
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.manifest.get("version")
+
+    def recommend(self, user_data: pd.DataFrame, n_recommendations: int = None) -> pd.DataFrame:
+        """
+        Recommend plants based on user data with the components of this bundle.
+
+        Args:
+            user_data (pd.DataFrame): The user data for which to recommend plants.
+            n_recommendations (int, optional): The number of plants to recommend, the number the index was fitted with if None.
+
+        Returns:
+            pd.DataFrame: The recommended plants sorted by distance.
+        """
+        from ..pipelines.predict.nodes import recommand_plant
+
+        return recommand_plant(user_data, self.nn, self.preprocessor, self.plants_dataset, n_recommendations)
+
+    def save(self, path: Path, version: str = None) -> None:
+        """
+        Write the bundle to a directory. The files are written to a temporary directory
+        which is renamed once complete, so readers never see a partial bundle.
+
+        Args:
+            path (Path): The directory of the bundle, which must not exist.
+            version (str, optional): The version recorded in the manifest.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.mkdir(parents=True)
+        try:
+            with open(tmp_path / PREPROCESSOR_FILE, "wb") as file:
+                pickle.dump(self.preprocessor, file, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(tmp_path / NEAREST_NEIGHBORS_FILE, "wb") as file:
+                pickle.dump(self.nn, file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.plants_dataset.to_parquet(tmp_path / PLANTS_DATASET_FILE)
+
+            manifest = {
+                "version": version or path.parent.name,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "n_plants": int(len(self.plants_dataset)),
+                "n_features": int(self.nn.n_features_in_),
+                "files": {name: {"sha256": file_checksum(tmp_path / name), "size": (tmp_path / name).stat().st_size}
+                          for name in (PREPROCESSOR_FILE, NEAREST_NEIGHBORS_FILE, PLANTS_DATASET_FILE)},
+            }
+            with open(tmp_path / MANIFEST_FILE, "w", encoding="utf8") as file:
+                json.dump(manifest, file, indent=2)
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.manifest = manifest
+
+    @classmethod
+    def load(cls, path: Path) -> "ModelBundle":
+        """
+        Read a bundle from a directory, verifying the checksum of every file against the manifest.
+
+        Args:
+            path (Path): The directory of the bundle.
+
+        Returns:
+            ModelBundle: The loaded bundle.
+        """
+        path = Path(path)
+        with open(path / MANIFEST_FILE, encoding="utf8") as file:
+            manifest = json.load(file)
+
+        for name, expected in manifest["files"].items():
+            if file_checksum(path / name) != expected["sha256"]:
+                raise ModelBundleError(f"Checksum mismatch for '{name}' in bundle '{path}'")
+
+        with open(path / PREPROCESSOR_FILE, "rb") as file:
+            preprocessor = pickle.load(file)
+        with open(path / NEAREST_NEIGHBORS_FILE, "rb") as file:
+            nn = pickle.load(file)
+        plants_dataset = pd.read_parquet(path / PLANTS_DATASET_FILE)
+
+        return cls(preprocessor, nn, plants_dataset, manifest)
+
+
+def latest_bundle_path(bundle_dir: Path) -> Optional[Path]:
+    """
+    Find the most recent complete version of a versioned bundle directory
+    (laid out by Kedro as <bundle_dir>/<version>/<bundle_dir name>).
+
+    Args:
+        bundle_dir (Path): The versioned bundle directory.
+
+    Returns:
+        Optional[Path]: The path of the most recent bundle with a manifest, None if there is none.
+    """
+    bundle_dir = Path(bundle_dir)
+    if not bundle_dir.is_dir():
+        return None
+    for version_dir in sorted(bundle_dir.iterdir(), reverse=True):
+        path = version_dir / bundle_dir.name
+        if (path / MANIFEST_FILE).exists():
+            return path
+    return None
+
+
+def prune_bundle_versions(bundle_dir: Path, keep: int) -> int:
+    """
+    Remove the oldest complete versions of a versioned bundle directory, keeping the most recent ones.
+    The versions without a manifest are left alone, as they may be bundles being written.
+
+    Args:
+        bundle_dir (Path): The versioned bundle directory.
+        keep (int): The number of complete versions kept.
+
+    Returns:
+        int: The number of versions removed.
+    """
+    bundle_dir = Path(bundle_dir)
+    if not bundle_dir.is_dir():
+        return 0
+    versions = [version_dir for version_dir in sorted(bundle_dir.iterdir(), reverse=True)
+                if (version_dir / bundle_dir.name / MANIFEST_FILE).exists()]
+    for version_dir in versions[max(keep, 1):]:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        logger.info("Removed model bundle version %s", version_dir.name)
+    return max(len(versions) - max(keep, 1), 0)
+
+
+class ModelBundleWatcher:
+    """
+    Serve recommendations from the most recent version of a versioned model bundle,
+    hot-reloading new versions in a running process.
+
+    A background thread polls the bundle directory; a new version is fully loaded and verified
+    before the reference to the current bundle is swapped. The swap is a single attribute assignment,
+    so queries are never paused and each query uses the components of one single bundle.
+
+    Attributes:
+        bundle_dir (Path): The versioned bundle directory.
+        poll_interval (float): The number of seconds between two checks for a new version.
+    """
+
+    def __init__(self, bundle_dir: str, poll_interval: float = 5.0):
+        """
+        Initialize the ModelBundleWatcher class and load the most recent bundle.
+
+        Args:
+            bundle_dir (str): The versioned bundle directory.
+            poll_interval (float, optional): The number of seconds between two checks for a new version.
+        """
+        self.bundle_dir = Path(bundle_dir)
+        self.poll_interval = poll_interval
+        self._bundle: Optional[ModelBundle] = None
+        self._bundle_path: Optional[Path] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if not self.refresh():
+            raise ModelBundleError(f"No model bundle found in '{self.bundle_dir}'")
+
+    @property
+    def bundle(self) -> ModelBundle:
+        return self._bundle
+
+    def refresh(self) -> bool:
+        """
+        Load the most recent bundle version if it is newer than the current one.
+
+        Returns:
+            bool: True if a new bundle was swapped in.
+        """
+        path = latest_bundle_path(self.bundle_dir)
+        if path is None or path == self._bundle_path:
+            return False
+        try:
+            bundle = ModelBundle.load(path)
+        except (ModelBundleError, OSError, pickle.UnpicklingError) as error:
+            logger.warning("Ignoring model bundle '%s': %s", path, error)
+            return False
+
+        self._bundle, self._bundle_path = bundle, path
+        logger.info("Serving model bundle version %s", bundle.version)
+        return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def start(self) -> "ModelBundleWatcher":
+        """
+        Start watching the bundle directory in a background thread.
+
+        Returns:
+            ModelBundleWatcher: The watcher itself.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="model-bundle-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop watching the bundle directory.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ModelBundleWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def recommend(self, user_data: pd.DataFrame, n_recommendations: int = None) -> pd.DataFrame:
+        """
+        Recommend plants based on user data with the current bundle.
+
+        Args:
+            user_data (pd.DataFrame): The user data for which to recommend plants.
+            n_recommendations (int, optional): The number of plants to recommend, the number the index was fitted with if None.
+
+        Returns:
+            pd.DataFrame: The recommended plants sorted by distance.
+        """
+        return self._bundle.recommend(user_data, n_recommendations)
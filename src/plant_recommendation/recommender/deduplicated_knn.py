@@ -0,0 +1,127 @@
+# DUPLICATE-VECTOR COLLAPSING K-NEAREST NEIGHBORS
+
+import numpy as np
+
+from typing import Any, Tuple, Union
+
+
+class DeduplicatedKNN:
+    """
+    A k-nearest neighbors wrapper indexing each distinct feature vector once, usable in place of
+    a fitted sklearn NearestNeighbors (same kneighbors signature and fitted attributes).
+
+    Many plants share exactly the same preprocessed vector. The plants are grouped by vector
+    (optionally rounded to a number of decimals, so that quantized-equal vectors are grouped too),
+    the inner engine is fitted on one representative per group, and the plant positions of each group
+    are stored as a CSR posting list (indptr, postings). At query time the nearest groups are expanded
+    back to plants, ties being broken by plant position so results are deterministic.
+
+    Attributes:
+        engine (Any): The inner nearest neighbors engine, fitted on the distinct vectors.
+        n_neighbors (int): The default number of neighbors.
+        decimals (int): The number of decimals the vectors are rounded to before grouping, None for exact equality.
+    """
+
+    def __init__(self, engine: Any, n_neighbors: int = 5, decimals: int = None):
+        """
+        Initialize the DeduplicatedKNN class.
+
+        Args:
+            engine (Any): The inner nearest neighbors engine (NearestNeighbors, ExactKNN or PackedKNN).
+            n_neighbors (int, optional): The default number of neighbors.
+            decimals (int, optional): The number of decimals the vectors are rounded to before grouping,
+                None for exact equality.
+        """
+        self.engine = engine
+        self.n_neighbors = n_neighbors
+        self.decimals = decimals
+
+    def fit(self, X) -> "DeduplicatedKNN":
+        """
+        Group the identical vectors of the plant matrix and fit the inner engine on one vector per group.
+
+        Args:
+            X: The preprocessed feature matrix of the plants.
+
+        Returns:
+            DeduplicatedKNN: The fitted wrapper.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float64)
+        keys = X if self.decimals is None else np.round(X, self.decimals)
+        _, first_positions, groups = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        groups = groups.ravel()
+
+        # CSR posting lists: the plants of group g are postings[indptr[g]:indptr[g + 1]], by increasing position
+        self.postings = np.argsort(groups, kind="stable").astype(np.int64)
+        self.group_sizes = np.bincount(groups, minlength=len(first_positions))
+        self.indptr = np.concatenate([[0], np.cumsum(self.group_sizes)]).astype(np.int64)
+
+        self.engine.fit(X[first_positions])
+        self.n_samples_fit_, self.n_features_in_ = X.shape
+        self.n_groups_ = len(first_positions)
+        return self
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.n_samples_fit_ / self.n_groups_
+
+    def kneighbors(self, X, n_neighbors: int = None,
+                   return_distance: bool = True) -> Union[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Find the k nearest plants of each query, expanding the nearest groups of the inner engine.
+
+        Args:
+            X: The preprocessed queries.
+            n_neighbors (int, optional): The number of neighbors, the fitted number if None.
+            return_distance (bool, optional): Whether to return the distances.
+
+        Returns:
+            Union[Tuple[np.ndarray, np.ndarray], np.ndarray]: The distances and the positions of the neighbors
+            sorted by increasing distance, or only the positions if return_distance is False.
+        """
+        n_neighbors = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+        # every group holds at least one plant, so the k nearest groups hold at least k plants; more groups
+        # are requested while a group at the distance of the k-th plant of a query may have been left out by the
+        # inner engine, so that the ties are broken by plant position among all the tied groups
+        n_groups = min(n_neighbors, self.n_groups_)
+        while True:
+            group_distances, groups = self.engine.kneighbors(X, n_neighbors=n_groups)
+            distances, indices = self._expand(group_distances, groups, n_neighbors)
+            if n_groups == self.n_groups_ or (group_distances[:, -1] > distances[:, -1]).all():
+                break
+            n_groups = min(2 * n_groups, self.n_groups_)
+
+        return (distances, indices) if return_distance else indices
+
+    def _expand(self, group_distances: np.ndarray, groups: np.ndarray,
+                n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expand the nearest groups of each query to their plants and keep the k nearest ones,
+        ties being broken by plant position.
+
+        Args:
+            group_distances (np.ndarray): The distances of the nearest groups of each query.
+            groups (np.ndarray): The nearest groups of each query.
+            n_neighbors (int): The number of neighbors.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The distances and the positions of the neighbors.
+        """
+        n_queries = len(groups)
+
+        # expand each group to (at most k of) its plants
+        lengths = np.minimum(self.group_sizes[groups], n_neighbors).ravel()
+        starts = np.repeat(self.indptr[groups].ravel(), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = np.repeat(np.repeat(np.arange(n_queries), groups.shape[1]), lengths)
+        positions = self.postings[starts + offsets]
+        distances = np.repeat(group_distances.ravel(), lengths)
+
+        order = np.lexsort((positions, distances, rows))
+        row_counts = np.bincount(rows, minlength=n_queries)
+        ranks = np.arange(len(order)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+        kept = order[ranks < n_neighbors]
+
+        return distances[kept].reshape(n_queries, n_neighbors), positions[kept].reshape(n_queries, n_neighbors)
@@ -0,0 +1,251 @@
+# EXACT K-NEAREST NEIGHBORS (BLOCKED GEMM)
+
+import numpy as np
+
+from typing import Tuple, Union
+
+
+def _to_dense(X) -> np.ndarray:
+    """
+    Convert a (possibly sparse) matrix to a dense float64 array.
+
+    Args:
+        X: The matrix.
+
+    Returns:
+        np.ndarray: The dense float64 array.
+    """
+    if hasattr(X, "toarray"):
+        X = X.toarray()
+    return np.ascontiguousarray(X, dtype=np.float64)
+
+
+class ExactKNN:
+    """
+    An exact euclidean k-nearest neighbors engine for batch queries, usable in place of a fitted
+    sklearn NearestNeighbors (same kneighbors signature and fitted attributes), whose results are those of
+    an exhaustive float64 search with ties broken by plant position. It is not faster than sklearn: on the current
+    catalogue, batch queries take about twice as long (see the engines benchmark), the selection of the candidates
+    and the certification of the ties costing more than the Cython heaps of sklearn.
+
+    The distances are computed block by block with the |q|² + |p|² - 2qp expansion, the plant norms
+    being precomputed. The blocks are computed in float32 (a single matrix product per block, sized to
+    stay in cache, the plant block being converted from the stored float64 matrix), the candidates are kept with argpartition, and the few candidates are re-ranked with
+    exact float64 distances. Ties are broken by plant position, so results are deterministic.
+
+    The float32 distances are only used to select the candidates, and the selection is checked against
+    a bound of their rounding error: a plant left out has a float32 distance at least that of the worst
+    candidate, so when the worst candidate minus the error bound is still farther than the k-th exact distance,
+    no plant left out can be closer (or tied). The queries whose candidates cannot be certified this way are
+    searched again with every plant whose float32 distance is within the error bound of the k-th exact distance,
+    so the results are those of an exhaustive float64 search.
+
+    Attributes:
+        n_neighbors (int): The default number of neighbors.
+        query_block_size (int): The number of queries per block.
+        plant_block_size (int): The number of plants per block.
+        n_candidates (int): The number of extra float32 candidates re-ranked in float64.
+    """
+
+    def __init__(self, n_neighbors: int = 5, query_block_size: int = 256, plant_block_size: int = 4096,
+                 n_candidates: int = 8):
+        """
+        Initialize the ExactKNN class.
+
+        Args:
+            n_neighbors (int, optional): The default number of neighbors.
+            query_block_size (int, optional): The number of queries per block.
+            plant_block_size (int, optional): The number of plants per block.
+            n_candidates (int, optional): The number of extra float32 candidates re-ranked in float64.
+        """
+        self.n_neighbors = n_neighbors
+        self.query_block_size = query_block_size
+        self.plant_block_size = plant_block_size
+        self.n_candidates = n_candidates
+
+    def fit(self, X) -> "ExactKNN":
+        """
+        Store the plant matrix and precompute the plant norms.
+
+        Args:
+            X: The preprocessed feature matrix of the plants.
+
+        Returns:
+            ExactKNN: The fitted engine.
+        """
+        self._fit_X = _to_dense(X)
+        fit_X32 = self._fit_X.astype(np.float32)
+        self._squared_norms32 = np.einsum("ij,ij->i", fit_X32, fit_X32)
+        self._max_norm = float(np.sqrt(np.einsum("ij,ij->i", self._fit_X, self._fit_X).max(initial=0.0)))
+        self.n_samples_fit_, self.n_features_in_ = self._fit_X.shape
+        return self
+
+    def _error_bounds(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Bound the absolute error of the float32 squared distances of each query to any plant: the rounding of the
+        inputs to float32 and of the expansion (a dot product of n_features terms and two additions) is at most
+        a few float32 epsilons relative to (|q| + |p|)², p being the plant of largest norm.
+
+        Args:
+            queries (np.ndarray): A block of queries in float64.
+
+        Returns:
+            np.ndarray: The error bound of each query.
+        """
+        query_norms = np.sqrt(np.einsum("ij,ij->i", queries, queries))
+        return (self.n_features_in_ + 4) * float(np.finfo(np.float32).eps) * (query_norms + self._max_norm) ** 2
+
+    def _exhaustive(self, queries: np.ndarray, kth_distances: np.ndarray, error_bounds: np.ndarray,
+                    n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the nearest plants of queries among all the plants whose float32 distance is within
+        the error bound of a known upper bound of their k-th squared distance.
+
+        Args:
+            queries (np.ndarray): The queries in float64.
+            kth_distances (np.ndarray): For each query, an exact squared distance reached by at least n_neighbors plants.
+            error_bounds (np.ndarray): The error bound of the float32 squared distances of each query.
+            n_neighbors (int): The number of neighbors.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The exact squared distances and the positions of the neighbors.
+        """
+        queries32 = queries.astype(np.float32)
+        query_norms = np.einsum("ij,ij->i", queries32, queries32)
+        thresholds = (kth_distances + error_bounds)[:, None]
+        all_rows, all_positions = [], []
+        for start in range(0, self.n_samples_fit_, self.plant_block_size):
+            stop = min(start + self.plant_block_size, self.n_samples_fit_)
+            squared_distances = queries32 @ self._fit_X[start:stop].astype(np.float32).T
+            squared_distances *= -2
+            squared_distances += query_norms[:, None]
+            squared_distances += self._squared_norms32[None, start:stop]
+            rows, columns = np.nonzero(squared_distances <= thresholds)
+            all_rows.append(rows)
+            all_positions.append(columns + start)
+
+        rows, positions = np.concatenate(all_rows), np.concatenate(all_positions)
+        differences = self._fit_X[positions] - queries[rows]
+        candidates_distances = np.einsum("ij,ij->i", differences, differences)
+        order = np.lexsort((positions, candidates_distances, rows))
+        row_counts = np.bincount(rows, minlength=len(queries))
+        row_starts = np.cumsum(row_counts) - row_counts
+        kept = order[np.arange(len(order)) - row_starts[rows[order]] < n_neighbors]
+        return (candidates_distances[kept].reshape(len(queries), n_neighbors),
+                positions[kept].reshape(len(queries), n_neighbors))
+
+    @staticmethod
+    def _top(distances: np.ndarray, n: int) -> np.ndarray:
+        """
+        Find the columns of the n smallest distances of each row, in no particular order.
+
+        Args:
+            distances (np.ndarray): The distances.
+            n (int): The number of columns to keep.
+
+        Returns:
+            np.ndarray: The kept columns of each row.
+        """
+        if distances.shape[1] <= n:
+            return np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+        return np.argpartition(distances, n - 1, axis=1)[:, :n]
+
+    def _candidates(self, queries32: np.ndarray, n_candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the float32 candidates of a block of queries, plant block by plant block.
+
+        After the first plant block, only the distances smaller than the current worst candidate
+        of their query are merged (like the early rejection of a bounded heap), so most of
+        the distances of the following blocks are discarded by a single vectorized comparison.
+
+        Args:
+            queries32 (np.ndarray): A block of queries in float32.
+            n_candidates (int): The number of candidates to keep per query.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The positions of the candidates of each query and the largest
+            float32 squared distance of its candidates, which no plant left out is closer than.
+        """
+        n_queries = len(queries32)
+        query_norms = np.einsum("ij,ij->i", queries32, queries32)
+        query_rows = np.repeat(np.arange(n_queries), n_candidates)
+        best_positions, best_distances = None, None
+
+        for start in range(0, self.n_samples_fit_, self.plant_block_size):
+            stop = min(start + self.plant_block_size, self.n_samples_fit_)
+            squared_distances = queries32 @ self._fit_X[start:stop].astype(np.float32).T
+            squared_distances *= -2
+            squared_distances += query_norms[:, None]
+            squared_distances += self._squared_norms32[None, start:stop]
+
+            if best_positions is None:
+                kept = self._top(squared_distances, n_candidates)
+                best_positions = kept + start
+                best_distances = np.take_along_axis(squared_distances, kept, axis=1)
+                continue
+
+            rows, columns = np.nonzero(squared_distances < best_distances.max(axis=1)[:, None])
+            if len(rows) == 0:
+                continue
+
+            # merge the current candidates with the closer plants of the block, per query
+            all_rows = np.concatenate([query_rows, rows])
+            all_positions = np.concatenate([best_positions.ravel(), columns + start])
+            all_distances = np.concatenate([best_distances.ravel(), squared_distances[rows, columns]])
+            order = np.lexsort((all_positions, all_distances, all_rows))
+            row_counts = np.bincount(all_rows, minlength=n_queries)
+            row_starts = np.cumsum(row_counts) - row_counts
+            ranks = np.arange(len(order)) - row_starts[all_rows[order]]
+            kept = order[ranks < n_candidates]
+            best_positions = all_positions[kept].reshape(n_queries, n_candidates)
+            best_distances = all_distances[kept].reshape(n_queries, n_candidates)
+
+        return best_positions, best_distances.max(axis=1)
+
+    def kneighbors(self, X, n_neighbors: int = None,
+                   return_distance: bool = True) -> Union[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Find the exact k nearest plants of each query.
+
+        Args:
+            X: The preprocessed queries.
+            n_neighbors (int, optional): The number of neighbors, the fitted number if None.
+            return_distance (bool, optional): Whether to return the distances.
+
+        Returns:
+            Union[Tuple[np.ndarray, np.ndarray], np.ndarray]: The distances and the positions of the neighbors
+            sorted by increasing distance, or only the positions if return_distance is False.
+        """
+        if X is None:
+            raise ValueError("ExactKNN requires the queries X")
+        n_neighbors = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+        n_candidates = min(n_neighbors + self.n_candidates, self.n_samples_fit_)
+        queries = _to_dense(X)
+
+        distances = np.empty((len(queries), n_neighbors), dtype=np.float64)
+        indices = np.empty((len(queries), n_neighbors), dtype=np.int64)
+
+        for start in range(0, len(queries), self.query_block_size):
+            block = queries[start:start + self.query_block_size]
+            candidates, worst_distances = self._candidates(block.astype(np.float32), n_candidates)
+
+            # float64 re-ranking with the exact difference form
+            differences = self._fit_X[candidates] - block[:, None, :]
+            candidates_distances = np.einsum("ijk,ijk->ij", differences, differences)
+            order = np.lexsort((candidates, candidates_distances), axis=1)[:, :n_neighbors]
+            block_indices = np.take_along_axis(candidates, order, axis=1)
+            block_distances = np.take_along_axis(candidates_distances, order, axis=1)
+
+            if n_candidates < self.n_samples_fit_:
+                # the queries whose left out plants could be closer than their k-th neighbor, given the float32 error
+                error_bounds = self._error_bounds(block)
+                kth_distances = block_distances[:, -1]
+                uncertain = np.nonzero(worst_distances.astype(np.float64) - error_bounds <= kth_distances)[0]
+                if len(uncertain):
+                    block_distances[uncertain], block_indices[uncertain] = self._exhaustive(
+                        block[uncertain], kth_distances[uncertain], error_bounds[uncertain], n_neighbors)
+
+            indices[start:start + len(block)] = block_indices
+            distances[start:start + len(block)] = np.sqrt(block_distances)
+
+        return (distances, indices) if return_distance else indices
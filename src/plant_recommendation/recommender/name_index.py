@@ -0,0 +1,283 @@
+# PLANT NAME SEARCH INDEX
+
+import os
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_LIST_ITEM_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+# normalized names only contain [a-z0-9 ], which all sort before this byte
+_PREFIX_END = b"\x7f"
+
+ARRAYS = ("names", "name_rows", "prefix_keys", "prefix_names", "prefix_offsets",
+          "trigrams", "trigram_indptr", "trigram_postings", "name_trigram_counts")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a plant name for search: lowercase ASCII letters and digits, accents removed,
+    punctuation replaced by single spaces (e.g. "Acer japonicum 'Aconitifolium'" -> 'acer japonicum aconitifolium').
+
+    Args:
+        name (str): The name.
+
+    Returns:
+        str: The normalized name.
+    """
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name.lower()).split())
+
+
+def split_names(value) -> List[str]:
+    """
+    Split a name cell into names: the items of a list, or of its string representation
+    as in the catalogue (e.g. "['Abies alba']"), or the value itself.
+
+    Args:
+        value: The cell value.
+
+    Returns:
+        List[str]: The names.
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [str(item) for item in value]
+    if not isinstance(value, str):
+        return []
+    if value.startswith("["):
+        return [first or second for first, second in _LIST_ITEM_PATTERN.findall(value)]
+    return [value]
+
+
+def trigrams(name: str) -> List[bytes]:
+    """
+    Compute the distinct trigrams of a normalized name, padded so that the start and the end of the name count.
+
+    Args:
+        name (str): The normalized name.
+
+    Returns:
+        List[bytes]: The sorted distinct trigrams.
+    """
+    padded = f"  {name} ".encode()
+    return sorted({padded[start:start + 3] for start in range(len(padded) - 2)})
+
+
+class PlantNameIndex:
+    """
+    A search index over the names of the plants of the recommendation dataset, built once at training
+    and stored as plain numpy arrays, so that it can be memory-mapped at inference. The normalized names are ASCII,
+    so they are stored as fixed-width byte strings.
+
+    - Autocomplete: the normalized names, and their suffixes starting at each word (so that 'maple' completes
+      'japanese maple'), are sorted in prefix_keys: the completions of a prefix are a binary-searched range.
+    - Fuzzy search: a trigram inverted index in CSR format (the names containing trigrams[t] are
+      trigram_postings[trigram_indptr[t]:trigram_indptr[t + 1]]) ranks the names by trigram similarity
+      (shared trigrams / trigrams of the union), which tolerates typos.
+
+    Every name points to the position of its plant in the recommendation dataset (name_rows), which is the row
+    of the plant in the nearest neighbors index and in the similar plants graph.
+
+    Attributes:
+        names (np.ndarray): The normalized names, as byte strings.
+        name_rows (np.ndarray): The position of the plant of each name.
+        prefix_keys (np.ndarray): The sorted names and word suffixes of names.
+        prefix_names (np.ndarray): The name of each prefix key.
+        prefix_offsets (np.ndarray): The word offset of each prefix key in its name (0 for the full name).
+        trigrams (np.ndarray): The sorted distinct trigrams.
+        trigram_indptr (np.ndarray): The CSR row pointers of the trigram postings.
+        trigram_postings (np.ndarray): The names containing each trigram.
+        name_trigram_counts (np.ndarray): The number of distinct trigrams of each name.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Initialize the PlantNameIndex class.
+
+        Args:
+            arrays (Dict[str, np.ndarray]): The arrays of the index (in memory or memory-mapped).
+        """
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, plants_dataset: pd.DataFrame, name_cols: List[str]) -> "PlantNameIndex":
+        """
+        Build the index of the names of the plants.
+
+        Args:
+            plants_dataset (pd.DataFrame): The recommendation dataset.
+            name_cols (List[str]): The name columns (plain names, or lists of names such as scientific_name).
+
+        Returns:
+            PlantNameIndex: The index.
+        """
+        entries = set()
+        for column in name_cols:
+            for row, value in enumerate(plants_dataset[column]):
+                for name in split_names(value):
+                    name = normalize_name(name)
+                    if name:
+                        entries.add((name, row))
+        names, name_rows = zip(*sorted(entries)) if entries else ((), ())
+        names = np.array([name.encode() for name in names], dtype=bytes)
+
+        prefix_keys, prefix_names, prefix_offsets = [], [], []
+        for name_id, name in enumerate(names):
+            words = name.split(b" ")
+            for offset in range(len(words)):
+                prefix_keys.append(b" ".join(words[offset:]))
+                prefix_names.append(name_id)
+                prefix_offsets.append(offset)
+        prefix_keys = np.array(prefix_keys, dtype=bytes)
+        order = np.argsort(prefix_keys, kind="stable")
+
+        name_trigrams = [trigrams(name.decode()) for name in names]
+        pairs = [(trigram, name_id) for name_id, grams in enumerate(name_trigrams) for trigram in grams]
+        pairs.sort()
+        all_trigrams = np.array([trigram for trigram, _ in pairs], dtype="S3")
+        unique_trigrams, counts = np.unique(all_trigrams, return_counts=True)
+
+        return cls(dict(names=names, name_rows=np.array(name_rows, dtype=np.int32),
+                        prefix_keys=prefix_keys[order], prefix_names=np.array(prefix_names, dtype=np.int32)[order],
+                        prefix_offsets=np.array(prefix_offsets, dtype=np.int16)[order],
+                        trigrams=unique_trigrams,
+                        trigram_indptr=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+                        trigram_postings=np.array([name_id for _, name_id in pairs], dtype=np.int32),
+                        name_trigram_counts=np.array([len(grams) for grams in name_trigrams], dtype=np.int32)))
+
+    def save(self, directory: Path) -> None:
+        """
+        Save the index as one .npy file per array. Each file is written aside and then renamed,
+        so that the processes which memory-mapped the previous index keep reading consistent files.
+
+        Args:
+            directory (Path): The directory of the index.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            tmp_path = directory / f"{name}.npy.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                np.save(file, np.asarray(getattr(self, name)), allow_pickle=False)
+            os.replace(tmp_path, directory / f"{name}.npy")
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: Optional[str] = "r") -> "PlantNameIndex":
+        """
+        Load an index saved with save.
+
+        Args:
+            directory (Path): The directory of the index.
+            mmap_mode (Optional[str], optional): The memory-map mode of the arrays, None to read them in memory.
+
+        Returns:
+            PlantNameIndex: The index.
+        """
+        return cls({name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+                    for name in ARRAYS})
+
+    def _best_per_row(self, name_ids: np.ndarray, scores: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Keep the best ranked name of each plant, in rank order.
+
+        Args:
+            name_ids (np.ndarray): The matched names, best ranked first.
+            scores (np.ndarray): Their scores.
+            limit (int): The maximum number of plants.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The positions of the plants and their scores.
+        """
+        rows = np.asarray(self.name_rows[name_ids])
+        _, first = np.unique(rows, return_index=True)
+        first = np.sort(first)[:limit]
+        return rows[first], scores[first]
+
+    def complete(self, prefix: str, limit: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Autocomplete a name prefix: the plants having a name, or a word of a name, starting with the prefix.
+
+        The names starting with the prefix come first, then the names with an inner word starting with it,
+        the shortest names first.
+
+        Args:
+            prefix (str): The typed prefix.
+            limit (int, optional): The maximum number of plants.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The positions of the plants in the recommendation dataset
+            and the length of their matched names.
+        """
+        prefix = normalize_name(prefix).encode()
+        if not prefix:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+        start = np.searchsorted(self.prefix_keys, prefix, side="left")
+        stop = np.searchsorted(self.prefix_keys, prefix + _PREFIX_END, side="left")
+        name_ids = np.asarray(self.prefix_names[start:stop])
+        lengths = np.char.str_len(np.asarray(self.names[name_ids]))
+        order = np.lexsort((name_ids, lengths, np.asarray(self.prefix_offsets[start:stop]) > 0))
+        return self._best_per_row(name_ids[order], lengths[order], limit)
+
+    def search(self, query: str, limit: int = 10, min_similarity: float = 0.3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fuzzy search a name: the plants whose names share the most trigrams with the query.
+
+        Args:
+            query (str): The searched name, possibly misspelled.
+            limit (int, optional): The maximum number of plants.
+            min_similarity (float, optional): The minimum trigram similarity of a match.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The positions of the plants in the recommendation dataset
+            and their similarity, by decreasing similarity.
+        """
+        query = normalize_name(query)
+        if not query or len(self.trigrams) == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        query_trigrams = np.array(trigrams(query), dtype="S3")
+        positions = np.minimum(np.searchsorted(self.trigrams, query_trigrams), len(self.trigrams) - 1)
+        found = positions[np.asarray(self.trigrams[positions]) == query_trigrams]
+
+        starts, stops = np.asarray(self.trigram_indptr[found]), np.asarray(self.trigram_indptr[found + 1])
+        lengths = stops - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        postings = np.asarray(self.trigram_postings[np.repeat(starts, lengths) + offsets])
+        shared = np.bincount(postings, minlength=len(self.names))
+        similarities = shared / (len(query_trigrams) + np.asarray(self.name_trigram_counts) - shared)
+
+        name_ids = np.flatnonzero(similarities >= min_similarity)
+        order = np.lexsort((name_ids, -similarities[name_ids]))
+        return self._best_per_row(name_ids[order], similarities[name_ids][order], limit)
+
+    def lookup(self, name: str, min_similarity: float = 0.3) -> Optional[int]:
+        """
+        Find the plant of a name: an exact (normalized) match, else the best fuzzy match.
+
+        Args:
+            name (str): The name of the plant.
+            min_similarity (float, optional): The minimum trigram similarity of a fuzzy match.
+
+        Returns:
+            Optional[int]: The position of the plant in the recommendation dataset, None if no name matches.
+        """
+        normalized = normalize_name(name).encode()
+        start = np.searchsorted(self.prefix_keys, normalized, side="left")
+        stop = np.searchsorted(self.prefix_keys, normalized, side="right")
+        exact = [name_id for name_id, offset in zip(self.prefix_names[start:stop], self.prefix_offsets[start:stop])
+                 if offset == 0]
+        if exact:
+            return int(self.name_rows[min(exact)])
+        rows, _ = self.search(name, limit=1, min_similarity=min_similarity)
+        return int(rows[0]) if len(rows) else None
+
+    def nbytes(self) -> int:
+        """
+        Compute the size of the index arrays.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
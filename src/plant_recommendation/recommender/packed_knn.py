@@ -0,0 +1,256 @@
+# BIT-PACKED K-NEAREST NEIGHBORS
+
+import numpy as np
+import pandas as pd
+
+from typing import Tuple, Union
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder
+
+# number of set bits of every byte, used when numpy has no bitwise_count (numpy < 2.0)
+_POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """
+    Count the set bits of uint64 words, summed over the last axis.
+
+    Args:
+        words (np.ndarray): The uint64 words.
+
+    Returns:
+        np.ndarray: The number of set bits, the last axis being reduced.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack the 0/1 columns of a matrix into uint64 words, 64 columns per word.
+
+    Args:
+        bits (np.ndarray): The 0/1 matrix.
+
+    Returns:
+        np.ndarray: The (n_rows, n_words) uint64 words.
+    """
+    n_words = -(-bits.shape[1] // 64)
+    padded = np.zeros((len(bits), n_words * 64), dtype=np.uint8)
+    padded[:, :bits.shape[1]] = bits
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def classify_columns(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Classify the columns of a matrix by their values: 0/1 columns, small non-negative integer columns, other columns.
+
+    Args:
+        X (np.ndarray): The float64 matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The binary, the ordinal and the float columns.
+    """
+    is_integer = (X == np.round(X)).all(axis=0)
+    binary_columns = np.flatnonzero(((X == 0) | (X == 1)).all(axis=0))
+    ordinal_columns = np.flatnonzero(is_integer & (X.min(axis=0) >= 0) & (X.max(axis=0) <= 255)
+                                     & ~np.isin(np.arange(X.shape[1]), binary_columns))
+    float_columns = np.setdiff1d(np.arange(X.shape[1]), np.concatenate([binary_columns, ordinal_columns]))
+    return binary_columns, ordinal_columns, float_columns
+
+
+def preprocessor_columns(preprocessor: ColumnTransformer, dtypes: pd.Series) -> Tuple[np.ndarray, np.ndarray,
+                                                                                     np.ndarray]:
+    """
+    Classify the output columns of a fitted preprocessor by the transformer making them: one-hot encodings
+    and passed through boolean features are binary, ordinal encodings of at most 256 categories are ordinal,
+    the other columns (scaled features, other passed through features) are float.
+
+    Unlike classify_columns, the kind of a column does not depend on the values seen at fit: an ordinal column
+    whose plants only have its first two levels stays ordinal, and a query at a third level is encoded.
+
+    Args:
+        preprocessor (ColumnTransformer): The fitted column transformer.
+        dtypes (pd.Series): The dtypes of its input features, by column name.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The binary, the ordinal and the float columns.
+    """
+    kinds = {"binary": [], "ordinal": [], "float": []}
+    for name, transformer, columns in preprocessor.transformers_:
+        if isinstance(transformer, str) and transformer == "drop":
+            continue
+        output_columns = np.arange(preprocessor.output_indices_[name].start, preprocessor.output_indices_[name].stop)
+        columns = [preprocessor.feature_names_in_[column] if isinstance(column, (int, np.integer)) else column
+                   for column in np.atleast_1d(columns)]
+        # the fitted passthrough remainder is the string or an identity FunctionTransformer, depending on sklearn
+        passthrough = (isinstance(transformer, str) and transformer == "passthrough"
+                       or isinstance(transformer, FunctionTransformer) and transformer.func is None)
+        if isinstance(transformer, OneHotEncoder):
+            kinds["binary"].extend(output_columns)
+        elif (isinstance(transformer, OrdinalEncoder) and transformer.handle_unknown == "error"
+              and all(len(categories) <= 256 for categories in transformer.categories_)):
+            kinds["ordinal"].extend(output_columns)
+        elif passthrough:
+            for output_column, column in zip(output_columns, columns):
+                kinds["binary" if pd.api.types.is_bool_dtype(dtypes[column]) else "float"].append(output_column)
+        else:
+            kinds["float"].extend(output_columns)
+    return tuple(np.sort(np.asarray(kinds[kind], dtype=np.int64)) for kind in ("binary", "ordinal", "float"))
+
+
+class PackedKNN:
+    """
+    An exact euclidean k-nearest neighbors engine on a compact encoding of the preprocessed features,
+    usable in place of a fitted sklearn NearestNeighbors (same kneighbors signature and fitted attributes).
+
+    The columns are classified by the preprocessor making them (see preprocessor_columns), or by the values
+    of the fitted matrix when no classification is given: 0/1 columns (one-hot type and booleans) are bit-packed
+    into uint64 words, ordinal encodings are stored as uint8 and the other columns (scaled hardiness) as float64. As the squared difference of two bits is their xor,
+    the squared euclidean distance is the popcount of the xor of the words, plus the squared differences
+    of the ordinals and of the floats. The bit and ordinal terms are exact integers and the floats are not rounded,
+    so the rankings, ties included, are the ones of the float64 matrix, for a fraction of its memory.
+
+    Attributes:
+        n_neighbors (int): The default number of neighbors.
+        query_block_size (int): The number of queries per block.
+        columns (Tuple[np.ndarray, np.ndarray, np.ndarray]): The binary, ordinal and float columns,
+            classified on the fitted matrix if None.
+    """
+
+    def __init__(self, n_neighbors: int = 5, query_block_size: int = 16,
+                 columns: Tuple[np.ndarray, np.ndarray, np.ndarray] = None):
+        """
+        Initialize the PackedKNN class.
+
+        Args:
+            n_neighbors (int, optional): The default number of neighbors.
+            query_block_size (int, optional): The number of queries per block.
+            columns (Tuple[np.ndarray, np.ndarray, np.ndarray], optional): The binary, ordinal and float columns
+                (see preprocessor_columns), classified on the fitted matrix if None. It should be given: the values
+                of the plants (or of a shard of them) may not show the kind of a column.
+        """
+        self.n_neighbors = n_neighbors
+        self.query_block_size = query_block_size
+        self.columns = columns
+
+    def fit(self, X) -> "PackedKNN":
+        """
+        Classify the columns of the plant matrix (unless given) and store its compact encoding.
+
+        Args:
+            X: The preprocessed feature matrix of the plants.
+
+        Returns:
+            PackedKNN: The fitted engine.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float64)
+        columns = self.columns if self.columns is not None else classify_columns(X)
+        self.binary_columns_, self.ordinal_columns_, self.float_columns_ = (np.asarray(kind, dtype=np.int64)
+                                                                            for kind in columns)
+
+        words, ordinals, floats = self._encode(X)
+        # plant columns stored column by column: the distances are updated one column at a time
+        self._words = words
+        self._ordinals, self._floats = np.ascontiguousarray(ordinals.T), np.ascontiguousarray(floats.T)
+        self.n_samples_fit_, self.n_features_in_ = X.shape
+        return self
+
+    def _encode(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Encode a matrix with the column classification of the fitted matrix.
+
+        Args:
+            X (np.ndarray): The float64 matrix.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The uint64 words, the uint8 ordinals and the float64 columns.
+        """
+        bits, ordinals = X[:, self.binary_columns_], X[:, self.ordinal_columns_]
+        if not ((bits == 0) | (bits == 1)).all():
+            raise ValueError("PackedKNN expects 0/1 values in the binary columns "
+                             f"{self.binary_columns_.tolist()}")
+        if not ((ordinals == np.round(ordinals)) & (ordinals >= 0) & (ordinals <= 255)).all():
+            raise ValueError("PackedKNN expects integers between 0 and 255 in the ordinal columns "
+                             f"{self.ordinal_columns_.tolist()}")
+        return (pack_bits(bits.astype(np.uint8)), ordinals.astype(np.uint8),
+                np.ascontiguousarray(X[:, self.float_columns_]))
+
+    def nbytes(self) -> int:
+        """
+        Compute the memory used by the encoded plants.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return self._words.nbytes + self._ordinals.nbytes + self._floats.nbytes
+
+    def _squared_distances(self, words: np.ndarray, ordinals: np.ndarray, floats: np.ndarray) -> np.ndarray:
+        """
+        Compute the squared distances between a block of encoded queries and all the plants.
+
+        Args:
+            words (np.ndarray): The uint64 words of the queries.
+            ordinals (np.ndarray): The uint8 ordinals of the queries.
+            floats (np.ndarray): The float64 columns of the queries.
+
+        Returns:
+            np.ndarray: The (n_queries, n_plants) float64 squared distances.
+        """
+        # the bit and ordinal terms are summed as integers, converted once to float64
+        integer_distances = popcount(words[:, None, :] ^ self._words[None, :, :]).astype(np.int32)
+        # few ordinal and float columns: one 2D update per column is cheaper than a 3D broadcast
+        ordinals = ordinals.astype(np.int32)
+        for column in range(ordinals.shape[1]):
+            differences = ordinals[:, column, None] - self._ordinals[None, column]
+            integer_distances += differences * differences
+        squared_distances = integer_distances.astype(np.float64)
+        for column in range(floats.shape[1]):
+            differences = floats[:, column, None] - self._floats[None, column]
+            squared_distances += differences * differences
+        return squared_distances
+
+    def kneighbors(self, X, n_neighbors: int = None,
+                   return_distance: bool = True) -> Union[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Find the k nearest plants of each query.
+
+        Args:
+            X: The preprocessed queries.
+            n_neighbors (int, optional): The number of neighbors, the fitted number if None.
+            return_distance (bool, optional): Whether to return the distances.
+
+        Returns:
+            Union[Tuple[np.ndarray, np.ndarray], np.ndarray]: The distances and the positions of the neighbors
+            sorted by increasing distance, or only the positions if return_distance is False.
+        """
+        if X is None:
+            raise ValueError("PackedKNN requires the queries X")
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        n_neighbors = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+        words, ordinals, floats = self._encode(np.asarray(X, dtype=np.float64))
+
+        distances = np.empty((len(words), n_neighbors), dtype=np.float64)
+        indices = np.empty((len(words), n_neighbors), dtype=np.int64)
+
+        for start in range(0, len(words), self.query_block_size):
+            block = slice(start, start + self.query_block_size)
+            squared_distances = self._squared_distances(words[block], ordinals[block], floats[block])
+            kth_distances = np.partition(squared_distances, n_neighbors - 1, axis=1)[:, n_neighbors - 1]
+
+            # every plant tied with the k-th neighbor is a candidate, so that ties are broken by plant position
+            rows, candidates = np.nonzero(squared_distances <= kth_distances[:, None])
+            candidates_distances = squared_distances[rows, candidates]
+            order = np.lexsort((candidates, candidates_distances, rows))
+            row_counts = np.bincount(rows, minlength=len(squared_distances))
+            row_starts = np.cumsum(row_counts) - row_counts
+            kept = order[np.arange(len(order)) - row_starts[rows[order]] < n_neighbors]
+
+            indices[block] = candidates[kept].reshape(-1, n_neighbors)
+            distances[block] = np.sqrt(candidates_distances[kept]).reshape(-1, n_neighbors)
+
+        return (distances, indices) if return_distance else indices
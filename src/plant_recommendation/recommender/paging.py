@@ -0,0 +1,164 @@
+# CURSOR-BASED RECOMMENDATION PAGING
+
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+from sklearn.compose import ColumnTransformer
+
+
+@dataclass
+class PagingState:
+    """
+    The state of a paged recommendation query, kept server-side behind a cursor.
+
+    Attributes:
+        query (np.ndarray): The preprocessed query (a single row).
+        page_size (int): The default number of plants per page.
+        distances (np.ndarray): The retained candidates not returned yet, sorted by distance.
+        indices (np.ndarray): The positions of the retained candidates.
+        search_width (int): The number of neighbors of the last search.
+        returned (np.ndarray): The mask of the plants already returned.
+    """
+    query: np.ndarray
+    page_size: int
+    distances: np.ndarray
+    indices: np.ndarray
+    search_width: int
+    returned: np.ndarray = field(repr=False)
+
+
+class RecommendationPager:
+    """
+    Serve recommendations page by page: the caller chooses k per request and gets a cursor to ask for more.
+
+    The first search fetches several pages of candidates (prefetch_pages x k), which are retained with the cursor
+    state, already sorted: the next pages are slices of these candidates, without any distance computation.
+    Once they are exhausted, the search is widened (doubled); the plants already returned are skipped,
+    so the returned prefix is never re-sorted nor returned twice.
+
+    The cursor states are kept in memory, the least recently used being evicted beyond max_cursors.
+
+    Attributes:
+        nn (Any): The fitted nearest neighbors model.
+        preprocessor (ColumnTransformer): The fitted preprocessor.
+        plants_dataset (pd.DataFrame): The plant table aligned with the index rows.
+        prefetch_pages (int): The number of pages fetched by the first search.
+        max_cursors (int): The maximum number of cursors kept in memory.
+    """
+
+    def __init__(self, nn: Any, preprocessor: ColumnTransformer, plants_dataset: pd.DataFrame,
+                 prefetch_pages: int = 4, max_cursors: int = 10000):
+        """
+        Initialize the RecommendationPager class.
+
+        Args:
+            nn (Any): The fitted nearest neighbors model.
+            preprocessor (ColumnTransformer): The fitted preprocessor.
+            plants_dataset (pd.DataFrame): The plant table aligned with the index rows.
+            prefetch_pages (int, optional): The number of pages fetched by the first search.
+            max_cursors (int, optional): The maximum number of cursors kept in memory.
+        """
+        self.nn = nn
+        self.preprocessor = preprocessor
+        self.plants_dataset = plants_dataset
+        self.prefetch_pages = prefetch_pages
+        self.max_cursors = max_cursors
+        self._states: "OrderedDict[str, PagingState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _search(self, state: PagingState, width: int) -> None:
+        """
+        Widen the search of a query and retain the candidates not returned yet.
+
+        Args:
+            state (PagingState): The state of the query.
+            width (int): The number of neighbors of the new search.
+        """
+        width = min(width, self.nn.n_samples_fit_)
+        distances, indices = self.nn.kneighbors(state.query, n_neighbors=width)
+        distances, indices = distances[0], indices[0]
+        # skip the plants already returned (and, after a widened search, the candidates still retained)
+        known = state.returned.copy()
+        known[state.indices] = True
+        new = ~known[indices]
+        state.distances = np.concatenate([state.distances, distances[new]])
+        state.indices = np.concatenate([state.indices, indices[new]])
+        state.search_width = width
+
+    def _page(self, cursor: str, state: PagingState, n_recommendations: int) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Pop the next page of a query from its retained candidates, widening the search if needed.
+
+        Args:
+            cursor (str): The cursor of the query.
+            state (PagingState): The state of the query.
+            n_recommendations (int): The number of plants of the page.
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[str]]: The plants of the page sorted by distance,
+            and the cursor of the next page (None when all the plants were returned).
+        """
+        n_samples = self.nn.n_samples_fit_
+        while len(state.indices) < n_recommendations and state.search_width < n_samples:
+            self._search(state, max(2 * state.search_width, state.search_width + n_recommendations))
+
+        page_distances, page_indices = state.distances[:n_recommendations], state.indices[:n_recommendations]
+        state.distances, state.indices = state.distances[n_recommendations:], state.indices[n_recommendations:]
+        state.returned[page_indices] = True
+
+        page = self.plants_dataset.iloc[page_indices].copy()
+        page['_distance'] = page_distances
+
+        with self._lock:
+            if len(state.indices) == 0 and state.search_width >= n_samples:
+                self._states.pop(cursor, None)
+                return page, None
+            self._states[cursor] = state
+            self._states.move_to_end(cursor)
+            while len(self._states) > self.max_cursors:
+                self._states.popitem(last=False)
+        return page, cursor
+
+    def first_page(self, user_data: pd.DataFrame, n_recommendations: int) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Recommend the first page of plants for a user.
+
+        Args:
+            user_data (pd.DataFrame): The user data (a single row).
+            n_recommendations (int): The number of plants of the page.
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[str]]: The plants of the page sorted by distance,
+            and the cursor of the next page (None when all the plants were returned).
+        """
+        n_samples = self.nn.n_samples_fit_
+        state = PagingState(query=self.preprocessor.transform(user_data)[:1], page_size=n_recommendations,
+                            distances=np.empty(0), indices=np.empty(0, dtype=np.int64), search_width=0,
+                            returned=np.zeros(n_samples, dtype=bool))
+        self._search(state, self.prefetch_pages * n_recommendations)
+
+        return self._page(uuid.uuid4().hex, state, n_recommendations)
+
+    def next_page(self, cursor: str, n_recommendations: int = None) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Recommend the next page of plants of a cursor.
+
+        Args:
+            cursor (str): The cursor returned with the previous page.
+            n_recommendations (int, optional): The number of plants of the page, the size of the first page if None.
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[str]]: The plants of the page sorted by distance,
+            and the cursor of the next page (None when all the plants were returned).
+        """
+        with self._lock:
+            state = self._states.pop(cursor, None)
+        if state is None:
+            raise KeyError(f"Unknown or expired cursor '{cursor}'")
+
+        return self._page(cursor, state, n_recommendations or state.page_size)
@@ -0,0 +1,186 @@
+# SHARDED K-NEAREST NEIGHBORS
+
+import copy
+import itertools
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Tuple, Union
+
+STRATEGIES = ("category", "hash")
+
+
+def assign_shards(keys: np.ndarray, strategy: str, n_shards: int = None) -> np.ndarray:
+    """
+    Assign the plants to shards from a key column.
+
+    Args:
+        keys (np.ndarray): The key of each plant, e.g. its type or its id.
+        strategy (str): 'category' for one shard per distinct key, 'hash' for n_shards shards by hash of the key.
+        n_shards (int, optional): The number of shards of the 'hash' strategy.
+
+    Returns:
+        np.ndarray: The shard of each plant, from 0 to the number of shards - 1.
+    """
+    keys = np.asarray(keys)
+    if strategy == "category":
+        return pd.factorize(keys, sort=True)[0]
+    if strategy == "hash":
+        return (pd.util.hash_array(keys) % np.uint64(n_shards)).astype(np.int64)
+    raise ValueError(f"Unknown sharding strategy '{strategy}', expected one of {STRATEGIES}")
+
+
+class ShardedKNN:
+    """
+    A k-nearest neighbors index partitioned into shards, usable in place of a fitted sklearn NearestNeighbors
+    (same kneighbors signature and fitted attributes).
+
+    Each shard is a copy of the inner engine fitted on the plants of the shard. A query is scattered to all the
+    shards in parallel (a thread pool: the engines spend their time in numpy/scipy code releasing the GIL), each
+    shard returns its own top k, and the per-shard lists are concatenated and sorted by (distance, position) for all
+    the queries at once, keeping the global top k. As every shard computes exact distances, the merged distances are
+    those of a single global index at every rank, and so are the neighbors, except which of the plants tied with the
+    k-th distance are kept (the merge breaks ties by plant position, a global index by its own order).
+
+    The thread pool is created at the first query and shut down by close, or at the exit of a with block.
+
+    Attributes:
+        engine (Any): The unfitted inner engine, copied for each shard.
+        n_neighbors (int): The default number of neighbors.
+        n_jobs (int): The number of threads querying the shards, the number of CPUs if None.
+    """
+
+    def __init__(self, engine: Any, n_neighbors: int = 5, n_jobs: int = None):
+        """
+        Initialize the ShardedKNN class.
+
+        Args:
+            engine (Any): The unfitted inner engine (NearestNeighbors, ExactKNN, PackedKNN or DeduplicatedKNN).
+            n_neighbors (int, optional): The default number of neighbors.
+            n_jobs (int, optional): The number of threads querying the shards, the number of CPUs if None.
+        """
+        self.engine = engine
+        self.n_neighbors = n_neighbors
+        self.n_jobs = n_jobs
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def fit(self, X, shards: np.ndarray) -> "ShardedKNN":
+        """
+        Fit one copy of the inner engine per shard.
+
+        Args:
+            X: The preprocessed feature matrix of the plants.
+            shards (np.ndarray): The shard of each plant (see assign_shards).
+
+        Returns:
+            ShardedKNN: The fitted index.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float64)
+        shards = np.asarray(shards)
+        # the global positions of the plants of each shard, by increasing position
+        self.shard_positions_: List[np.ndarray] = [np.flatnonzero(shards == shard) for shard in np.unique(shards)]
+        self.shard_engines_ = [copy.deepcopy(self.engine).fit(X[positions]) for positions in self.shard_positions_]
+        self.n_samples_fit_, self.n_features_in_ = X.shape
+        self.n_shards_ = len(self.shard_positions_)
+        return self
+
+    def __getstate__(self) -> dict:
+        # the thread pool and its lock are not picklable: they are recreated after loading
+        state = self.__dict__.copy()
+        state["_executor"], state["_executor_lock"] = None, None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=min(self.n_jobs or os.cpu_count(), self.n_shards_))
+            return self._executor
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool querying the shards. A later query creates a new one.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self) -> "ShardedKNN":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _query_shard(self, shard: int, X: np.ndarray, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Query the top k of a shard.
+
+        Args:
+            shard (int): The shard.
+            X (np.ndarray): The preprocessed queries.
+            n_neighbors (int): The number of neighbors.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, float]: The distances and the global positions of the neighbors in the
+            shard, and the query time in seconds.
+        """
+        start = time.perf_counter()
+        positions = self.shard_positions_[shard]
+        distances, indices = self.shard_engines_[shard].kneighbors(X, n_neighbors=min(n_neighbors, len(positions)))
+        return distances, positions[indices], time.perf_counter() - start
+
+    def query_shards(self, X, n_neighbors: int = None) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+        """
+        Scatter queries to all the shards in parallel.
+
+        Args:
+            X: The preprocessed queries.
+            n_neighbors (int, optional): The number of neighbors per shard, the fitted number if None.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray, float]]: For each shard, the distances and the global positions of
+            its top k, sorted by increasing distance, and its query time in seconds.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float64)
+        n_neighbors = n_neighbors or self.n_neighbors
+        return list(self._get_executor().map(self._query_shard, range(self.n_shards_),
+                                             itertools.repeat(X), itertools.repeat(n_neighbors)))
+
+    def kneighbors(self, X, n_neighbors: int = None,
+                   return_distance: bool = True) -> Union[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+        """
+        Find the k nearest plants of each query: scatter to the shards, then merge their top k.
+
+        Args:
+            X: The preprocessed queries.
+            n_neighbors (int, optional): The number of neighbors, the fitted number if None.
+            return_distance (bool, optional): Whether to return the distances.
+
+        Returns:
+            Union[Tuple[np.ndarray, np.ndarray], np.ndarray]: The distances and the positions of the neighbors
+            sorted by increasing distance, or only the positions if return_distance is False.
+        """
+        n_neighbors = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+        shard_results = self.query_shards(X, n_neighbors)
+        distances = np.concatenate([shard_distances for shard_distances, _, _ in shard_results], axis=1)
+        positions = np.concatenate([shard_positions for _, shard_positions, _ in shard_results], axis=1)
+
+        # sort the candidates of each query by distance, ties broken by position, and keep the k first
+        order = np.lexsort((positions, distances), axis=1)[:, :n_neighbors]
+        indices = np.take_along_axis(positions, order, axis=1)
+        if not return_distance:
+            return indices
+        return np.take_along_axis(distances, order, axis=1), indices
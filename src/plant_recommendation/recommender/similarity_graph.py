@@ -0,0 +1,146 @@
+# SIMILAR PLANTS GRAPH
+
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+
+class SimilarPlantsGraph:
+    """
+    A precomputed top-M neighbour graph between the plants of the recommendation dataset,
+    stored in CSR format: the neighbours of the plant at position i are
+    indices[indptr[i]:indptr[i + 1]], sorted by increasing distance.
+
+    Attributes:
+        plant_ids (np.ndarray): The ids of the plants, in the row order of the recommendation dataset.
+        indptr (np.ndarray): The CSR row pointers, of length n_plants + 1.
+        indices (np.ndarray): The positions of the neighbours in the recommendation dataset.
+        distances (np.ndarray): The euclidean distances to the neighbours.
+    """
+
+    def __init__(self, plant_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray, distances: np.ndarray):
+        """
+        Initialize the SimilarPlantsGraph class.
+
+        Args:
+            plant_ids (np.ndarray): The ids of the plants, in the row order of the recommendation dataset.
+            indptr (np.ndarray): The CSR row pointers, of length n_plants + 1.
+            indices (np.ndarray): The positions of the neighbours in the recommendation dataset.
+            distances (np.ndarray): The euclidean distances to the neighbours.
+        """
+        self.plant_ids = np.asarray(plant_ids)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.distances = np.asarray(distances, dtype=np.float32)
+        self._sorted_ids_order = np.argsort(self.plant_ids, kind="stable")
+
+    @classmethod
+    def build(cls, X_transformed: np.ndarray, plant_ids: np.ndarray, n_similar: int,
+              block_size: int = 512, n_jobs: int = None) -> "SimilarPlantsGraph":
+        """
+        Compute the top-M neighbour graph of all the plants, block of rows by block of rows.
+
+        The squared distances of a block are computed with the |a|² + |b|² - 2ab expansion,
+        and the blocks are spread over a thread pool (numpy releases the GIL in the matrix products).
+
+        Args:
+            X_transformed (np.ndarray): The preprocessed feature matrix of the plants.
+            plant_ids (np.ndarray): The ids of the plants, in the row order of X_transformed.
+            n_similar (int): The number of neighbours (M) to keep for each plant.
+            block_size (int, optional): The number of plants processed per block.
+            n_jobs (int, optional): The number of threads, defaults to the number of CPUs.
+
+        Returns:
+            SimilarPlantsGraph: The neighbour graph.
+        """
+        X = np.ascontiguousarray(X_transformed, dtype=np.float64)
+        n_plants = X.shape[0]
+        n_similar = min(n_similar, n_plants - 1)
+        if n_similar <= 0:
+            # no plant, or a single plant without any other plant to be similar to
+            return cls(plant_ids, np.zeros(n_plants + 1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                       np.zeros(0, dtype=np.float32))
+        squared_norms = np.einsum("ij,ij->i", X, X)
+
+        def top_neighbours(start: int) -> Tuple[np.ndarray, np.ndarray]:
+            stop = min(start + block_size, n_plants)
+            squared_distances = squared_norms[start:stop, None] + squared_norms[None, :] - 2 * X[start:stop] @ X.T
+            np.maximum(squared_distances, 0, out=squared_distances)
+            # a plant is not similar to itself
+            squared_distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+
+            candidates = np.argpartition(squared_distances, n_similar - 1, axis=1)[:, :n_similar]
+            candidates_distances = np.take_along_axis(squared_distances, candidates, axis=1)
+            # sort by distance, ties broken by position for deterministic results
+            order = np.lexsort((candidates, candidates_distances), axis=1)
+            return (np.take_along_axis(candidates, order, axis=1),
+                    np.sqrt(np.take_along_axis(candidates_distances, order, axis=1)))
+
+        with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+            blocks = list(executor.map(top_neighbours, range(0, n_plants, block_size)))
+
+        indices = np.concatenate([block[0] for block in blocks]).ravel()
+        distances = np.concatenate([block[1] for block in blocks]).ravel()
+        indptr = np.arange(n_plants + 1, dtype=np.int64) * n_similar
+
+        return cls(plant_ids, indptr, indices, distances)
+
+    def position(self, plant_id) -> int:
+        """
+        Find the position of a plant in the recommendation dataset.
+
+        Args:
+            plant_id: The id of the plant.
+
+        Returns:
+            int: The position of the plant.
+        """
+        rank = np.searchsorted(self.plant_ids, plant_id, sorter=self._sorted_ids_order)
+        if rank == len(self.plant_ids) or self.plant_ids[self._sorted_ids_order[rank]] != plant_id:
+            raise KeyError(f"Unknown plant id: {plant_id}")
+        return int(self._sorted_ids_order[rank])
+
+    def neighbours(self, plant_id) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the precomputed neighbours of a plant, without any distance computation.
+
+        Args:
+            plant_id: The id of the plant.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The positions of the similar plants and their distances.
+        """
+        position = self.position(plant_id)
+        start, stop = self.indptr[position], self.indptr[position + 1]
+        return self.indices[start:stop], self.distances[start:stop]
+
+    def similar_plants(self, plant_id, plants_dataset: pd.DataFrame, n_similar: int = None) -> pd.DataFrame:
+        """
+        Get the plants most similar to a given plant.
+
+        Args:
+            plant_id: The id of the plant.
+            plants_dataset (pd.DataFrame): The recommendation dataset the graph was built on.
+            n_similar (int, optional): The number of plants to return, at most the M of the graph.
+
+        Returns:
+            pd.DataFrame: The similar plants sorted by distance.
+        """
+        indices, distances = self.neighbours(plant_id)
+        similar_plants = plants_dataset.iloc[indices[:n_similar]].copy()
+        similar_plants['_distance'] = distances[:n_similar]
+
+        return similar_plants
+
+    def nbytes(self) -> int:
+        """
+        Compute the memory used by the graph arrays.
+
+        Returns:
+            int: The number of bytes.
+        """
+        arrays: List[np.ndarray] = [self.plant_ids, self.indptr, self.indices, self.distances]
+        return sum(array.nbytes for array in arrays)
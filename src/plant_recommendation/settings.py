@@ -6,7 +6,9 @@ https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 # For example, after creating a hooks.py and defining a ProjectHooks class there, do
 # from projet_fil_rouge_wcs.hooks import ProjectHooks
 # Hooks are executed in a Last-In-First-Out (LIFO) order.
-# HOOKS = (ProjectHooks(),)
+from plant_recommendation.hooks import CatalogPrefetchHook, NodeCacheHook, ProfilingHook
+
+HOOKS = (NodeCacheHook(), ProfilingHook(), CatalogPrefetchHook())
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
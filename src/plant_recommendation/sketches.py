@@ -0,0 +1,594 @@
+"""Mergeable streaming sketches (HyperLogLog, count-min, fixed-bin histograms, quantiles) for dataset profiling
+and chunked training."""
+import json
+import re
+import numpy as np
+import pandas as pd
+
+from typing import Any, Dict, Iterable, List
+
+# second hash key of the count-min sketch rows (pandas hash keys are 16 characters)
+_CMS_HASH_KEY = "plantreco-cms-01"
+_LIST_ITEM_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+
+
+def hash_values(values: Iterable[Any], hash_key: str = None) -> np.ndarray:
+    """
+    Hash values to 64 bits, deterministically across processes and runs.
+
+    The values are hashed through their string representation, so that the same value
+    read as an int in one refresh and as a float or a string in another one keeps the same hash.
+
+    Args:
+        values (Iterable[Any]): The values to hash.
+        hash_key (str, optional): A 16 characters key selecting the hash function, the pandas key if None.
+
+    Returns:
+        np.ndarray: The uint64 hashes.
+    """
+    values = np.asarray([str(value) for value in values], dtype=object)
+    if hash_key is None:
+        return pd.util.hash_array(values, categorize=False)
+    return pd.util.hash_array(values, hash_key=hash_key, categorize=False)
+
+
+def list_tokens(values: pd.Series) -> pd.Series:
+    """
+    Split list values into tokens, normalized as the cleaning pipeline does (lowercase, single spaces).
+
+    Args:
+        values (pd.Series): Lists, or their string representation as in the raw catalogue (e.g. "['Birds', 'Bees']").
+
+    Returns:
+        pd.Series: One token per element.
+    """
+    def split(value: Any) -> List[str]:
+        if isinstance(value, str):
+            return [first or second for first, second in _LIST_ITEM_PATTERN.findall(value)]
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [str(item) for item in value]
+        return []
+
+    tokens = values.dropna().map(split).explode().dropna()
+    return tokens.map(lambda token: ' '.join(token.lower().split()))
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct count sketch: 2^precision registers of one byte, with a relative error
+    of about 1.04 / sqrt(2^precision) (1.6% for the default precision).
+
+    Attributes:
+        precision (int): The number of hash bits selecting the register.
+        registers (np.ndarray): The maximum rank seen by each register.
+    """
+
+    def __init__(self, precision: int = 12):
+        """
+        Initialize the HyperLogLog class.
+
+        Args:
+            precision (int, optional): The number of hash bits selecting the register (4 to 18).
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"The HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        """
+        Add hashed values to the sketch.
+
+        Args:
+            hashes (np.ndarray): The uint64 hashes of the values.
+        """
+        if len(hashes) == 0:
+            return
+        n_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(n_bits)).astype(np.intp)
+        remainders = hashes & np.uint64((1 << n_bits) - 1)
+        # rank = position of the leftmost 1 bit of the remainder; the remainders (< 2^53) are exact as float64
+        bit_lengths = np.frexp(remainders.astype(np.float64))[1]
+        np.maximum.at(self.registers, buckets, (n_bits - bit_lengths + 1).astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch into this one: the result is the sketch of the union of their values.
+
+        Args:
+            other (HyperLogLog): A sketch of the same precision.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Only HyperLogLog sketches of the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            float: The estimated distinct count.
+        """
+        n_registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / n_registers)
+        estimate = alpha * n_registers ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        n_zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * n_registers and n_zeros > 0:
+            # small range correction (linear counting)
+            estimate = n_registers * np.log(n_registers / n_zeros)
+        return float(estimate)
+
+
+class CountMinSketch:
+    """
+    Count-min frequency sketch: depth rows of width counters, a value being counted in one counter
+    per row, and its frequency estimated by the minimum of its counters (never underestimated).
+
+    As a sketch cannot list its values, the most frequent ones seen so far are tracked as heavy hitters,
+    re-ranked by their estimate after each update or merge.
+
+    Attributes:
+        width (int): The number of counters per row.
+        depth (int): The number of rows.
+        n_heavy_hitters (int): The number of most frequent values tracked.
+        table (np.ndarray): The counters, of shape (depth, width).
+        total (int): The number of values added.
+        heavy_hitters (List[str]): The most frequent values, by decreasing estimate.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, n_heavy_hitters: int = 32):
+        """
+        Initialize the CountMinSketch class.
+
+        Args:
+            width (int, optional): The number of counters per row.
+            depth (int, optional): The number of rows.
+            n_heavy_hitters (int, optional): The number of most frequent values tracked.
+        """
+        self.width = width
+        self.depth = depth
+        self.n_heavy_hitters = n_heavy_hitters
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.heavy_hitters: List[str] = []
+
+    def _columns(self, values: List[str]) -> np.ndarray:
+        """
+        Compute the counter of each value in each row (double hashing: h1 + row x h2).
+
+        Args:
+            values (List[str]): The values.
+
+        Returns:
+            np.ndarray: The counter positions, of shape (depth, n_values).
+        """
+        first, second = hash_values(values), hash_values(values, _CMS_HASH_KEY) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        with np.errstate(over="ignore"):
+            return ((first[None, :] + rows * second[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def update(self, values: Iterable[Any]) -> None:
+        """
+        Count values.
+
+        Args:
+            values (Iterable[Any]): The values, converted to strings.
+        """
+        values = [str(value) for value in values]
+        if not values:
+            return
+        columns = self._columns(values)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], minlength=self.width)
+        self.total += len(values)
+        self._rank_heavy_hitters(set(values))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Merge another sketch into this one: the result is the sketch of both streams of values.
+
+        Args:
+            other (CountMinSketch): A sketch of the same width and depth.
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Only count-min sketches of the same width and depth can be merged")
+        self.table += other.table
+        self.total += other.total
+        self._rank_heavy_hitters(set(other.heavy_hitters))
+
+    def estimate(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        Estimate the frequencies of values.
+
+        Args:
+            values (Iterable[Any]): The values, converted to strings.
+
+        Returns:
+            np.ndarray: The estimated number of occurrences of each value.
+        """
+        values = [str(value) for value in values]
+        if not values:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(values)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def _rank_heavy_hitters(self, candidates: set) -> None:
+        """
+        Keep the most frequent values among the current heavy hitters and new candidates.
+
+        Args:
+            candidates (set): The values which may become heavy hitters.
+        """
+        candidates = sorted(candidates.union(self.heavy_hitters))
+        estimates = self.estimate(candidates)
+        order = np.lexsort((np.arange(len(candidates)), -estimates))[:self.n_heavy_hitters]
+        self.heavy_hitters = [candidates[position] for position in order]
+
+    def frequencies(self) -> Dict[str, int]:
+        """
+        Get the estimated frequencies of the heavy hitters.
+
+        Returns:
+            Dict[str, int]: The estimated number of occurrences of each heavy hitter, by decreasing estimate.
+        """
+        return dict(zip(self.heavy_hitters, self.estimate(self.heavy_hitters).tolist()))
+
+
+class FixedBinHistogram:
+    """
+    Histogram over fixed bin edges, with underflow, overflow and invalid (non numeric) counters,
+    so that histograms of different chunks or refreshes can be merged and compared bin by bin.
+
+    Attributes:
+        edges (np.ndarray): The bin edges, the last bin being closed.
+        counts (np.ndarray): The counts of [underflow, bins..., overflow].
+        invalid (int): The number of non numeric values.
+    """
+
+    def __init__(self, edges: List[float]):
+        """
+        Initialize the FixedBinHistogram class.
+
+        Args:
+            edges (List[float]): The increasing bin edges.
+        """
+        self.edges = np.asarray(edges, dtype=np.float64)
+        if len(self.edges) < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("The histogram edges must be at least two increasing values")
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.invalid = 0
+
+    def update(self, values: pd.Series) -> None:
+        """
+        Count non null values.
+
+        Args:
+            values (pd.Series): The values, non numeric ones being counted as invalid.
+        """
+        values = values.dropna()
+        numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~np.isnan(numbers)
+        self.invalid += int(len(numbers) - valid.sum())
+        # 0: underflow, 1..n_bins: bins, n_bins + 1: overflow
+        positions = np.searchsorted(self.edges, numbers[valid], side="right")
+        positions[numbers[valid] == self.edges[-1]] = len(self.edges) - 1
+        self.counts += np.bincount(positions, minlength=len(self.counts))
+
+    def merge(self, other: "FixedBinHistogram") -> None:
+        """
+        Merge another histogram into this one.
+
+        Args:
+            other (FixedBinHistogram): A histogram with the same edges.
+        """
+        if not np.array_equal(other.edges, self.edges):
+            raise ValueError("Only histograms with the same edges can be merged")
+        self.counts += other.counts
+        self.invalid += other.invalid
+
+    def bins(self) -> Dict[str, int]:
+        """
+        Get the counts by bin label.
+
+        Returns:
+            Dict[str, int]: The counts of the underflow, the bins ('[a, b)') and the overflow.
+        """
+        labels = [f"< {self.edges[0]:g}"]
+        labels += [f"[{low:g}, {high:g})" for low, high in zip(self.edges[:-2], self.edges[1:-1])]
+        labels += [f"[{self.edges[-2]:g}, {self.edges[-1]:g}]", f"> {self.edges[-1]:g}"]
+        return dict(zip(labels, self.counts.tolist()))
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: the values are kept in levels of sorted buffers, a value of level h standing for
+    2^h values. When a level exceeds its capacity, it is compacted: one value out of two (a random half of the pairs)
+    is promoted to the next level. The capacities shrink by 2/3 from the top level down, so that the sketch keeps
+    O(k) values whatever the number of values added, with a rank error of the order of 1/k.
+
+    Until the first compaction, the sketch holds all the values and its quantiles are exact.
+
+    Attributes:
+        k (int): The capacity of the top level.
+        levels (List[np.ndarray]): The values of each level.
+        count (int): The number of values added.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        """
+        Initialize the QuantileSketch class.
+
+        Args:
+            k (int, optional): The capacity of the top level (at least 8).
+            seed (int, optional): The seed of the random choice of the compacted halves.
+        """
+        if k < 8:
+            raise ValueError(f"The quantile sketch size must be at least 8, got {k}")
+        self.k = k
+        self.levels: List[np.ndarray] = [np.zeros(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self) -> None:
+        """
+        Compact the lowest level over its capacity until every level fits.
+        """
+        while True:
+            full = [level for level in range(len(self.levels)) if len(self.levels[level]) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            values = np.sort(self.levels[level])
+            # with an odd number of values, the smallest one stays at its level
+            n_kept = len(values) % 2
+            promoted = values[n_kept + self._rng.integers(2)::2]
+            self.levels[level] = values[:n_kept]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def update(self, values: Iterable[float]) -> None:
+        """
+        Add non null values to the sketch.
+
+        Args:
+            values (Iterable[float]): The numeric values.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Merge another sketch into this one: the result is a sketch of the union of their values.
+
+        Args:
+            other (QuantileSketch): A sketch of the same size.
+        """
+        if other.k != self.k:
+            raise ValueError("Only quantile sketches of the same size can be merged")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, q: Iterable[float]) -> np.ndarray:
+        """
+        Estimate quantiles of the values added: linearly interpolated as numpy.quantile while the sketch
+        holds all the values, else the value of estimated rank q x (count - 1).
+
+        Args:
+            q (Iterable[float]): The probabilities, between 0 and 1.
+
+        Returns:
+            np.ndarray: The estimated quantiles, NaN if no value was added.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        values = np.concatenate(self.levels)
+        if len(values) == self.count:
+            return np.quantile(values, q)
+        weights = np.concatenate([np.full(len(level_values), 2 ** level, dtype=np.int64)
+                                  for level, level_values in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative_weights = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative_weights, q * (cumulative_weights[-1] - 1), side="right")
+        return values[order][np.minimum(positions, len(values) - 1)]
+
+    def n_values(self) -> int:
+        """
+        Count the values held by the sketch.
+
+        Returns:
+            int: The number of values kept in the levels.
+        """
+        return sum(len(values) for values in self.levels)
+
+
+class DatasetSketch:
+    """
+    The mergeable profile of a dataset, built in a single pass over its chunks: the row count,
+    the null count and a HyperLogLog distinct count of every column, count-min value frequencies
+    and list-token frequencies of some columns, and fixed-bin histograms of numeric columns.
+
+    Attributes:
+        frequency_columns (List[str]): The columns whose value frequencies are sketched.
+        token_columns (List[str]): The list columns whose token frequencies are sketched.
+        histogram_edges (Dict[str, List[float]]): The bin edges of each histogram column.
+        hll_precision (int): The precision of the HyperLogLog sketches.
+        cms_width (int): The width of the count-min sketches.
+        cms_depth (int): The depth of the count-min sketches.
+        n_heavy_hitters (int): The number of most frequent values tracked per count-min sketch.
+        n_rows (int): The number of rows seen.
+        null_counts (Dict[str, int]): The number of null values of each column.
+        distinct (Dict[str, HyperLogLog]): The distinct count sketch of each column.
+        frequencies (Dict[str, CountMinSketch]): The value frequency sketches.
+        tokens (Dict[str, CountMinSketch]): The token frequency sketches.
+        histograms (Dict[str, FixedBinHistogram]): The histograms.
+    """
+
+    def __init__(self, frequency_columns: List[str] = None, token_columns: List[str] = None,
+                 histogram_edges: Dict[str, List[float]] = None, hll_precision: int = 12,
+                 cms_width: int = 2048, cms_depth: int = 4, n_heavy_hitters: int = 32):
+        """
+        Initialize the DatasetSketch class.
+
+        Args:
+            frequency_columns (List[str], optional): The columns whose value frequencies are sketched.
+            token_columns (List[str], optional): The list columns whose token frequencies are sketched.
+            histogram_edges (Dict[str, List[float]], optional): The bin edges of each histogram column.
+            hll_precision (int, optional): The precision of the HyperLogLog sketches.
+            cms_width (int, optional): The width of the count-min sketches.
+            cms_depth (int, optional): The depth of the count-min sketches.
+            n_heavy_hitters (int, optional): The number of most frequent values tracked per count-min sketch.
+        """
+        self.frequency_columns = list(frequency_columns or [])
+        self.token_columns = list(token_columns or [])
+        self.histogram_edges = {column: list(edges) for column, edges in (histogram_edges or {}).items()}
+        self.hll_precision = hll_precision
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.n_heavy_hitters = n_heavy_hitters
+        self.n_rows = 0
+        self.null_counts: Dict[str, int] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.frequencies = {column: self._count_min() for column in self.frequency_columns}
+        self.tokens = {column: self._count_min() for column in self.token_columns}
+        self.histograms = {column: FixedBinHistogram(edges) for column, edges in self.histogram_edges.items()}
+
+    def _count_min(self) -> CountMinSketch:
+        return CountMinSketch(self.cms_width, self.cms_depth, self.n_heavy_hitters)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk of rows to every sketch.
+
+        Args:
+            chunk (pd.DataFrame): The chunk.
+        """
+        self.n_rows += len(chunk)
+        for column in chunk.columns:
+            values = chunk[column]
+            not_null = values.dropna()
+            self.null_counts[column] = self.null_counts.get(column, 0) + len(values) - len(not_null)
+            if column not in self.distinct:
+                self.distinct[column] = HyperLogLog(self.hll_precision)
+            self.distinct[column].update(hash_values(not_null))
+            if column in self.frequencies:
+                self.frequencies[column].update(not_null)
+            if column in self.tokens:
+                self.tokens[column].update(list_tokens(not_null))
+            if column in self.histograms:
+                self.histograms[column].update(not_null)
+
+    def merge(self, other: "DatasetSketch") -> None:
+        """
+        Merge the sketch of other rows of the same dataset (e.g. another partition) into this one.
+
+        Args:
+            other (DatasetSketch): A sketch built with the same configuration.
+        """
+        if other.configuration() != self.configuration():
+            raise ValueError("Only dataset sketches with the same configuration can be merged")
+        self.n_rows += other.n_rows
+        for column, count in other.null_counts.items():
+            self.null_counts[column] = self.null_counts.get(column, 0) + count
+        for column, sketch in other.distinct.items():
+            self.distinct.setdefault(column, HyperLogLog(self.hll_precision)).merge(sketch)
+        for sketches, other_sketches in ((self.frequencies, other.frequencies), (self.tokens, other.tokens),
+                                         (self.histograms, other.histograms)):
+            for column, sketch in other_sketches.items():
+                sketches[column].merge(sketch)
+
+    def configuration(self) -> Dict[str, Any]:
+        """
+        Get the parameters of the sketch, which must be the same for two sketches to be merged.
+
+        Returns:
+            Dict[str, Any]: The configuration.
+        """
+        return dict(frequency_columns=self.frequency_columns, token_columns=self.token_columns,
+                    histogram_edges=self.histogram_edges, hll_precision=self.hll_precision,
+                    cms_width=self.cms_width, cms_depth=self.cms_depth, n_heavy_hitters=self.n_heavy_hitters)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the statistics estimated by the sketches.
+
+        Returns:
+            Dict[str, Any]: The row count, and for each column its null rate, its estimated number of distinct
+            values, and its estimated value or token frequencies and its histogram when they are sketched.
+        """
+        columns = {}
+        for column, null_count in self.null_counts.items():
+            stats = {"null_rate": null_count / self.n_rows if self.n_rows else 0.0,
+                     "distinct_estimate": round(self.distinct[column].estimate(), 1)}
+            if column in self.frequencies:
+                stats["frequencies"] = self.frequencies[column].frequencies()
+            if column in self.tokens:
+                stats["token_frequencies"] = self.tokens[column].frequencies()
+            if column in self.histograms:
+                stats["histogram"] = self.histograms[column].bins()
+                stats["histogram_invalid"] = self.histograms[column].invalid
+            columns[column] = stats
+        return {"n_rows": self.n_rows, "columns": columns}
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Serialize the sketch to arrays, e.g. for np.savez.
+
+        Returns:
+            Dict[str, np.ndarray]: The arrays of the sketches, and a JSON 'meta' string with the configuration,
+            the counters and the heavy hitters.
+        """
+        meta = dict(configuration=self.configuration(), n_rows=self.n_rows, null_counts=self.null_counts,
+                    columns=list(self.distinct),
+                    frequencies={column: [sketch.total, sketch.heavy_hitters]
+                                 for column, sketch in self.frequencies.items()},
+                    tokens={column: [sketch.total, sketch.heavy_hitters] for column, sketch in self.tokens.items()},
+                    histograms_invalid={column: sketch.invalid for column, sketch in self.histograms.items()})
+        arrays = {"meta": np.array(json.dumps(meta))}
+        for position, (column, sketch) in enumerate(self.distinct.items()):
+            arrays[f"distinct_{position}"] = sketch.registers
+        for name, sketches in (("frequencies", self.frequencies), ("tokens", self.tokens)):
+            for position, sketch in enumerate(sketches.values()):
+                arrays[f"{name}_{position}"] = sketch.table
+        for position, sketch in enumerate(self.histograms.values()):
+            arrays[f"histograms_{position}"] = sketch.counts
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "DatasetSketch":
+        """
+        Deserialize a sketch from the arrays of to_arrays.
+
+        Args:
+            arrays (Dict[str, np.ndarray]): The arrays of the sketch.
+
+        Returns:
+            DatasetSketch: The sketch.
+        """
+        meta = json.loads(str(arrays["meta"]))
+        sketch = cls(**meta["configuration"])
+        sketch.n_rows, sketch.null_counts = meta["n_rows"], meta["null_counts"]
+        for position, column in enumerate(meta["columns"]):
+            sketch.distinct[column] = HyperLogLog(sketch.hll_precision)
+            sketch.distinct[column].registers = np.array(arrays[f"distinct_{position}"], dtype=np.uint8)
+        for name, sketches in (("frequencies", sketch.frequencies), ("tokens", sketch.tokens)):
+            for position, (column, count_min) in enumerate(sketches.items()):
+                count_min.table = np.array(arrays[f"{name}_{position}"], dtype=np.int64)
+                count_min.total, count_min.heavy_hitters = meta[name][column]
+        for position, (column, histogram) in enumerate(sketch.histograms.items()):
+            histogram.counts = np.array(arrays[f"histograms_{position}"], dtype=np.int64)
+            histogram.invalid = meta["histograms_invalid"][column]
+        return sketch
@@ -0,0 +1,267 @@
+"""Chunked training: feature statistics gathered in a single pass over chunks, and matrices written chunk by chunk."""
+import numpy as np
+import pandas as pd
+
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from .sketches import QuantileSketch
+
+
+def _handle_zeros_in_scale(scale: np.ndarray) -> np.ndarray:
+    # as sklearn scalers: a constant feature is left unscaled
+    return np.where(scale == 0.0, 1.0, scale)
+
+
+class MappedChunks:
+    """
+    The chunks of an iterable transformed by a function, lazily: each iteration maps the chunks again.
+
+    A node returning it has a single output saved at once by a chunked dataset, whereas Kedro saves
+    the output of a node returning an iterator (a generator node) chunk by chunk, as separate saves.
+
+    Attributes:
+        chunks (Iterable[Any]): The chunks.
+        func (Callable): The function applied to each chunk.
+        args (tuple): The additional arguments of the function.
+    """
+
+    def __init__(self, chunks: Iterable[Any], func: Callable, *args):
+        """
+        Initialize the MappedChunks class.
+
+        Args:
+            chunks (Iterable[Any]): The chunks.
+            func (Callable): The function applied to each chunk.
+            *args: The additional arguments of the function.
+        """
+        self.chunks = chunks
+        self.func = func
+        self.args = args
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self.chunks:
+            yield self.func(chunk, *self.args)
+
+
+class ChunkedMatrix:
+    """
+    A matrix of known shape produced chunk by chunk (e.g. by a lazy generator transforming a chunked dataset),
+    so that it can be written to disk without ever being held in memory as a whole.
+
+    Attributes:
+        chunks (Iterable[np.ndarray]): The consecutive row blocks of the matrix.
+        shape (Tuple[int, int]): The shape of the matrix.
+        dtype (np.dtype): The dtype of the matrix.
+    """
+
+    def __init__(self, chunks: Iterable[np.ndarray], shape: Tuple[int, int], dtype: Any = np.float64):
+        """
+        Initialize the ChunkedMatrix class.
+
+        Args:
+            chunks (Iterable[np.ndarray]): The consecutive row blocks of the matrix.
+            shape (Tuple[int, int]): The shape of the matrix.
+            dtype (Any, optional): The dtype of the matrix.
+        """
+        self.chunks = chunks
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+
+class FixedScaler(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    A scaler of numeric columns whose center and scale are given instead of learned at fit: X -> (X - center) / scale.
+    It stands in a preprocessor for a RobustScaler, StandardScaler or MinMaxScaler of statistics gathered
+    chunk by chunk (see StreamingFeatureStats.fixed_scaler), its fit only checking the number of columns.
+
+    Attributes:
+        center (np.ndarray): The value subtracted from each column.
+        scale (np.ndarray): The value each centered column is divided by.
+    """
+
+    def __init__(self, center: np.ndarray, scale: np.ndarray):
+        """
+        Initialize the FixedScaler class.
+
+        Args:
+            center (np.ndarray): The value subtracted from each column.
+            scale (np.ndarray): The value each centered column is divided by.
+        """
+        self.center = center
+        self.scale = scale
+
+    def fit(self, X, y=None) -> "FixedScaler":
+        """
+        Check the columns of the feature matrix, nothing is learned.
+
+        Args:
+            X: The numeric columns.
+            y: Ignored.
+
+        Returns:
+            FixedScaler: The scaler.
+        """
+        n_features = np.asarray(X).shape[1]
+        if n_features != len(self.center):
+            raise ValueError(f"X has {n_features} columns, the scaler {len(self.center)}")
+        self.n_features_in_ = n_features
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Scale the numeric columns.
+
+        Args:
+            X: The numeric columns.
+
+        Returns:
+            np.ndarray: The scaled columns.
+        """
+        return (np.asarray(X, dtype=np.float64) - np.asarray(self.center)) / np.asarray(self.scale)
+
+
+class StreamingFeatureStats:
+    """
+    The statistics a preprocessor is fitted on, gathered over chunks of the feature matrix: the vocabulary of
+    the categorical columns, and for the numeric columns a quantile sketch (median and interquartile range of the
+    RobustScaler), the count, mean and sum of squared deviations (StandardScaler) and the extrema (MinMaxScaler).
+    The statistics of different chunks or workers can be merged.
+
+    Attributes:
+        category_cols (List[str]): The categorical columns.
+        numeric_cols (List[str]): The numeric columns.
+        quantile_sketch_size (int): The size of the quantile sketches.
+        n_rows (int): The number of rows seen.
+        vocabularies (Dict[str, set]): The non null values of each categorical column.
+        has_nulls (Dict[str, bool]): Whether each categorical column has null values.
+        quantiles (Dict[str, QuantileSketch]): The quantile sketch of each numeric column.
+        counts (Dict[str, int]): The number of non null values of each numeric column.
+        means (Dict[str, float]): The mean of each numeric column.
+        squared_deviations (Dict[str, float]): The sum of squared deviations from the mean of each numeric column.
+        minimums (Dict[str, float]): The minimum of each numeric column.
+        maximums (Dict[str, float]): The maximum of each numeric column.
+    """
+
+    def __init__(self, category_cols: List[str], numeric_cols: List[str], quantile_sketch_size: int = 200):
+        """
+        Initialize the StreamingFeatureStats class.
+
+        Args:
+            category_cols (List[str]): The categorical columns.
+            numeric_cols (List[str]): The numeric columns.
+            quantile_sketch_size (int, optional): The size of the quantile sketches.
+        """
+        self.category_cols = list(category_cols)
+        self.numeric_cols = list(numeric_cols)
+        self.quantile_sketch_size = quantile_sketch_size
+        self.n_rows = 0
+        self.vocabularies = {column: set() for column in self.category_cols}
+        self.has_nulls = {column: False for column in self.category_cols}
+        self.quantiles = {column: QuantileSketch(quantile_sketch_size) for column in self.numeric_cols}
+        self.counts = {column: 0 for column in self.numeric_cols}
+        self.means = {column: 0.0 for column in self.numeric_cols}
+        self.squared_deviations = {column: 0.0 for column in self.numeric_cols}
+        self.minimums = {column: np.inf for column in self.numeric_cols}
+        self.maximums = {column: -np.inf for column in self.numeric_cols}
+
+    def _merge_moments(self, column: str, count: int, mean: float, squared_deviations: float) -> None:
+        """
+        Merge the moments of a batch of values into those of a column (Chan et al. parallel variance).
+
+        Args:
+            column (str): The numeric column.
+            count (int): The number of values of the batch.
+            mean (float): Their mean.
+            squared_deviations (float): Their sum of squared deviations from their mean.
+        """
+        if count == 0:
+            return
+        total = self.counts[column] + count
+        delta = mean - self.means[column]
+        self.squared_deviations[column] += squared_deviations + delta ** 2 * self.counts[column] * count / total
+        self.means[column] += delta * count / total
+        self.counts[column] = total
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk of the feature matrix to the statistics.
+
+        Args:
+            chunk (pd.DataFrame): The chunk.
+        """
+        self.n_rows += len(chunk)
+        for column in self.category_cols:
+            values = chunk[column]
+            self.has_nulls[column] |= bool(values.isna().any())
+            self.vocabularies[column].update(values.dropna().unique().tolist())
+        for column in self.numeric_cols:
+            values = chunk[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.quantiles[column].update(values)
+            if len(values):
+                self._merge_moments(column, len(values), values.mean(), float(((values - values.mean()) ** 2).sum()))
+                self.minimums[column] = min(self.minimums[column], float(values.min()))
+                self.maximums[column] = max(self.maximums[column], float(values.max()))
+
+    def merge(self, other: "StreamingFeatureStats") -> None:
+        """
+        Merge the statistics of other chunks into these ones.
+
+        Args:
+            other (StreamingFeatureStats): Statistics of the same columns and sketch size.
+        """
+        if (other.category_cols, other.numeric_cols, other.quantile_sketch_size) != \
+                (self.category_cols, self.numeric_cols, self.quantile_sketch_size):
+            raise ValueError("Only statistics of the same columns and sketch size can be merged")
+        self.n_rows += other.n_rows
+        for column in self.category_cols:
+            self.vocabularies[column] |= other.vocabularies[column]
+            self.has_nulls[column] |= other.has_nulls[column]
+        for column in self.numeric_cols:
+            self.quantiles[column].merge(other.quantiles[column])
+            self._merge_moments(column, other.counts[column], other.means[column], other.squared_deviations[column])
+            self.minimums[column] = min(self.minimums[column], other.minimums[column])
+            self.maximums[column] = max(self.maximums[column], other.maximums[column])
+
+    def categories(self, column: str) -> List[Any]:
+        """
+        Get the categories of a categorical column, in the order a OneHotEncoder fitted on the whole column
+        would find them (sorted, null last).
+
+        Args:
+            column (str): The categorical column.
+
+        Returns:
+            List[Any]: The categories.
+        """
+        return sorted(self.vocabularies[column]) + ([np.nan] if self.has_nulls[column] else [])
+
+    def fixed_scaler(self, scaler: str, columns: List[str]) -> FixedScaler:
+        """
+        Make the scaler of numeric columns a fit on the whole columns would give (the 'robust' quantiles being
+        estimated by the sketches), null values being ignored as sklearn scalers do.
+
+        Args:
+            scaler (str): 'robust' (median and interquartile range), 'standard' (mean and standard deviation)
+                or 'minmax' (minimum and range).
+            columns (List[str]): The numeric columns of the scaler.
+
+        Returns:
+            FixedScaler: The scaler.
+        """
+        if scaler == "robust":
+            quartiles = np.array([self.quantiles[column].quantiles([0.25, 0.5, 0.75]) for column in columns])
+            return FixedScaler(quartiles[:, 1], _handle_zeros_in_scale(quartiles[:, 2] - quartiles[:, 0]))
+        if scaler == "standard":
+            counts = np.array([self.counts[column] for column in columns])
+            variances = np.array([self.squared_deviations[column] for column in columns]) / np.maximum(counts, 1)
+            return FixedScaler(np.array([self.means[column] for column in columns]),
+                               _handle_zeros_in_scale(np.sqrt(variances)))
+        if scaler == "minmax":
+            data_min = np.array([self.minimums[column] for column in columns])
+            data_max = np.array([self.maximums[column] for column in columns])
+            return FixedScaler(data_min, _handle_zeros_in_scale(data_max - data_min))
+        raise ValueError(f"Unknown scaler '{scaler}', expected 'robust', 'standard' or 'minmax'")
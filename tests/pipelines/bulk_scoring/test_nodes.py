@@ -0,0 +1,71 @@
+"""
+Tests of the bulk scoring: the chunks scored by the worker processes must give the neighbors of the bundle
+for every user, written as one Parquet partition per chunk.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kedro_datasets.partitions import PartitionedDataset
+from sklearn.compose import ColumnTransformer
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+from plant_recommendation.pipelines.bulk_scoring.nodes import score_user_profiles
+from plant_recommendation.recommender.bundle import ModelBundle
+
+N_NEIGHBORS = 4
+
+
+@pytest.fixture
+def bundle():
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame({"height": rng.normal(size=50), "width": rng.normal(size=50)})
+    preprocessor = ColumnTransformer([("scale", StandardScaler(), ["height", "width"])]).fit(features)
+    nn = NearestNeighbors(n_neighbors=3).fit(preprocessor.transform(features))
+    return ModelBundle(preprocessor, nn, features.assign(id=np.arange(50) * 10 + 7))
+
+
+@pytest.fixture
+def user_profiles():
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({"user_id": [f"user-{row}" for row in range(23)], "width": rng.normal(size=23),
+                         "height": rng.normal(size=23)})
+
+
+@pytest.mark.parametrize("n_workers, max_pending_chunks", [(1, 1), (2, 8)])
+def test_scores_every_user_with_the_bundle(bundle, user_profiles, n_workers, max_pending_chunks):
+    chunks = (user_profiles.iloc[start:start + 5] for start in range(0, len(user_profiles), 5))
+
+    partitions = list(score_user_profiles(chunks, bundle, "id", "user_id", N_NEIGHBORS, n_workers,
+                                          max_pending_chunks))
+
+    names = [name for partition in partitions for name in partition]
+    assert [name.split("/")[1] for name in names] == [f"part-{number:05d}" for number in range(5)]
+    assert len({name.split("/")[0] for name in names}) == 1
+    scores = pd.concat([scores for partition in partitions for scores in partition.values()], ignore_index=True)
+
+    distances, indices = bundle.nn.kneighbors(bundle.preprocessor.transform(user_profiles), n_neighbors=N_NEIGHBORS)
+    assert scores.columns.tolist() == ["user_id", "user_row", "rank", "plant_id", "_distance"]
+    np.testing.assert_array_equal(scores["user_row"], np.repeat(np.arange(23), N_NEIGHBORS))
+    np.testing.assert_array_equal(scores["user_id"], np.repeat(user_profiles["user_id"], N_NEIGHBORS))
+    np.testing.assert_array_equal(scores["rank"], np.tile(np.arange(1, N_NEIGHBORS + 1), 23))
+    np.testing.assert_array_equal(scores["plant_id"], bundle.plants_dataset["id"].to_numpy()[indices.ravel()])
+    np.testing.assert_allclose(scores["_distance"], distances.ravel())
+
+
+def test_partitions_written_as_parquet(bundle, user_profiles, tmp_path):
+    chunks = (user_profiles.iloc[start:start + 10] for start in range(0, len(user_profiles), 10))
+    dataset = PartitionedDataset(path=str(tmp_path / "bulk_recommendations"), dataset="pandas.ParquetDataset",
+                                 filename_suffix=".pq")
+
+    # kedro saves a generator output partition by partition
+    for partition in score_user_profiles(chunks, bundle, "id", "user_id", N_NEIGHBORS, 2, 2):
+        dataset.save(partition)
+
+    files = sorted(path.relative_to(tmp_path / "bulk_recommendations") for path in tmp_path.rglob("*.pq"))
+    assert [path.name for path in files] == ["part-00000.pq", "part-00001.pq", "part-00002.pq"]
+    loaded = dataset.load()
+    scores = pd.concat([loaded[name]() for name in sorted(loaded)], ignore_index=True)
+    assert len(scores) == 23 * N_NEIGHBORS
+    np.testing.assert_array_equal(scores["user_row"], np.repeat(np.arange(23), N_NEIGHBORS))
@@ -0,0 +1,107 @@
+"""
+Equivalence tests of the DataFrame backends of the data processing pipeline on plant_details_all.csv:
+every backend must produce the dataset of the original, linear pandas cleaning chain.
+"""
+import pandas as pd
+import pytest
+
+from importlib.util import find_spec
+from pathlib import Path
+from kedro.config import OmegaConfigLoader
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.runner import SequentialRunner
+
+from plant_recommendation.pipelines.data_processing import create_data_processing_pipeline
+from plant_recommendation.pipelines.data_processing.nodes.nodes import split_column_groups
+from plant_recommendation.pipelines.data_processing.nodes.features_engineering import add_attracts_col, add_perennial_col
+from plant_recommendation.pipelines.data_processing.nodes.features_cleaning.clean_features import CleanFeatures
+from plant_recommendation.pipelines.data_processing.nodes.features_cleaning.clean_feature_maintenance import CleanFeatureMaintenance
+from plant_recommendation.pipelines.data_processing.nodes.features_cleaning.clean_feature_type import CleanFeatureType
+from plant_recommendation.pipelines.data_processing.nodes.features_cleaning.clean_feature_sunlight import CleanFeatureSunlight
+from plant_recommendation.pipelines.data_processing.nodes.features_cleaning.clean_feature_hardiness import CleanFeatureHardiness
+
+PROJECT_PATH = Path(__file__).resolve().parents[3]
+RAW_DATA_PATH = PROJECT_PATH / "data" / "01_raw"
+
+BACKENDS = ["pandas", pytest.param("polars", marks=pytest.mark.skipif(find_spec("polars") is None,
+                                                                      reason="polars is not installed"))]
+
+
+@pytest.fixture(scope="module")
+def params():
+    config_loader = OmegaConfigLoader(conf_source=str(PROJECT_PATH / "conf"), base_env="base", default_run_env="base")
+    return config_loader["parameters"]
+
+
+@pytest.fixture(scope="module")
+def raw_datasets():
+    return {"raw_dataset": pd.read_csv(RAW_DATA_PATH / "plant_details_all.csv"),
+            "type_imputation_file": pd.read_csv(RAW_DATA_PATH / "type_impute.csv"),
+            "hardiness_imputation_file": pd.read_csv(RAW_DATA_PATH / "hardiness_impute.csv")}
+
+
+@pytest.fixture(scope="module")
+def reference_dataset(params, raw_datasets):
+    """The dataset of the original linear pandas chain: normalize -> maintenance -> type -> sunlight -> hardiness."""
+    dataset = raw_datasets["raw_dataset"][params["RELEVANT_FEATURES"]]
+    dataset = CleanFeatures(features_to_lower=params["FEATURES_TO_LOWER"], list_features=params["FEATURES_WITH_LISTS"],
+                            boolean_features=params["BOOLEAN_FEATURES"], id_col=params["ID_COL"]).clean(dataset)
+    dataset = CleanFeatureMaintenance(maintenance_col=params["MAINTENANCE_COL"],
+                                      imputation_features=params["MAINTENANCE_IMPUTATION_FEATURES"],
+                                      maintenance_levels=params["MAINTENANCE_LEVELS"], care_levels=params["CARE_LEVELS"],
+                                      care_level_col=params["CARE_LEVEL_COL"],
+                                      watering_col=params["WATERING_COL"]).clean(dataset)
+    dataset = CleanFeatureType(type_col=params["TYPE_COL"], type_to_plant=params["TYPE_TO_PLANT"],
+                               imputation_file=raw_datasets["type_imputation_file"], id_col=params["ID_COL"]).clean(dataset)
+    dataset = CleanFeatureSunlight(sunlight_col=params["SUNLIGHT_COL"], full_sun=params["FULL_SUN_LIST"],
+                                   full_shade=params["FULL_SHADE_LIST"]).clean(dataset)
+    dataset = CleanFeatureHardiness(imputation_file=raw_datasets["hardiness_imputation_file"],
+                                    rename_dict=params["FEATURES_TO_RENAME"], hardiness_min_col=params["HARDINESS_MIN_COL"],
+                                    hardiness_max_col=params["HARDINESS_MAX_COL"],
+                                    hardiness_levels=params["HARDINESS_LEVELS"], id_col=params["ID_COL"]).clean(dataset)
+    dataset = add_perennial_col(dataset, params["CYCLE_COL"], params["NEW_FEATURES"])
+    dataset = add_attracts_col(dataset, params["ATTRACTS_COL"], params["NEW_FEATURES"])
+    return dataset.drop(columns=params["FEATURES_TO_DROP"]).infer_objects()
+
+
+def run_data_processing(params, raw_datasets, backend):
+    datasets = {f"params:{name}": MemoryDataset(value) for name, value in params.items()}
+    datasets["params:DATAFRAME_BACKEND"] = MemoryDataset(backend)
+    datasets.update({name: MemoryDataset(dataset) for name, dataset in raw_datasets.items()})
+    outputs = SequentialRunner().run(create_data_processing_pipeline(), DataCatalog(datasets))
+    return outputs["clean_dataset"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestDataFrameBackends:
+    def test_same_dataset_as_linear_pandas_chain(self, params, raw_datasets, reference_dataset, backend):
+        clean_dataset = run_data_processing(params, raw_datasets, backend)
+
+        pd.testing.assert_frame_equal(clean_dataset.infer_objects(), reference_dataset)
+
+    def test_no_missing_model_features(self, params, raw_datasets, backend):
+        clean_dataset = run_data_processing(params, raw_datasets, backend)
+        features = [params["TYPE_COL"], params["SUNLIGHT_COL"], params["HARDINESS_MIN_COL"], params["HARDINESS_MAX_COL"]]
+
+        assert not clean_dataset[features].isnull().any().any()
+        assert set(clean_dataset[params["SUNLIGHT_COL"]]) <= {"full_shade", "part_shade", "full_sun"}
+
+
+class TestColumnGroupsValidation:
+    def test_unknown_group(self, params, raw_datasets):
+        column_groups = {**params["COLUMN_GROUPS"], "cycle": ["cycle"]}
+
+        with pytest.raises(ValueError, match="COLUMN_GROUPS must define the groups"):
+            split_column_groups(raw_datasets["raw_dataset"], column_groups)
+
+    def test_column_in_several_groups(self, params, raw_datasets):
+        column_groups = {**params["COLUMN_GROUPS"], "type": ["type", "sunlight"]}
+
+        with pytest.raises(ValueError, match=r"\['sunlight'\] are in several groups"):
+            split_column_groups(raw_datasets["raw_dataset"], column_groups)
+
+    def test_maintenance_group_without_imputation_columns(self, params, raw_datasets):
+        params = {**params, "COLUMN_GROUPS": {**params["COLUMN_GROUPS"], "maintenance": ["maintenance"]}}
+
+        with pytest.raises(ValueError, match=r"must contain the columns \['care_level', 'watering'\]"):
+            run_data_processing(params, raw_datasets, "pandas")
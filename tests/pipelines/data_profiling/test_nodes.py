@@ -0,0 +1,36 @@
+"""
+Tests of the drift measure of the data profiling pipeline.
+"""
+import numpy as np
+import pytest
+
+from plant_recommendation.pipelines.data_profiling.nodes import population_stability_index
+
+
+def test_psi_of_identical_distributions_is_zero():
+    counts = np.array([10, 30, 40, 20])
+
+    assert population_stability_index(counts, counts) == 0.0
+    # only the shares matter, not the number of values
+    assert population_stability_index(counts, 3 * counts) == pytest.approx(0.0)
+
+
+def test_psi_value():
+    expected, actual = np.array([0.5, 0.5]), np.array([0.8, 0.2])
+    value = 0.3 * np.log(0.8 / 0.5) - 0.3 * np.log(0.2 / 0.5)
+
+    assert population_stability_index(expected, actual) == pytest.approx(value)
+    assert population_stability_index(actual, expected) == pytest.approx(value)
+
+
+def test_psi_thresholds():
+    reference = np.array([25, 25, 25, 25])
+
+    assert population_stability_index(reference, [24, 26, 25, 25]) < 0.1
+    assert population_stability_index(reference, [5, 15, 30, 50]) > 0.2
+
+
+def test_psi_empty_bins_and_distributions():
+    # an empty bin is floored at epsilon instead of making the index infinite
+    assert np.isfinite(population_stability_index([50, 50, 0], [40, 40, 20]))
+    assert population_stability_index([0, 0], [1, 2]) == 0.0
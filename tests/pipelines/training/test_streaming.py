@@ -0,0 +1,125 @@
+"""
+Tests of the chunked training: the statistics gathered chunk by chunk must be those of the whole dataset,
+and the preprocessor fitted on them must transform as the preprocessor fitted on the whole dataset.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from plant_recommendation.pipelines.training.nodes import (build_model_bundle, build_name_index,
+                                                           build_similar_plants_graph,
+                                                           build_similar_plants_graph_streaming,
+                                                           collect_plants_streaming, filter_plants_streaming,
+                                                           fit_nn_streaming, fit_preprocessor,
+                                                           fit_preprocessor_streaming, prepare_data,
+                                                           transform_streaming)
+from plant_recommendation.streaming import StreamingFeatureStats
+
+POISONOUS_COL = ['poisonous_to_humans', 'poisonous_to_pets']
+COLUMNS_TO_DROP = ['common_name', 'scientific_name', 'id']
+
+
+@pytest.fixture
+def clean_dataset():
+    rng = np.random.default_rng(0)
+    n_plants = 600
+    hardiness_min = rng.integers(1, 10, n_plants).astype(np.float64)
+    hardiness_min[[5, 200]] = np.nan
+    dataset = pd.DataFrame({
+        'id': np.arange(n_plants),
+        'common_name': [f"plant {position}" for position in range(n_plants)],
+        'scientific_name': [f"['Genus species{position}']" for position in range(n_plants)],
+        'type': rng.choice(['arbres', 'arbustes', 'fleurs', 'herbes'], n_plants),
+        'maintenance': rng.choice(['low', 'moderate', 'high'], n_plants),
+        'sunlight': rng.choice(['full_shade', 'part_shade', 'full_sun'], n_plants),
+        'drought_tolerant': rng.random(n_plants) < 0.3,
+        'poisonous_to_humans': rng.random(n_plants) < 0.1,
+        'poisonous_to_pets': rng.random(n_plants) < 0.1,
+        'hardiness_min': hardiness_min,
+        'hardiness_max': hardiness_min + rng.integers(0, 4, n_plants),
+        'is_perennial': rng.random(n_plants) < 0.5,
+    })
+    # a type only found in the last chunk
+    dataset.loc[n_plants - 3:, 'type'] = 'succulentes'
+    return dataset
+
+
+def chunks_of(dataset, chunk_size):
+    return [dataset.iloc[start:start + chunk_size] for start in range(0, len(dataset), chunk_size)]
+
+
+def test_merged_stats_are_those_of_the_whole_dataset(clean_dataset):
+    X, _ = prepare_data(clean_dataset, COLUMNS_TO_DROP, POISONOUS_COL)
+    chunk_stats = []
+    for chunk in chunks_of(X, 70):
+        stats = StreamingFeatureStats(['type'], ['hardiness_min', 'hardiness_max'], quantile_sketch_size=1000)
+        stats.update(chunk)
+        chunk_stats.append(stats)
+    stats = chunk_stats[0]
+    for other in chunk_stats[1:]:
+        stats.merge(other)
+
+    assert stats.n_rows == len(X)
+    assert stats.categories('type') == sorted(X['type'].unique())
+    for column in ['hardiness_min', 'hardiness_max']:
+        values = X[column].dropna().to_numpy()
+        assert stats.counts[column] == len(values)
+        assert stats.means[column] == pytest.approx(values.mean())
+        assert stats.squared_deviations[column] / stats.counts[column] == pytest.approx(values.var())
+        assert (stats.minimums[column], stats.maximums[column]) == (values.min(), values.max())
+        np.testing.assert_allclose(stats.quantiles[column].quantiles([0.25, 0.5, 0.75]),
+                                   np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def test_merge_rejects_stats_of_other_columns():
+    stats = StreamingFeatureStats(['type'], ['hardiness_min'])
+    with pytest.raises(ValueError):
+        stats.merge(StreamingFeatureStats(['type'], ['hardiness_max']))
+
+
+@pytest.mark.parametrize("scaler", ["robust", "standard", "minmax"])
+def test_streaming_preprocessor_transforms_as_the_full_fit(clean_dataset, scaler):
+    X, _ = prepare_data(clean_dataset, COLUMNS_TO_DROP, POISONOUS_COL)
+    expected = fit_preprocessor(X, scaler)
+
+    # the quantile sketches hold all the values: the robust quartiles are exact
+    preprocessor, stats = fit_preprocessor_streaming(chunks_of(clean_dataset, 100), COLUMNS_TO_DROP, POISONOUS_COL,
+                                                     scaler, quantile_sketch_size=1000)
+
+    assert stats.n_rows == len(X)
+    assert list(preprocessor.get_feature_names_out()) == list(expected.get_feature_names_out())
+    np.testing.assert_allclose(preprocessor.transform(X), expected.transform(X), rtol=1e-12, atol=1e-12)
+
+
+def test_streaming_robust_scaler_with_small_sketches(clean_dataset):
+    X, _ = prepare_data(clean_dataset, COLUMNS_TO_DROP, POISONOUS_COL)
+    preprocessor, _ = fit_preprocessor_streaming(chunks_of(clean_dataset, 100), COLUMNS_TO_DROP, POISONOUS_COL,
+                                                 "robust", quantile_sketch_size=50)
+    scaler = preprocessor.named_transformers_['robustscaler']
+
+    # the quartiles of the integer hardiness are estimated within one unit
+    values = X[['hardiness_max', 'hardiness_min']].to_numpy()
+    np.testing.assert_allclose(scaler.center, np.nanmedian(values, axis=0), atol=1)
+
+
+def test_streaming_outputs_are_aligned_with_the_plant_table(clean_dataset):
+    chunks = chunks_of(clean_dataset, 100)
+    preprocessor, stats = fit_preprocessor_streaming(chunks, COLUMNS_TO_DROP, POISONOUS_COL, "minmax")
+    plants_chunks = filter_plants_streaming(chunks, POISONOUS_COL)
+    X_transformed = np.concatenate(list(transform_streaming(chunks, preprocessor, stats, COLUMNS_TO_DROP,
+                                                            POISONOUS_COL).chunks))
+    nn = fit_nn_streaming(X_transformed, preprocessor, 5, engine="packed", plants_chunks=plants_chunks)
+
+    plants_dataset = collect_plants_streaming(plants_chunks)
+    bundle = build_model_bundle(preprocessor, nn, plants_dataset)
+    graph = build_similar_plants_graph_streaming(X_transformed, plants_dataset, 'id', 4, 64)
+    name_index = build_name_index(plants_dataset, ['common_name'])
+
+    X, expected_plants = prepare_data(clean_dataset, COLUMNS_TO_DROP, POISONOUS_COL)
+    pd.testing.assert_frame_equal(bundle.plants_dataset, expected_plants.reset_index(drop=True))
+    expected_graph = build_similar_plants_graph(X, preprocessor, expected_plants, 'id', 4, 64)
+    np.testing.assert_array_equal(graph.indices, expected_graph.indices)
+    np.testing.assert_array_equal(graph.plant_ids, expected_plants['id'].to_numpy())
+    # the name index gives the row of a plant in the table
+    row = len(plants_dataset) - 1
+    assert name_index.lookup(plants_dataset['common_name'].iloc[row]) == row
@@ -0,0 +1,67 @@
+"""
+Tests of the evaluation of the hyperparameter sweep: the held-out genus label and its leave-one-out agreement.
+"""
+import numpy as np
+import pandas as pd
+
+from sklearn.neighbors import NearestNeighbors
+
+from plant_recommendation.pipelines.training.nodes import leave_one_out_agreement, plant_genus, sweep_hyperparameters
+
+
+def test_plant_genus():
+    scientific_names = pd.Series(["['Abies alba']", "[\"Abies koreana 'Aurea'\"]", "['Acer  Palmatum', 'Acer x']",
+                                  "[]", None], index=[10, 11, 12, 13, 14])
+
+    genus = plant_genus(scientific_names)
+
+    assert genus.index.tolist() == [10, 11, 12, 13, 14]
+    assert genus.tolist()[:3] == ["abies", "abies", "acer"]
+    assert genus.iloc[3:].isna().all()
+
+
+def test_leave_one_out_agreement():
+    # two well separated clusters of plants on a line, labelled by cluster except the last plant
+    X_transformed = np.array([[0.0], [0.1], [0.2], [10.0], [10.1], [10.2]])
+    labels = np.array([0, 0, 0, 1, 1, 2])
+    nn = NearestNeighbors().fit(X_transformed)
+
+    # the plant of label 2 is alone with its label, so it is not queried; the two nearest neighbors of plants 0 to 2
+    # have their label, plants 3 and 4 have plant 5 as one of their two nearest neighbors
+    agreement = leave_one_out_agreement(nn, X_transformed, labels, n_neighbors=2)
+
+    assert agreement == np.mean([1, 1, 1, 0.5, 0.5])
+
+
+def test_leave_one_out_agreement_without_shared_label():
+    X_transformed = np.array([[0.0], [0.1], [0.2]])
+    nn = NearestNeighbors().fit(X_transformed)
+
+    assert np.isnan(leave_one_out_agreement(nn, X_transformed, np.array([0, 1, -1]), n_neighbors=2))
+
+
+def test_sweep_without_shared_genus():
+    rng = np.random.default_rng(0)
+    n_plants = 12
+    X = pd.DataFrame({'type': rng.choice(['arbres', 'fleurs'], n_plants),
+                      'maintenance': rng.choice(['low', 'moderate', 'high'], n_plants),
+                      'sunlight': rng.choice(['full_shade', 'part_shade', 'full_sun'], n_plants),
+                      'hardiness_min': rng.integers(1, 10, n_plants).astype(np.float64),
+                      'hardiness_max': rng.integers(5, 12, n_plants).astype(np.float64),
+                      'drought_tolerant': rng.random(n_plants) < 0.5})
+    plants_dataset = pd.DataFrame({'scientific_name': [f"['Genus{position} species']" for position in range(n_plants)]})
+    grid = {'scaler': ['robust', 'minmax'], 'metric': ['euclidean']}
+
+    sweep = sweep_hyperparameters(X, plants_dataset, grid, 'scientific_name', n_eval_neighbors=3, n_neighbors=3,
+                                  n_workers=1, n_latency_queries=4, latency_penalty=0.01, random_state=0)
+
+    assert sweep['best'] is None
+    assert [candidate['rank'] for candidate in sweep['candidates']] == [1, 2]
+    assert all(np.isnan(candidate['loo_agreement']) for candidate in sweep['candidates'])
+
+    # with shared genera, the candidates are scored
+    plants_dataset['scientific_name'] = [f"['Genus{position % 3} species']" for position in range(n_plants)]
+    sweep = sweep_hyperparameters(X, plants_dataset, grid, 'scientific_name', n_eval_neighbors=3, n_neighbors=3,
+                                  n_workers=1, n_latency_queries=4, latency_penalty=0.01, random_state=0)
+    assert sweep['best'] is sweep['candidates'][0]
+    assert 0 <= sweep['best']['loo_agreement'] <= 1
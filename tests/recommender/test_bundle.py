@@ -0,0 +1,155 @@
+"""
+Tests of the model bundle: its components must be saved and loaded together, a corrupted or misaligned bundle
+rejected, the old versions pruned, and a watcher must swap to a new version only once it is complete and valid.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kedro.io import Version
+from kedro.io.core import VersionNotFoundError
+from sklearn.compose import ColumnTransformer
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+from plant_recommendation.datasets.model_bundle_dataset import ModelBundleDataset
+from plant_recommendation.recommender.bundle import (MANIFEST_FILE, NEAREST_NEIGHBORS_FILE, ModelBundle,
+                                                     ModelBundleError, ModelBundleWatcher, latest_bundle_path,
+                                                     prune_bundle_versions)
+
+
+def version_name(number):
+    return f"2026-01-01T00.00.{number:02d}.000Z"
+
+
+def make_bundle(n_plants=20, seed=0):
+    rng = np.random.default_rng(seed)
+    plants_dataset = pd.DataFrame({"id": np.arange(n_plants) + 100, "height": rng.normal(size=n_plants),
+                                   "width": rng.normal(size=n_plants)})
+    preprocessor = ColumnTransformer([("scale", StandardScaler(), ["height", "width"])]).fit(plants_dataset)
+    nn = NearestNeighbors(n_neighbors=3).fit(preprocessor.transform(plants_dataset))
+    return ModelBundle(preprocessor, nn, plants_dataset)
+
+
+def save_version(bundle_dir, number, bundle=None):
+    path = bundle_dir / version_name(number) / bundle_dir.name
+    (bundle or make_bundle(seed=number)).save(path)
+    return path
+
+
+def test_save_load_round_trip(tmp_path):
+    bundle = make_bundle()
+    bundle.save(tmp_path / "bundle", version="v1")
+
+    loaded = ModelBundle.load(tmp_path / "bundle")
+    assert loaded.version == "v1"
+    assert loaded.manifest["n_plants"] == 20
+    pd.testing.assert_frame_equal(loaded.plants_dataset, bundle.plants_dataset)
+    user_data = pd.DataFrame({"height": [0.1], "width": [-0.2]})
+    pd.testing.assert_frame_equal(loaded.recommend(user_data), bundle.recommend(user_data))
+
+    # a bundle directory is written once
+    with pytest.raises(OSError):
+        bundle.save(tmp_path / "bundle")
+
+
+def test_load_rejects_checksum_mismatch(tmp_path):
+    make_bundle().save(tmp_path / "bundle")
+    with open(tmp_path / "bundle" / NEAREST_NEIGHBORS_FILE, "ab") as file:
+        file.write(b"0")
+
+    with pytest.raises(ModelBundleError, match="Checksum mismatch"):
+        ModelBundle.load(tmp_path / "bundle")
+
+
+def test_rejects_misaligned_components():
+    bundle = make_bundle()
+    with pytest.raises(ModelBundleError, match="rows"):
+        ModelBundle(bundle.preprocessor, bundle.nn, bundle.plants_dataset.iloc[:-1])
+
+    other_features = ColumnTransformer([("scale", StandardScaler(), ["height"])]).fit(bundle.plants_dataset)
+    with pytest.raises(ModelBundleError, match="features"):
+        ModelBundle(other_features, bundle.nn, bundle.plants_dataset)
+
+
+def test_prune_keeps_the_most_recent_complete_versions(tmp_path):
+    bundle_dir = tmp_path / "model_bundle"
+    for number in range(4):
+        save_version(bundle_dir, number)
+    # a version being written has no manifest yet
+    (bundle_dir / version_name(9) / bundle_dir.name).mkdir(parents=True)
+
+    assert prune_bundle_versions(bundle_dir, keep=2) == 2
+    assert sorted(path.name for path in bundle_dir.iterdir()) == [version_name(2), version_name(3), version_name(9)]
+    assert latest_bundle_path(bundle_dir) == bundle_dir / version_name(3) / bundle_dir.name
+
+
+def test_dataset_saves_versions_and_prunes(tmp_path):
+    filepath = str(tmp_path / "model_bundle")
+    for number in range(3):
+        ModelBundleDataset(filepath, version=Version(None, version_name(number)), keep_versions=2).save(
+            make_bundle(seed=number))
+
+    assert len(list((tmp_path / "model_bundle").iterdir())) == 2
+    loaded = ModelBundleDataset(filepath, version=Version(None, None)).load()
+    assert loaded.version == version_name(2)
+
+
+def test_dataset_falls_back_to_separate_components(tmp_path):
+    bundle = make_bundle()
+    pd.to_pickle(bundle.preprocessor, tmp_path / "preprocessor.pickle")
+    pd.to_pickle(bundle.nn, tmp_path / "nn.pickle")
+    bundle.plants_dataset.to_parquet(tmp_path / "plants.pq")
+    fallback = {"preprocessor": {"type": "pickle.PickleDataset", "filepath": str(tmp_path / "preprocessor.pickle")},
+                "nn": {"type": "pickle.PickleDataset", "filepath": str(tmp_path / "nn.pickle")},
+                "plants_dataset": {"type": "pandas.ParquetDataset", "filepath": str(tmp_path / "plants.pq")}}
+    filepath = str(tmp_path / "model_bundle")
+
+    with pytest.raises(VersionNotFoundError):
+        ModelBundleDataset(filepath, version=Version(None, None)).load()
+
+    dataset = ModelBundleDataset(filepath, version=Version(None, None), fallback=fallback)
+    assert dataset.exists()
+    loaded = dataset.load()
+    assert loaded.version is None
+    pd.testing.assert_frame_equal(loaded.plants_dataset, bundle.plants_dataset)
+
+    # once a bundle is saved, it is loaded instead of the fallback
+    ModelBundleDataset(filepath, version=Version(None, version_name(1)), fallback=fallback).save(
+        make_bundle(n_plants=5))
+    assert len(ModelBundleDataset(filepath, version=Version(None, None), fallback=fallback).load().plants_dataset) == 5
+
+
+def test_watcher_swaps_to_complete_and_valid_versions(tmp_path):
+    bundle_dir = tmp_path / "model_bundle"
+    with pytest.raises(ModelBundleError):
+        ModelBundleWatcher(bundle_dir)
+
+    save_version(bundle_dir, 1)
+    watcher = ModelBundleWatcher(bundle_dir, poll_interval=0.01)
+    first_bundle = watcher.bundle
+    assert first_bundle.version == version_name(1)
+    assert not watcher.refresh()
+
+    save_version(bundle_dir, 2, make_bundle(n_plants=10))
+    assert watcher.refresh()
+    assert watcher.bundle.version == version_name(2)
+    assert len(first_bundle.plants_dataset) == 20
+    assert len(watcher.recommend(pd.DataFrame({"height": [0.0], "width": [0.0]}), n_recommendations=20)) == 10
+
+    # a corrupted version is ignored, the current bundle keeps serving
+    corrupted = save_version(bundle_dir, 3)
+    manifest = (corrupted / MANIFEST_FILE).read_text()
+    (corrupted / MANIFEST_FILE).write_text(manifest.replace('"sha256": "', '"sha256": "0'))
+    assert not watcher.refresh()
+    assert watcher.bundle.version == version_name(2)
+
+    # the background thread picks up a new version
+    with watcher:
+        save_version(bundle_dir, 4)
+        deadline = time.monotonic() + 5
+        while watcher.bundle.version != version_name(4) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert watcher.bundle.version == version_name(4)
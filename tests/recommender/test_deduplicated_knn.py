@@ -0,0 +1,33 @@
+"""
+Tests of the duplicate-vector collapsing wrapper: the expanded neighbors must be those of an exhaustive
+search, ties between distinct vectors at the k-th neighbor included.
+"""
+import numpy as np
+
+from plant_recommendation.recommender.deduplicated_knn import DeduplicatedKNN
+from plant_recommendation.recommender.exact_knn import ExactKNN
+
+from .test_exact_knn import exhaustive_search
+
+
+def test_ties_between_groups_broken_by_position():
+    # four distinct vectors at distance 1 from the query, the last plant duplicating the first vector
+    plants = np.array([[0.0, 1.0], [1.0, 0.0], [0.0, -1.0], [-1.0, 0.0], [0.0, 1.0]])
+    engine = DeduplicatedKNN(ExactKNN(), n_neighbors=3).fit(plants)
+
+    assert engine.n_groups_ == 4
+    distances, indices = engine.kneighbors(np.zeros((1, 2)))
+    np.testing.assert_array_equal(indices, [[0, 1, 2]])
+    np.testing.assert_array_equal(distances, [[1.0, 1.0, 1.0]])
+
+
+def test_same_neighbors_as_exhaustive_search():
+    rng = np.random.default_rng(0)
+    plants = np.round(rng.normal(size=(2000, 4)))
+    queries = np.round(rng.normal(size=(300, 4)) * 2) / 2
+
+    distances, indices = DeduplicatedKNN(ExactKNN(), n_neighbors=5).fit(plants).kneighbors(queries)
+    expected_distances, expected_indices = exhaustive_search(plants, queries, 5)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-12)
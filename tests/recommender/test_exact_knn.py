@@ -0,0 +1,32 @@
+"""
+Tests of the exact k-nearest neighbors engine: its results must be those of an exhaustive float64 search,
+ties being broken by plant position, including on duplicated plants.
+"""
+import numpy as np
+import pytest
+
+from plant_recommendation.recommender.exact_knn import ExactKNN
+
+
+def exhaustive_search(plants: np.ndarray, queries: np.ndarray, n_neighbors: int):
+    squared_distances = ((queries[:, None, :] - plants[None, :, :]) ** 2).sum(axis=2)
+    positions = np.broadcast_to(np.arange(len(plants)), squared_distances.shape)
+    order = np.lexsort((positions, squared_distances), axis=1)[:, :n_neighbors]
+    return np.sqrt(np.take_along_axis(squared_distances, order, axis=1)), order
+
+
+@pytest.mark.parametrize("duplicated", [False, True])
+def test_same_neighbors_as_exhaustive_search(duplicated):
+    rng = np.random.default_rng(0)
+    plants = rng.normal(size=(3000, 12)) * 40
+    if duplicated:
+        # few distinct rounded vectors: many ties at the k-th neighbor
+        plants = np.round(plants / 40)
+    queries = plants[rng.choice(len(plants), 200)] + rng.normal(size=(200, 12)) * 1e-3
+
+    engine = ExactKNN(n_neighbors=5, query_block_size=64, plant_block_size=500).fit(plants)
+    distances, indices = engine.kneighbors(queries)
+    expected_distances, expected_indices = exhaustive_search(plants, queries, 5)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-9)
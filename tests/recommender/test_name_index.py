@@ -0,0 +1,70 @@
+"""
+Tests of the plant name search index: autocomplete, fuzzy search and lookup must find the plants of their names,
+the same way before and after the index is saved and memory-mapped.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from plant_recommendation.recommender.name_index import PlantNameIndex, normalize_name, split_names
+
+
+@pytest.fixture
+def plants_dataset():
+    return pd.DataFrame({
+        "common_name": ["Japanese maple", "Norway maple", "Silver fir", "Lavender", "Rosemary"],
+        "scientific_name": ["['Acer palmatum']", "['Acer platanoides']", "['Abies alba']",
+                            "['Lavandula angustifolia', 'Lavandula officinalis']", "['Salvia rosmarinus']"],
+    })
+
+
+@pytest.fixture(params=["memory", "memory_mapped"])
+def name_index(request, plants_dataset, tmp_path):
+    index = PlantNameIndex.build(plants_dataset, ["common_name", "scientific_name"])
+    if request.param == "memory_mapped":
+        index.save(tmp_path / "name_index")
+        index = PlantNameIndex.load(tmp_path / "name_index")
+    return index
+
+
+def test_normalize_and_split_names():
+    assert normalize_name("Acer japonicum 'Aconitifolium'") == "acer japonicum aconitifolium"
+    assert normalize_name("Érable  du Japon") == "erable du japon"
+    assert split_names("['Abies alba', \"Abies pectinata\"]") == ["Abies alba", "Abies pectinata"]
+    assert split_names("Lavender") == ["Lavender"]
+    assert split_names(np.nan) == []
+
+
+def test_complete_ranks_name_prefixes_before_word_prefixes(name_index):
+    rows, lengths = name_index.complete("Acer p")
+    assert rows.tolist() == [0, 1]
+    assert lengths.tolist() == [len("acer palmatum"), len("acer platanoides")]
+
+    # 'maple' starts an inner word of both maples only
+    rows, _ = name_index.complete("mapl")
+    assert sorted(rows.tolist()) == [0, 1]
+
+    # 'lavandula angustifolia' and 'lavandula officinalis' are names of the same plant
+    rows, _ = name_index.complete("lav")
+    assert rows.tolist() == [3]
+
+    assert name_index.complete("acer", limit=1)[0].tolist() == [0]
+    assert len(name_index.complete("quercus")[0]) == 0
+    assert len(name_index.complete("  ")[0]) == 0
+
+
+def test_search_tolerates_typos(name_index):
+    rows, similarities = name_index.search("rosmary")
+    assert rows[0] == 4
+    assert np.all(np.diff(similarities) <= 0)
+    assert len(name_index.search("zzzz")[0]) == 0
+
+
+@pytest.mark.parametrize("name, row", [("Silver fir", 2), ("abies ALBA", 2), ("Lavandula officinalis", 3),
+                                       ("Norway mapel", 1), ("Salvia rosmarinus", 4)])
+def test_lookup_finds_the_plant_of_each_name(name_index, name, row):
+    assert name_index.lookup(name) == row
+
+
+def test_lookup_without_match(name_index):
+    assert name_index.lookup("quercus robur") is None
@@ -0,0 +1,55 @@
+"""
+Tests of the bit-packed k-nearest neighbors engine: bits, ordinals and float64 columns must give the
+neighbors of an exhaustive float64 search, ties being broken by plant position.
+"""
+import numpy as np
+import pandas as pd
+
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, RobustScaler
+
+from plant_recommendation.recommender.packed_knn import PackedKNN, classify_columns, preprocessor_columns
+
+from .test_exact_knn import exhaustive_search
+
+
+def test_same_neighbors_as_exhaustive_search():
+    rng = np.random.default_rng(0)
+    n_plants = 2000
+    # few distinct plants, as in the plant table: many ties at the k-th neighbor
+    plants = np.column_stack([rng.integers(0, 2, size=(n_plants, 70)), rng.integers(0, 4, size=(n_plants, 2)),
+                              np.round(rng.normal(size=(n_plants, 2)), 1) / 3])
+    plants[n_plants // 2:] = plants[:n_plants // 2]
+    queries = plants[rng.choice(n_plants, 100)]
+
+    engine = PackedKNN(n_neighbors=5).fit(plants)
+    assert [len(columns) for columns in classify_columns(plants)] == [70, 2, 2]
+    distances, indices = engine.kneighbors(queries)
+    expected_distances, expected_indices = exhaustive_search(plants, queries, 5)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-12)
+
+
+def test_columns_from_the_preprocessor():
+    # the plants only have the first two sunlight levels: their values make it look binary
+    plants = pd.DataFrame({"type": ["tree", "shrub", "tree", "herb"], "hardiness": [3.0, 5.0, 7.5, 4.0],
+                           "sunlight": ["full_shade", "part_shade", "part_shade", "full_shade"],
+                           "thorny": [True, False, False, True]})
+    preprocessor = ColumnTransformer([("onehotencoder", OneHotEncoder(), ["type"]),
+                                      ("robustscaler", RobustScaler(), ["hardiness"]),
+                                      ("ordinalencoder", OrdinalEncoder(categories=[
+                                          ["full_shade", "part_shade", "full_sun"]]), ["sunlight"])],
+                                     remainder="passthrough", force_int_remainder_cols=False).fit(plants)
+    X = preprocessor.transform(plants)
+    assert [columns.tolist() for columns in classify_columns(X)] == [[0, 1, 2, 4, 5], [], [3]]
+
+    columns = preprocessor_columns(preprocessor, plants.dtypes)
+    assert [kind.tolist() for kind in columns] == [[0, 1, 2, 5], [4], [3]]
+
+    engine = PackedKNN(n_neighbors=2, columns=columns).fit(X)
+    queries = preprocessor.transform(plants.assign(sunlight="full_sun"))
+    distances, indices = engine.kneighbors(queries)
+    expected_distances, expected_indices = exhaustive_search(X, queries, 2)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-12)
@@ -0,0 +1,87 @@
+"""
+Tests of the cursor-based recommendation pager: the pages must be consecutive slices of the full ranking,
+served from the prefetched candidates until they are exhausted.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import FunctionTransformer
+
+from plant_recommendation.recommender.paging import RecommendationPager
+
+N_PLANTS = 50
+
+
+class CountingNearestNeighbors(NearestNeighbors):
+    """A NearestNeighbors counting its searches."""
+
+    n_searches = 0
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        self.n_searches += 1
+        return super().kneighbors(X, n_neighbors=n_neighbors, return_distance=return_distance)
+
+
+@pytest.fixture
+def pager():
+    # plants on a line at distinct distances from the query 0: the ranking is the plant order
+    positions = np.arange(N_PLANTS, dtype=np.float64)[:, None] ** 1.5
+    nn = CountingNearestNeighbors().fit(positions)
+    preprocessor = FunctionTransformer(lambda user_data: user_data.to_numpy(dtype=np.float64))
+    plants_dataset = pd.DataFrame({"id": np.arange(N_PLANTS) + 100})
+    return RecommendationPager(nn, preprocessor, plants_dataset, prefetch_pages=4, max_cursors=2)
+
+
+def user():
+    return pd.DataFrame({"position": [0.0]})
+
+
+def test_pages_are_consecutive_slices_of_the_ranking(pager):
+    page, cursor = pager.first_page(user(), 7)
+    pages = [page]
+    while cursor is not None:
+        page, cursor = pager.next_page(cursor)
+        pages.append(page)
+
+    assert [len(page) for page in pages] == [7] * 7 + [1]
+    ids = pd.concat(pages)["id"].tolist()
+    assert ids == list(range(100, 100 + N_PLANTS))
+    distances = pd.concat(pages)["_distance"].to_numpy()
+    assert (np.diff(distances) > 0).all()
+
+
+def test_page_size_can_change_between_pages(pager):
+    first, cursor = pager.first_page(user(), 3)
+    second, cursor = pager.next_page(cursor, 10)
+
+    assert first["id"].tolist() == [100, 101, 102]
+    assert second["id"].tolist() == list(range(103, 113))
+    assert cursor is not None
+
+
+def test_next_pages_served_from_prefetched_candidates(pager):
+    _, cursor = pager.first_page(user(), 5)
+    assert pager.nn.n_searches == 1
+
+    # the first search fetched 4 pages: the 3 next pages need no search
+    for _ in range(3):
+        _, cursor = pager.next_page(cursor)
+    assert pager.nn.n_searches == 1
+
+    # the 5th page widens the search once, without returning a plant twice
+    page, cursor = pager.next_page(cursor)
+    assert pager.nn.n_searches == 2
+    assert page["id"].tolist() == list(range(120, 125))
+
+
+def test_unknown_and_evicted_cursors(pager):
+    _, oldest = pager.first_page(user(), 5)
+    pager.first_page(user(), 5)
+    pager.first_page(user(), 5)
+
+    with pytest.raises(KeyError, match="Unknown or expired cursor"):
+        pager.next_page(oldest)
+    with pytest.raises(KeyError):
+        pager.next_page("not-a-cursor")
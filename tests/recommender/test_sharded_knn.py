@@ -0,0 +1,69 @@
+"""
+Tests of the sharded k-nearest neighbors index: the merged top k of the shards must have the distances of
+a single global index, and its neighbors when the shards break ties by position.
+"""
+import pickle
+
+import numpy as np
+import pytest
+
+from sklearn.neighbors import NearestNeighbors
+
+from plant_recommendation.recommender.exact_knn import ExactKNN
+from plant_recommendation.recommender.sharded_knn import ShardedKNN, assign_shards
+
+from .test_exact_knn import exhaustive_search
+
+
+@pytest.fixture
+def plants_and_queries():
+    rng = np.random.default_rng(0)
+    # rounded vectors: many ties at the k-th neighbor
+    plants = np.round(rng.normal(size=(1500, 6)) * 2)
+    queries = np.round(rng.normal(size=(200, 6)) * 2)
+    return plants, queries
+
+
+@pytest.mark.parametrize("strategy, keys", [("category", "type"), ("hash", "id")])
+def test_same_distances_as_global_index(plants_and_queries, strategy, keys):
+    plants, queries = plants_and_queries
+    keys = np.arange(len(plants)) % 4 if keys == "type" else np.arange(len(plants)) + 1000
+    shards = assign_shards(keys, strategy, n_shards=3)
+
+    with ShardedKNN(NearestNeighbors(), n_neighbors=10).fit(plants, shards) as index:
+        distances, indices = index.kneighbors(queries)
+    global_distances, _ = NearestNeighbors(n_neighbors=10).fit(plants).kneighbors(queries)
+
+    assert index.n_shards_ == len(np.unique(shards))
+    np.testing.assert_allclose(distances, global_distances, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(np.linalg.norm(queries[:, None] - plants[indices], axis=2), distances,
+                               rtol=0, atol=1e-9)
+
+
+def test_same_neighbors_as_exhaustive_search(plants_and_queries):
+    plants, queries = plants_and_queries
+    shards = assign_shards(np.arange(len(plants)), "hash", n_shards=4)
+
+    with ShardedKNN(ExactKNN(), n_neighbors=7).fit(plants, shards) as index:
+        distances, indices = index.kneighbors(queries)
+        assert np.array_equal(index.kneighbors(queries, return_distance=False), indices)
+    expected_distances, expected_indices = exhaustive_search(plants, queries, 7)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-9)
+
+
+def test_close_and_pickle(plants_and_queries):
+    plants, queries = plants_and_queries
+    index = ShardedKNN(NearestNeighbors(), n_neighbors=3).fit(plants, assign_shards(np.arange(len(plants)) % 2,
+                                                                                    "category"))
+    expected = index.kneighbors(queries, return_distance=False)
+    index.close()
+    assert index._executor is None
+
+    # a closed or unpickled index creates a new thread pool at its next query
+    np.testing.assert_array_equal(index.kneighbors(queries, return_distance=False), expected)
+    loaded = pickle.loads(pickle.dumps(index))
+    index.close()
+    np.testing.assert_array_equal(loaded.kneighbors(queries, return_distance=False), expected)
+    loaded.close()
@@ -0,0 +1,63 @@
+"""
+Tests of the similar plants graph: the blocked, threaded build must give the neighbours of an exhaustive
+search, whatever the block size, and the lookups must find the plants by id.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.neighbors import NearestNeighbors
+
+from plant_recommendation.recommender.similarity_graph import SimilarPlantsGraph
+
+N_PLANTS = 103
+N_SIMILAR = 6
+
+
+@pytest.fixture
+def plants():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(N_PLANTS, 8)), rng.permutation(N_PLANTS) * 10 + 1000
+
+
+@pytest.mark.parametrize("block_size, n_jobs", [(512, 1), (10, 3), (1, 2)])
+def test_same_neighbours_as_exhaustive_search(plants, block_size, n_jobs):
+    X, plant_ids = plants
+    graph = SimilarPlantsGraph.build(X, plant_ids, N_SIMILAR, block_size=block_size, n_jobs=n_jobs)
+
+    # the nearest plant of each plant is itself, which the graph leaves out
+    expected_distances, expected_indices = NearestNeighbors(n_neighbors=N_SIMILAR + 1).fit(X).kneighbors(X)
+    assert np.array_equal(expected_indices[:, 0], np.arange(N_PLANTS))
+
+    np.testing.assert_array_equal(graph.indptr, np.arange(N_PLANTS + 1) * N_SIMILAR)
+    np.testing.assert_array_equal(graph.indices.reshape(N_PLANTS, N_SIMILAR), expected_indices[:, 1:])
+    np.testing.assert_allclose(graph.distances.reshape(N_PLANTS, N_SIMILAR), expected_distances[:, 1:],
+                               rtol=1e-5, atol=1e-5)
+
+
+def test_lookups_by_plant_id(plants):
+    X, plant_ids = plants
+    graph = SimilarPlantsGraph.build(X, plant_ids, N_SIMILAR, block_size=16)
+    plants_dataset = pd.DataFrame({"id": plant_ids})
+
+    position = 42
+    assert graph.position(plant_ids[position]) == position
+    indices, distances = graph.neighbours(plant_ids[position])
+    assert len(indices) == N_SIMILAR and position not in indices
+    assert np.all(np.diff(distances) >= 0)
+
+    similar_plants = graph.similar_plants(plant_ids[position], plants_dataset, n_similar=3)
+    assert similar_plants["id"].tolist() == plant_ids[indices[:3]].tolist()
+    np.testing.assert_array_equal(similar_plants["_distance"], distances[:3])
+
+    for unknown_id in [999, plant_ids.max() + 1, 1005]:
+        with pytest.raises(KeyError):
+            graph.neighbours(unknown_id)
+
+
+def test_fewer_plants_than_neighbours():
+    graph = SimilarPlantsGraph.build(np.array([[0.0], [1.0], [3.0]]), np.array([7, 8, 9]), n_similar=5)
+    assert graph.neighbours(9)[0].tolist() == [1, 0]
+
+    single = SimilarPlantsGraph.build(np.zeros((1, 2)), np.array([7]), n_similar=5)
+    assert len(single.neighbours(7)[0]) == 0
@@ -0,0 +1,165 @@
+"""
+Tests of the project hooks: the node cache and the profiling hooks wrap the node functions during a run,
+and each of them must give back the nodes their original functions, whatever the order they run in.
+The catalog prefetch hook must swap the datasets of a sequential run quietly and leave a parallel run alone.
+"""
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from kedro.io import AbstractDataset, DataCatalog
+from kedro.pipeline import node, pipeline
+from kedro.runner import ParallelRunner
+
+from plant_recommendation.hooks import (CatalogPrefetchHook, MemoizedNodeFunction, NodeCacheHook, PrefetchingDataset,
+                                        ProfiledNodeFunction, ProfilingHook)
+
+
+def double(x):
+    return 2 * x
+
+
+def increment(y):
+    return y + 1
+
+
+@pytest.fixture
+def run_params(tmp_path):
+    return {"project_path": str(tmp_path), "session_id": "test", "pipeline_name": "training"}
+
+
+@pytest.fixture
+def profile_all(monkeypatch):
+    monkeypatch.setenv("PLANT_RECO_PROFILE", "all")
+    monkeypatch.delenv(NodeCacheHook.ENABLED_ENV, raising=False)
+
+
+@pytest.mark.parametrize("restore_order", ["cache_first", "profiling_first"])
+def test_hooks_restore_original_functions(run_params, profile_all, restore_order):
+    test_pipeline = pipeline([node(double, "x", "y", name="double"), node(increment, "y", "z", name="increment")])
+    cache_hook, profiling_hook = NodeCacheHook(), ProfilingHook()
+
+    # pluggy calls the hooks in the reverse order of their registration in settings.py
+    profiling_hook.before_pipeline_run(run_params, test_pipeline)
+    cache_hook.before_pipeline_run(run_params, test_pipeline)
+    for pipeline_node in test_pipeline.nodes:
+        assert isinstance(pipeline_node.func, MemoizedNodeFunction)
+        assert isinstance(pipeline_node.func.__wrapped__, ProfiledNodeFunction)
+
+    if restore_order == "cache_first":
+        cache_hook.after_pipeline_run(run_params, test_pipeline)
+        for pipeline_node in test_pipeline.nodes:
+            assert isinstance(pipeline_node.func, ProfiledNodeFunction)
+        profiling_hook.after_pipeline_run(test_pipeline)
+    else:
+        profiling_hook.after_pipeline_run(test_pipeline)
+        for pipeline_node in test_pipeline.nodes:
+            assert isinstance(pipeline_node.func, MemoizedNodeFunction)
+            assert pipeline_node.func.__wrapped__ in (double, increment)
+        cache_hook.after_pipeline_run(run_params, test_pipeline)
+
+    assert [pipeline_node.func for pipeline_node in test_pipeline.nodes] == [double, increment]
+
+
+def test_node_cache_only_wraps_cached_pipelines(run_params, monkeypatch):
+    monkeypatch.delenv(NodeCacheHook.ENABLED_ENV, raising=False)
+    test_pipeline = pipeline([node(double, "x", "y", name="double")])
+
+    NodeCacheHook().before_pipeline_run({**run_params, "pipeline_name": "inference"}, test_pipeline)
+    assert test_pipeline.nodes[0].func is double
+
+
+def test_node_cache_evicts_old_and_least_recently_used_outputs(tmp_path):
+    cache_dir = tmp_path / "cache"
+    (cache_dir / "node").mkdir(parents=True)
+    now = time.time()
+    ages = {"old": 40 * 86400, "recent": 10, "older": 100, "oldest": 1000}
+    for name, age in ages.items():
+        path = cache_dir / "node" / f"{name}.pickle"
+        path.write_bytes(b"0" * 100)
+        os.utime(path, (now - age, now - age))
+
+    NodeCacheHook(max_bytes=250, max_age_days=30)._evict(cache_dir)
+    assert sorted(path.stem for path in (cache_dir / "node").glob("*.pickle")) == ["older", "recent"]
+
+
+class SlowDataset(AbstractDataset):
+    """A dataset taking a fixed time to load."""
+
+    def __init__(self, value, load_seconds):
+        self.value = value
+        self.load_seconds = load_seconds
+
+    def _load(self):
+        time.sleep(self.load_seconds)
+        return self.value
+
+    def _save(self, data):
+        self.value = data
+
+    def _describe(self):
+        return dict(load_seconds=self.load_seconds)
+
+
+def add(a, b):
+    return a + b
+
+
+@pytest.fixture
+def prefetch_catalog():
+    return DataCatalog({"a": SlowDataset(1, 0.05), "b": SlowDataset(2, 0.05)})
+
+
+def test_catalog_prefetch_measures_the_time_saved_against_serial_loads(run_params, prefetch_catalog, caplog,
+                                                                       monkeypatch):
+    monkeypatch.setenv(CatalogPrefetchHook.BASELINE_ENV, "1")
+    test_pipeline = pipeline([node(add, ["a", "b"], "c", name="add")])
+    hook = CatalogPrefetchHook()
+
+    with caplog.at_level(logging.INFO):
+        hook.before_pipeline_run(test_pipeline, prefetch_catalog)
+    assert isinstance(prefetch_catalog.datasets["a"], PrefetchingDataset)
+    assert not [record for record in caplog.records if "Replacing dataset" in record.getMessage()]
+    # the catalog logger is left as it was
+    assert not logging.getLogger(DataCatalog.__module__).filters
+    with caplog.at_level(logging.INFO):
+        prefetch_catalog.add("a", prefetch_catalog.datasets["a"], replace=True)
+    assert [record for record in caplog.records if "Replacing dataset" in record.getMessage()]
+
+    # both inputs load in the background at once: the node waits for about one load, not two
+    time.sleep(0.2)
+    for name in ("a", "b"):
+        prefetch_catalog.load(name)
+        hook.after_dataset_loaded(name)
+    hook.after_pipeline_run(run_params)
+
+    with open(os.path.join(run_params["project_path"], hook.report_path), encoding="utf8") as file:
+        report = json.load(file)
+    assert report["serial_load_seconds"] >= 0.1
+    assert report["wait_seconds"] < 0.05
+    assert report["saved_seconds"] == pytest.approx(report["serial_load_seconds"] - report["wait_seconds"])
+
+
+def test_catalog_prefetch_opt_out(prefetch_catalog, monkeypatch):
+    test_pipeline = pipeline([node(add, ["a", "b"], "c", name="add")])
+
+    CatalogPrefetchHook(enabled=False).before_pipeline_run(test_pipeline, prefetch_catalog)
+    assert isinstance(prefetch_catalog.datasets["a"], SlowDataset)
+
+    monkeypatch.setenv(CatalogPrefetchHook.ENABLED_ENV, "0")
+    CatalogPrefetchHook().before_pipeline_run(test_pipeline, prefetch_catalog)
+    assert isinstance(prefetch_catalog.datasets["a"], SlowDataset)
+
+
+def test_prefetched_catalog_runs_in_subprocesses(run_params, prefetch_catalog):
+    test_pipeline = pipeline([node(add, ["a", "b"], "c", name="add")])
+    hook = CatalogPrefetchHook()
+    hook.before_pipeline_run(test_pipeline, prefetch_catalog)
+
+    # the subprocesses receive the wrapped datasets, without the thread pool of the hook
+    outputs = ParallelRunner(max_workers=1).run(test_pipeline, prefetch_catalog)
+    hook.after_pipeline_run(run_params)
+    assert outputs == {"c": 3}
@@ -0,0 +1,80 @@
+"""
+Tests of the mergeable streaming sketches: their estimates must stay within their error bounds,
+and merging the sketches of two halves must give the sketch of the whole.
+"""
+import numpy as np
+import pytest
+
+from plant_recommendation.sketches import CountMinSketch, HyperLogLog, QuantileSketch, hash_values
+
+
+@pytest.mark.parametrize("n_distinct", [100, 5000, 200000])
+def test_hyperloglog_relative_error(n_distinct):
+    sketch = HyperLogLog(precision=12)
+    values = np.arange(n_distinct)
+    # each value twice: duplicates must not be counted
+    sketch.update(hash_values(np.concatenate([values, values])))
+
+    # 3 standard errors of 1.04 / sqrt(2^12)
+    assert sketch.estimate() == pytest.approx(n_distinct, rel=3 * 1.04 / 64)
+
+
+def test_hyperloglog_merge_is_union():
+    whole, first, second = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    hashes = hash_values(range(20000))
+    whole.update(hashes)
+    first.update(hashes[:12000])
+    second.update(hashes[8000:])
+    first.merge(second)
+
+    np.testing.assert_array_equal(first.registers, whole.registers)
+
+
+def test_count_min_error_bound_and_heavy_hitters():
+    rng = np.random.default_rng(0)
+    values = rng.zipf(1.5, size=50000) % 5000
+    sketch = CountMinSketch(width=2048, depth=4, n_heavy_hitters=10)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+
+    distinct, counts = np.unique(values, return_counts=True)
+    estimates = sketch.estimate(distinct)
+    # never underestimated, and overestimated by at most e / width x total with probability 1 - exp(-depth)
+    assert (estimates >= counts).all()
+    assert np.mean(estimates - counts <= np.e / sketch.width * sketch.total) >= 1 - np.exp(-sketch.depth)
+
+    top = [str(value) for value in distinct[np.argsort(-counts, kind="stable")[:5]]]
+    assert list(sketch.frequencies())[:5] == top
+
+
+def test_count_min_merge_is_sum():
+    whole, first, second = CountMinSketch(), CountMinSketch(), CountMinSketch()
+    values = [f"plant {value % 300}" for value in range(3000)]
+    whole.update(values)
+    first.update(values[:1000])
+    second.update(values[1000:])
+    first.merge(second)
+
+    np.testing.assert_array_equal(first.table, whole.table)
+    assert first.total == whole.total
+
+
+def test_quantile_sketch_rank_error():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100000)
+    sketch = QuantileSketch(k=200)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+
+    assert sketch.n_values() < 1000
+    probabilities = np.linspace(0.05, 0.95, 19)
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(probabilities)) / len(values)
+    assert np.abs(ranks - probabilities).max() < 0.02
+
+
+def test_quantile_sketch_exact_before_compaction():
+    values = np.arange(50, dtype=np.float64)
+    sketch = QuantileSketch(k=200)
+    sketch.update(values)
+
+    np.testing.assert_array_equal(sketch.quantiles([0.1, 0.5, 0.9]), np.quantile(values, [0.1, 0.5, 0.9]))